@@ -27,6 +27,12 @@ except Exception:
 from utils.chat_logger import ChatLogger
 from utils.mod_logger import ModLogger
 from utils.db import DB, DB_PATH
+from utils.http_client import http_client
+from utils.lazy_import import warm_up
+from utils.startup_profiler import StartupProfiler
+from utils.cog_manager import discover_cogs, split_optional, load_cogs_concurrently
+from utils.command_sync import CommandSyncer
+from utils.presence import PRIORITY_CREDIT, PRIORITY_STATUS, PresenceManager
 from flask import Flask
 from threading import Thread
 import logging
@@ -835,6 +841,12 @@ LOG_FILE_DIR = str(BASE_DIR / 'log_files')
 
 # Load PREFIX once globally
 GLOBAL_PREFIX = os.getenv('PREFIX', '!')
+
+# Presence rotation (utils/presence.py): seconds per rotation step, and the
+# minimum gap between two presence updates on one shard
+PRESENCE_ROTATE_SECONDS = float(os.getenv('PRESENCE_ROTATE_SECONDS') or 60)
+PRESENCE_MIN_INTERVAL = float(os.getenv('PRESENCE_MIN_INTERVAL') or 15)
+CREDIT_ACTIVITY = discord.Game(name="Made With 🩷 Deep | deepdeyiitk.com")
 # ----------------------------
 
 # Line ~414: PASTE THE PREFIX FUNCTION HERE, AFTER GLOBAL_PREFIX IS DEFINED
@@ -855,7 +867,16 @@ class StudyBot(commands.Bot):
             help_command=None
         )
         self.start_time = None
-        self.bg_task = None
+        # Shared presence: cogs register sources here instead of calling change_presence
+        self.presence = PresenceManager(self, rotate_seconds=PRESENCE_ROTATE_SECONDS,
+                                        min_interval=PRESENCE_MIN_INTERVAL)
+        self.presence.register('status', self.status_activity, priority=PRIORITY_STATUS)
+        self.presence.register('credit', lambda shard_id: CREDIT_ACTIVITY, priority=PRIORITY_CREDIT)
+        self.warmup_task = None
+        self.optional_cogs_task = None
+        self.guild_sync_task = None
+        # Only pushes command scopes whose serialized payload changed since the last sync
+        self.command_syncer = CommandSyncer(self.tree)
         
         # FIX: ChatLogger and ModLogger likely require only a file path (string) for file logging.
         self.chat_logger = ChatLogger(LOG_FILE_DIR)
@@ -863,24 +884,41 @@ class StudyBot(commands.Bot):
 
     async def setup_hook(self):
         # Called after the bot is logged in but before connect finishes; good for setup
-        await load_cogs()
+        # Optional cogs (utils/cog_manager.py) load in the background once connected
+        required, optional = split_optional(discover_cogs(BASE_DIR / 'cogs'))
+        await load_cogs(required)
+        if optional:
+            self.optional_cogs_task = self.loop.create_task(self.load_optional_cogs(optional))
         try:
             print('Syncing application (slash) commands...')
-            # This will sync all loaded slash/hybrid commands to Discord
-            synced = await self.tree.sync()
-            print(f'Slash commands synced: {len(synced)} commands')
-            
-            # Force sync for each guild to ensure all commands are available
-            for guild in self.guilds:
-                try:
-                    await self.tree.sync(guild=guild)
-                except Exception as e:
-                    print(f'Error syncing commands for guild {guild.id}: {e}')
-            
-            print('Guild-specific command sync complete.')
+            # Global commands only; guilds are not known yet, so their scopes sync in on_ready
+            results = await self.command_syncer.sync()
+            print(f'Slash command sync: {CommandSyncer.summary(results)}')
         except Exception as e:
             print(f'Error in setup: {e}')
             
+    async def load_optional_cogs(self, names):
+        await self.wait_until_ready()
+        before = len(self.tree.get_commands())
+        await load_cogs(names, title='Optional cog profile')
+        # setup_hook synced before these existed; push their slash commands now
+        if len(self.tree.get_commands()) != before:
+            results = await self.command_syncer.sync()
+            print(f'Slash command sync after optional cogs: {CommandSyncer.summary(results)}')
+
+    async def sync_guild_commands(self):
+        # Guild-only command scopes; unchanged guilds cost no API calls
+        results = await self.command_syncer.sync(guilds=self.guilds, include_global=False)
+        print(f'Guild-specific command sync complete: {CommandSyncer.summary(results)}')
+
+    async def close(self):
+        # Shut down the gateway first, then release pooled HTTP connections
+        self.presence.stop()
+        try:
+            await super().close()
+        finally:
+            await http_client.close()
+
     async def on_message(self, message):
         # Log all messages
         if not message.author.bot:
@@ -938,9 +976,6 @@ class StudyBot(commands.Bot):
                     )
         except Exception as e:
             print(f'Error logging timeout: {e}')
-        # This part of the logic seems misplaced, but I will keep it near the original to avoid breaking things.
-        if not self.bg_task:
-            self.bg_task = self.loop.create_task(self.status_update_task())
     
     async def on_ready(self):
         # This is the single, correct on_ready handler for the bot.
@@ -949,15 +984,15 @@ class StudyBot(commands.Bot):
         print('--------------------')
         self.start_time = time.time()  # Set the start time when bot becomes ready
         
-        # Set a friendly presence (this will be immediately overridden by the rotating task)
-        try:
-            await self.change_presence(activity=discord.Game(name="Deep Dey - The FUTURE IITIAN 🎯"))
-        except Exception:
-            pass
-            
-        # Always start the status update task when the bot is ready
-        if not self.bg_task:
-            self.bg_task = self.loop.create_task(self.status_update_task())
+        # Rotating ping/uptime and credit presence (music now-playing takes over while it plays)
+        self.presence.start()
+
+        if not self.guild_sync_task:
+            self.guild_sync_task = self.loop.create_task(self.sync_guild_commands())
+
+        # Import heavy libraries needed by the loaded cogs (yt-dlp, Gemini SDK, ...) in the background
+        if not self.warmup_task and os.getenv('LAZY_WARMUP', '1') != '0':
+            self.warmup_task = self.loop.create_task(warm_up(delay=5))
 
     async def on_command_error(self, ctx, error):
         if isinstance(error, commands.CommandNotFound):
@@ -987,13 +1022,14 @@ class StudyBot(commands.Bot):
 
     @commands.hybrid_command(name='sync', description='Sync slash commands (Admin only)')
     @commands.has_permissions(administrator=True)
-    async def sync_commands(self, ctx):
-        """Sync all slash commands to Discord"""
+    async def sync_commands(self, ctx, force: bool = False):
+        """Sync changed slash commands to Discord (force=True re-pushes every scope)"""
         try:
             print('Syncing application (slash) commands...')
-            synced = await self.tree.sync()
-            await ctx.send(f'Successfully synced {len(synced)} commands!')
-            print('Slash commands synced.')
+            results = await self.command_syncer.sync(guilds=self.guilds, force=force)
+            summary = CommandSyncer.summary(results)
+            await ctx.send(f'Command sync finished: {summary}')
+            print(f'Slash commands synced: {summary}')
         except Exception as e:
             print('Failed to sync app commands:', e)
             try:
@@ -1001,55 +1037,12 @@ class StudyBot(commands.Bot):
             except Exception:
                 pass
 
-    async def status_update_task(self):
-        await self.wait_until_ready()
-        # Timers:
-        # - ping_refresh every 15s (updates ping/uptime text)
-        # - swap activities every 4s (changes presence between ping and credit)
-        # - terminal log every 60s
-        ping_activity = discord.Game(name="Ping: 0ms | Uptime: 0:00:00")
-        credit_activity = discord.Game(name="Made With 🩷 Deep | deepdeyiitk.com")
-
-        last_ping_refresh = time.monotonic() - 15  # Initialize to ensure immediate refresh
-        last_terminal_log = time.monotonic() - 60
-        show_ping = True
-
-        while not self.is_closed():
-            try:
-                now = time.monotonic()
-
-                # Refresh ping/uptime every 15 seconds
-                if now - last_ping_refresh >= 15:
-                    latency = round(self.latency * 1000) if self.latency is not None else 0
-                    uptime_secs = int(time.time() - (self.start_time or time.time()))
-                    uptime = str(datetime.timedelta(seconds=uptime_secs))
-                    ping_activity = discord.Game(name=f"Ping: {latency}ms | Uptime: {uptime}")
-                    last_ping_refresh = now
-
-                # Set presence depending on toggle
-                if show_ping:
-                    await self.change_presence(activity=ping_activity)
-                else:
-                    await self.change_presence(activity=credit_activity)
-
-                # Terminal logging every 60 seconds (log same status)
-                if now - last_terminal_log >= 60:
-                    # use the current ping_activity name for logging
-                    try:
-                        log_text = ping_activity.name
-                    except Exception:
-                        log_text = "Ping: N/A | Uptime: N/A | Made With 🩷 Deep | deepdeyiitk.com"
-                    print(f"[STATUS LOG] {log_text}")
-                    last_terminal_log = now
-
-                # flip the activity and wait 4 seconds before next swap (THIS CONTROLS THE SPEED)
-                show_ping = not show_ping
-                await asyncio.sleep(4) 
-
-            except Exception as e:
-                print(f"Error in status update task: {e}")
-                await asyncio.sleep(4)
-
+    def status_activity(self, shard_id=None):
+        """Ping/uptime presence for a shard."""
+        latency = self.latency if shard_id is None else self.shards[shard_id].latency
+        latency = 0 if latency != latency else round(latency * 1000)  # NaN before the first heartbeat
+        uptime = datetime.timedelta(seconds=int(time.time() - (self.start_time or time.time())))
+        return discord.Game(name=f"Ping: {latency}ms | Uptime: {uptime}")
 
 bot = StudyBot()
 # Expose the configured log channel on the bot instance so cogs can use it
@@ -1065,21 +1058,24 @@ async def on_connect():
     print(f"Bot connected to Discord at {datetime.datetime.now()}")
 
 
-async def load_cogs():
+async def load_cogs(names=None, title='Cog startup profile'):
     # ADDED DIAGNOSTIC PRINT
     print("Attempting to load cogs from the 'cogs' directory...") 
     
-    # Load all cogs in the cogs package
-    for file in (BASE_DIR / 'cogs').glob('*.py'):
-        if file.name.startswith('_'):
-            continue
-        ext = f"cogs.{file.stem}"
-        try:
-            await bot.load_extension(ext)
+    # Load cogs concurrently in dependency order, timing import and setup() per cog
+    if names is None:
+        names = discover_cogs(BASE_DIR / 'cogs')
+    with StartupProfiler() as profiler:
+        results = await load_cogs_concurrently(bot, names)
+    for name, error in results.items():
+        ext = f"cogs.{name}"
+        if error is None:
             print(f"Loaded extension {ext}")
-        except Exception as e:
+        else:
+            profiler.record_error(ext, error)
             # THIS PRINT IS CRITICAL: it will show exactly which file failed and why.
-            print(f"Failed to load extension {ext}: {e}")
+            print(f"Failed to load extension {ext}: {error}")
+    print(f'{title}:\n' + profiler.report())
 
 
 async def main():
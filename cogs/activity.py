@@ -1,7 +1,8 @@
 """Activity tracking cog
 
 Features:
-- Track per-guild per-user message counts and voice seconds aggregated by week.
+- Track per-guild per-user message counts and voice seconds aggregated by week (voice time excludes the AFK
+  channel and deafened time, is split at week boundaries and survives restarts; see utils.voice_sessions).
 - Admin `/activity setup` to configure role, channels to monitor (comma-separated ids), reset weekday (0=Mon), reset hour (0-23).
 - Weekly processor task that computes top 5 active users and assigns the configured role, removing it from users who dropped out.
 - `/activity report` to manually trigger a report and /activity config to view current config.
@@ -14,32 +15,56 @@ from discord.ext import commands, tasks
 from discord import app_commands
 import discord
 from utils.db import DB
+from utils.role_executor import RoleChangeExecutor
+from utils.timebuckets import utc_time
+from utils.voice_sessions import VoiceSessionTracker
 import asyncio
+import os
 import time
 import datetime
 import json
 from typing import Optional, List
 
 WEEK_SECONDS = 7 * 24 * 60 * 60
+# role changes per second per guild (Discord buckets the member-role route per guild)
+ROLE_CHANGES_PER_SECOND = float(os.getenv('ACTIVITY_ROLE_CHANGES_PER_SECOND') or 1)
+GUILD_CONCURRENCY = int(os.getenv('ACTIVITY_GUILD_CONCURRENCY') or 4)
+# kv key prefix of a guild's in-progress weekly run; progress is saved every N role changes
+PROGRESS_KEY = 'activity_weekly_progress'
+CHECKPOINT_EVERY = 10
+# how often voice time is written to the DB (and open sessions checkpointed)
+VOICE_FLUSH_SECONDS = int(os.getenv('ACTIVITY_VOICE_FLUSH_SECONDS') or 60)
 
 
 def week_start_for_ts(ts: int) -> int:
-    # start of ISO week (Monday) in unix seconds
-    dt = datetime.datetime.utcfromtimestamp(ts)
-    # find Monday
-    start = dt - datetime.timedelta(days=dt.weekday())
-    start = datetime.datetime(start.year, start.month, start.day)
-    return int(start.replace(tzinfo=datetime.timezone.utc).timestamp())
+    # start of ISO week (Monday, UTC) in unix seconds
+    return utc_time.week_start(ts)
 
 
 class Activity(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self._voice_times = {}  # (guild_id, user_id) -> join_timestamp
+        self.voice = VoiceSessionTracker(week_start_for_ts)
+        self.roles = RoleChangeExecutor(per_guild_rate=ROLE_CHANGES_PER_SECOND)
+        self._processing = set()  # guild ids with a weekly run in progress
         self.weekly_task.start()
 
+    async def cog_load(self):
+        try:
+            await self.voice.load()
+        except Exception as e:
+            print(f"Could not read voice session checkpoints: {e}")
+        if self.bot.is_ready():
+            self._reconcile_voice()  # reloaded while running
+        self.voice_flush.start()
+
     async def cog_unload(self):
         self.weekly_task.cancel()
+        self.voice_flush.cancel()
+        try:
+            await self.voice.flush()
+        except Exception as e:
+            print(f"Voice time flush on unload failed: {e}")
 
     # ----------------- Tracking listeners -----------------
     @commands.Cog.listener()
@@ -54,29 +79,35 @@ class Activity(commands.Cog):
         except Exception as e:
             print(f"Error adding weekly message for {user_id} in {guild_id}: {e}")
 
+    @staticmethod
+    def _voice_counts(member: discord.Member, state: discord.VoiceState) -> bool:
+        # time in the AFK channel or while deafened is not activity
+        return (not member.bot and state.channel is not None
+                and state.channel != member.guild.afk_channel
+                and not state.self_deaf and not state.deaf)
+
+    def _reconcile_voice(self):
+        for guild in self.bot.guilds:
+            counting = [m.id for ch in guild.voice_channels + guild.stage_channels for m in ch.members
+                        if m.voice and self._voice_counts(m, m.voice)]
+            self.voice.reconcile(guild.id, counting)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # sessions open before a restart or reconnect are resumed or closed from the live voice states
+        self._reconcile_voice()
+
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-        # Track join/leave to measure total voice seconds
+        # joins, leaves, moves and (un)deafening all funnel into one counting/not counting state
+        self.voice.update(member.guild.id, member.id, self._voice_counts(member, after))
+
+    @tasks.loop(seconds=VOICE_FLUSH_SECONDS)
+    async def voice_flush(self):
         try:
-            guild_id = member.guild.id
-            user_id = member.id
-            key = (guild_id, user_id)
-            now_ts = int(time.time())
-            if before.channel is None and after.channel is not None:
-                # joined
-                self._voice_times[key] = now_ts
-            elif before.channel is not None and after.channel is None:
-                # left
-                join_ts = self._voice_times.pop(key, None)
-                if join_ts:
-                    secs = now_ts - join_ts
-                    ws = week_start_for_ts(join_ts)
-                    await DB.add_weekly_voice_seconds(guild_id, user_id, ws, secs)
-            else:
-                # moved channels or mute/unmute don't change tracking for now
-                pass
+            await self.voice.flush()
         except Exception as e:
-            print(f"Voice tracking error: {e}")
+            print(f"Voice time flush failed: {e}")
 
     # ----------------- Admin configuration commands -----------------
     @commands.hybrid_group(name='activity', description='Activity tracking commands')
@@ -138,93 +169,122 @@ class Activity(commands.Cog):
         await ctx.send('\n'.join(lines[:20]))
 
     # ----------------- Weekly processor -----------------
+    @staticmethod
+    def _reset_week_start(cfg, now: datetime.datetime) -> int:
+        """Week start of the most recent reset boundary (reset_weekday/reset_hour UTC) <= now."""
+        now_ts = int(now.timestamp())
+        reset_weekday = int(cfg.get('reset_weekday') or 0)
+        reset_hour = int(cfg.get('reset_hour') or 0)
+        # find the date of this week's reset day
+        delta_days = (now.weekday() - reset_weekday) % 7
+        reset_date = now - datetime.timedelta(days=delta_days)
+        reset_dt = datetime.datetime(reset_date.year, reset_date.month, reset_date.day, reset_hour, tzinfo=datetime.timezone.utc)
+        reset_ts = int(reset_dt.timestamp())
+        # If now is before today's reset time, move reset to previous week
+        if now_ts < reset_ts:
+            reset_ts -= WEEK_SECONDS
+        return week_start_for_ts(reset_ts)
+
+    async def _process_guild(self, cfg, now: datetime.datetime):
+        guild_id = int(cfg['guild_id'])
+        ws = self._reset_week_start(cfg, now)
+        last_processed = cfg.get('last_processed_week')
+        if last_processed and int(last_processed) >= ws:
+            return  # already processed
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+
+        # resume an interrupted run with the same top 5, skipping members already handled
+        progress_key = f'{PROGRESS_KEY}:{guild_id}'
+        saved = await DB.get_kv(progress_key)
+        progress = json.loads(saved) if saved else None
+        if not progress or progress.get('week') != ws:
+            top = await DB.get_weekly_activity(guild_id, ws, limit=5)
+            progress = {'week': ws, 'top': [t[0] for t in top[:5]], 'done': []}
+            await DB.set_kv(progress_key, json.dumps(progress))
+        top5 = progress['top']
+
+        role_id = cfg.get('role_id')
+        role = guild.get_role(role_id) if role_id else None
+        # assign role to top5 and remove from others who have role but not in top5
+        if role:
+            done = set(progress['done'])
+            top_set = set(top5)
+            current_members = {m.id for m in role.members}
+            to_add = top_set - current_members - done
+            to_remove = current_members - top_set - done
+            unsaved = 0
+
+            async def checkpoint(user_id: int):
+                nonlocal unsaved
+                done.add(user_id)
+                unsaved += 1
+                if unsaved >= CHECKPOINT_EVERY:
+                    unsaved = 0
+                    progress['done'] = list(done)
+                    await DB.set_kv(progress_key, json.dumps(progress))
+
+            if to_add or to_remove:
+                _, failed = await self.roles.apply(guild, role, add=to_add, remove=to_remove,
+                                                   reason='Weekly active role assignment', on_change=checkpoint)
+                if failed:
+                    print(f"Weekly active role: {failed} change(s) failed in guild {guild_id}")
+            progress['done'] = list(done)
+
+        # send a short announcement in the first configured channel if provided
+        channel_ids = cfg.get('channel_ids')
+        if channel_ids and not progress.get('announced'):
+            try:
+                ids = json.loads(channel_ids)
+                if ids:
+                    ch = guild.get_channel(ids[0])
+                    if ch and ch.permissions_for(guild.me).send_messages:
+                        text = '**Weekly Top Active Members**\n'
+                        for pos, uid in enumerate(top5, start=1):
+                            member = guild.get_member(uid)
+                            name = member.display_name if member else str(uid)
+                            text += f"{pos}. {name}\n"
+                        await ch.send(text)
+                        progress['announced'] = True
+                        await DB.set_kv(progress_key, json.dumps(progress))
+            except Exception as e:
+                print(f"Failed to announce weekly active for guild {guild_id}: {e}")
+
+        # update last_processed_week
+        await DB.update_last_processed_week(guild_id, ws)
+        await DB.set_kv(progress_key, '')
+
     @tasks.loop(minutes=30)
     async def weekly_task(self):
         # check all guild configs and process if reset time passed
         try:
             configs = await DB.get_all_activity_configs()
-            now = datetime.datetime.utcnow()
-            now_ts = int(now.timestamp())
-            for cfg in configs:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            if configs:
                 try:
-                    guild_id = int(cfg['guild_id'])
-                    role_id = cfg.get('role_id')
-                    channel_ids = cfg.get('channel_ids')
-                    reset_weekday = int(cfg.get('reset_weekday') or 0)
-                    reset_hour = int(cfg.get('reset_hour') or 0)
-                    last_processed = cfg.get('last_processed_week')
-
-                    # compute this week's start and compare with last_processed
-                    # determine the week_start for the most recent reset boundary
-                    # find most recent datetime that matches reset_weekday/reset_hour <= now
-                    today = now.date()
-                    # build a date at reset_hour UTC for the current week's reset_weekday
-                    # find the date of this week's reset day
-                    delta_days = (now.weekday() - reset_weekday) % 7
-                    reset_date = now - datetime.timedelta(days=delta_days)
-                    reset_dt = datetime.datetime(reset_date.year, reset_date.month, reset_date.day, reset_hour, tzinfo=datetime.timezone.utc)
-                    reset_ts = int(reset_dt.timestamp())
-                    # If now is before today's reset time, move reset to previous week
-                    if now_ts < reset_ts:
-                        reset_dt = reset_dt - datetime.timedelta(weeks=1)
-                        reset_ts = int(reset_dt.timestamp())
-                    ws = week_start_for_ts(reset_ts)
-
-                    if last_processed and int(last_processed) >= ws:
-                        continue  # already processed
-
-                    # compute top users for ws
-                    top = await DB.get_weekly_activity(guild_id, ws, limit=20)
-                    # take top 5
-                    top5 = [t[0] for t in top[:5]]
-
-                    guild = self.bot.get_guild(guild_id)
-                    if not guild:
-                        continue
-                    role = guild.get_role(role_id) if role_id else None
-
-                    # assign role to top5 and remove from others who have role but not in top5
-                    if role:
-                        # build current role members
-                        current_members = [m.id for m in role.members]
-                        to_add = [uid for uid in top5 if uid not in current_members]
-                        to_remove = [mid for mid in current_members if mid not in top5]
-                        for uid in to_add:
-                            try:
-                                member = guild.get_member(uid)
-                                if member:
-                                    await member.add_roles(role, reason='Weekly active role assignment')
-                            except Exception as e:
-                                print(f"Failed to add role to {uid} in guild {guild_id}: {e}")
-                        for uid in to_remove:
-                            try:
-                                member = guild.get_member(uid)
-                                if member:
-                                    await member.remove_roles(role, reason='Weekly active role removal')
-                            except Exception as e:
-                                print(f"Failed to remove role from {uid} in guild {guild_id}: {e}")
-
-                    # send a short announcement in the first configured channel if provided
-                    if channel_ids:
-                        try:
-                            ids = json.loads(channel_ids)
-                            if ids:
-                                ch = guild.get_channel(ids[0])
-                                if ch and ch.permissions_for(guild.me).send_messages:
-                                    text = '**Weekly Top Active Members**\n'
-                                    for pos, uid in enumerate(top5, start=1):
-                                        member = guild.get_member(uid)
-                                        name = member.display_name if member else str(uid)
-                                        text += f"{pos}. {name}\n"
-                                    await ch.send(text)
-                        except Exception as e:
-                            print(f"Failed to announce weekly active for guild {guild_id}: {e}")
-
-                    # update last_processed_week
-                    await DB.update_last_processed_week(guild_id, ws)
+                    await self.voice.flush()  # rank on up-to-date voice time
+                except Exception as e:
+                    print(f"Voice time flush failed: {e}")
+            semaphore = asyncio.Semaphore(GUILD_CONCURRENCY)
 
+            async def run(cfg):
+                guild_id = int(cfg['guild_id'])
+                # /activity_run and the scheduled loop both land here; claim the guild
+                # before the first await so they cannot process it twice
+                if guild_id in self._processing:
+                    return
+                self._processing.add(guild_id)
+                try:
+                    async with semaphore:
+                        await self._process_guild(cfg, now)
                 except Exception as e:
-                    print(f"Error processing activity config: {e}")
+                    print(f"Error processing activity config for guild {guild_id}: {e}")
+                finally:
+                    self._processing.discard(guild_id)
+
+            # guilds run side by side so one large server does not hold up the rest
+            await asyncio.gather(*(run(cfg) for cfg in configs))
         except Exception as e:
             print(f"Error in weekly_task: {e}")
 
@@ -2,15 +2,26 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
+import asyncio
 import json
+import os
 from pathlib import Path
 import time
-from datetime import datetime, timedelta
-import google.generativeai as genai
+from datetime import timedelta
+from typing import Dict, Optional
 from utils import db
+from utils.llm import llm, genai_configured, get_genai_model
+from utils.rate_limit import TokenBucket
+from utils.lazy_import import register_warm_up
+from utils.timebuckets import DAY, local_time
 
+WEEK = 7 * 24 * 60 * 60
+# Weekly batch: reports generated/DMed at once, DM pacing, and retries when Gemini throttles
+COACH_CONCURRENCY = int(os.getenv('COACH_CONCURRENCY', '4'))
+COACH_DMS_PER_SECOND = float(os.getenv('COACH_DMS_PER_SECOND', '2'))
+COACH_LLM_RETRIES = 3
+ACTIVE_RUN_KEY = 'coach_weekly_active_run'
 
-CONFIG_PATH = Path(__file__).parent.parent / 'config.json'
 
 # Mock feedback for when Gemini is unavailable
 MOCK_FEEDBACK = """📊 Weekly Study Report
@@ -37,89 +48,90 @@ class WeeklyCoach(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.gemini = None
-        self.model = None
         self.weekly_analysis.start()
 
     def cog_unload(self):
         self.weekly_analysis.cancel()
         
     async def cog_load(self):
-        try:
-            config = json.loads(CONFIG_PATH.read_text())
-            if 'gemini_api_key' in config:
-                genai.configure(api_key=config['gemini_api_key'])
-                self.model = genai.GenerativeModel('gemini-pro')
-                self.gemini = True
-        except Exception:
-            self.gemini = False
+        self.gemini = genai_configured()
+        if self.gemini:
+            register_warm_up('google.generativeai')
 
-    async def _generate_report(self, user_id: int) -> str:
-        """Generate a weekly study report and analysis."""
-        if not self.gemini or not self.model:
-            return MOCK_FEEDBACK
-            
-        try:
-            # Get this week's logs
-            week_ago = int(time.time() - (7 * 24 * 60 * 60))
-            logs = await db.DB.get_user_logs(user_id, since_ts=week_ago)
-            
-            # Get previous week's logs for comparison
-            two_weeks_ago = int(time.time() - (14 * 24 * 60 * 60))
-            prev_logs = await db.DB.get_user_logs(user_id, since_ts=two_weeks_ago)
-            prev_logs = [l for l in prev_logs if l['ts'] < week_ago]
-            
-            # Aggregate current week by subject
-            current_week = {}
-            for log in logs:
-                topic = log['topic'].lower() if log['topic'] else 'unknown'
-                minutes = log['minutes']
-                if topic in current_week:
-                    current_week[topic] += minutes
-                else:
-                    current_week[topic] = minutes
-                    
-            # Aggregate previous week
-            prev_week = {}
-            for log in prev_logs:
-                topic = log['topic'].lower() if log['topic'] else 'unknown'
-                minutes = log['minutes']
-                if topic in prev_week:
-                    prev_week[topic] += minutes
-                else:
-                    prev_week[topic] = minutes
-            
-            # Get progress updates
-            progress = await db.DB.get_progress(user_id, None)
-            progress_data = {p['subject'].lower(): p['percent'] for p in progress}
-            
-            # Format data for Gemini
-            context = ["Weekly Study Analysis\n"]
-            
-            context.append("This week's study time:")
-            for subj, mins in current_week.items():
-                hrs = mins // 60
-                remaining_mins = mins % 60
-                context.append(f"- {subj}: {hrs}h {remaining_mins}m")
-            
-            context.append("\nCompared to last week:")
-            for subj in set(current_week.keys()) | set(prev_week.keys()):
-                curr = current_week.get(subj, 0)
-                prev = prev_week.get(subj, 0)
-                diff = curr - prev
-                if diff > 0:
-                    context.append(f"- {subj}: +{diff} minutes")
-                elif diff < 0:
-                    context.append(f"- {subj}: {diff} minutes")
-                else:
-                    context.append(f"- {subj}: no change")
-            
-            context.append("\nCurrent progress:")
-            for subj, pct in progress_data.items():
-                context.append(f"- {subj}: {pct}% complete")
-            
-            prompt = f"""Based on this student's weekly data:
+    @staticmethod
+    def _week_windows(now: int):
+        """(start of the last 7 local days ending today, start of the 7 local days before)."""
+        today = local_time.day_start(now)
+        # step to midday so a DST change in between cannot land on the neighbouring day
+        week_start = local_time.day_start(today - 6 * DAY + DAY // 2)
+        return week_start, local_time.day_start(week_start - 7 * DAY + DAY // 2)
+
+    @staticmethod
+    async def _weekly_stats(now: Optional[int] = None) -> Dict[int, Dict]:
+        """This week's and last week's minutes per topic plus progress, for every active user.
+
+        Weeks are the same local-day windows as `/report` (`UserStats.week_minutes`).
+        Two aggregate queries cover all users; returns
+        {user_id: {'current': {topic: mins}, 'previous': {topic: mins}, 'progress': {subject: pct}}}
+        for users who studied during the last 7 local days.
+        """
+        now = int(now or time.time())
+        week_start, previous_start = WeeklyCoach._week_windows(now)
+        stats: Dict[int, Dict] = {}
+        for row in await db.DB.get_topic_minutes(previous_start, week_start):
+            user = stats.setdefault(row['user_id'], {'current': {}, 'previous': {}, 'progress': {}})
+            if row['current']:
+                user['current'][row['topic']] = row['current']
+            if row['previous']:
+                user['previous'][row['topic']] = row['previous']
+        stats = {uid: s for uid, s in stats.items() if s['current']}
+        for row in await db.DB.get_progress_for_active_users(week_start):
+            if row['user_id'] in stats:
+                stats[row['user_id']]['progress'][row['subject']] = row['percent']
+        return stats
+
+    @staticmethod
+    async def _user_week(user_id: int) -> Dict:
+        """One user's `_weekly_stats()` entry, from the per-user stats cache (last 7 local days vs the 7 before)."""
+        user_stats = await db.DB.get_user_stats(user_id)
+        current, previous = user_stats.week_minutes(local_time.day_number())
+        progress = await db.DB.get_best_progress(user_id)
+        return {'current': current, 'previous': previous,
+                'progress': {row['subject']: row['percent'] for row in progress}}
+
+    @staticmethod
+    def _build_prompt(stats: Dict) -> str:
+        current_week, prev_week, progress_data = stats['current'], stats['previous'], stats['progress']
+
+        # Format data for Gemini
+        context = ["Weekly Study Analysis\n"]
+        
+        context.append("This week's study time:")
+        for subj, mins in current_week.items():
+            hrs = mins // 60
+            remaining_mins = mins % 60
+            context.append(f"- {subj}: {hrs}h {remaining_mins}m")
+        
+        context.append("\nCompared to last week:")
+        for subj in set(current_week.keys()) | set(prev_week.keys()):
+            curr = current_week.get(subj, 0)
+            prev = prev_week.get(subj, 0)
+            diff = curr - prev
+            if diff > 0:
+                context.append(f"- {subj}: +{diff} minutes")
+            elif diff < 0:
+                context.append(f"- {subj}: {diff} minutes")
+            else:
+                context.append(f"- {subj}: no change")
+        
+        context.append("\nCurrent progress:")
+        for subj, pct in progress_data.items():
+            context.append(f"- {subj}: {pct}% complete")
+        
+        context_text = '\n'.join(context)
+        return f"""Based on this student's weekly data:
 
-{'\n'.join(context)}
+{context_text}
 
 Generate a concise weekly report with:
 1. Time breakdown (formatted as hours and minutes)
@@ -129,51 +141,116 @@ Generate a concise weekly report with:
 
 Format with clear sections and include relevant emojis. Keep it motivational but realistic."""
 
-            response = await self.model.generate_content(prompt)
-            return response.text if response else MOCK_FEEDBACK
+    async def _generate_report(self, user_id: int, guild_id: int = None, channel_id: int = None,
+                               rate_limit: bool = True, stats: Optional[Dict] = None) -> str:
+        """Generate a weekly study report and analysis.
+
+        `stats` is one entry of `_weekly_stats()`; when not given it comes from `_user_week()`.
+        The scheduled weekly job passes rate_limit=False: it is bounded by the client's
+        concurrency cap instead of sharing one per-channel bucket across every user.
+        """
+        model = await get_genai_model() if self.gemini else None
+        if not model:
+            return MOCK_FEEDBACK
+            
+        try:
+            if stats is None:
+                stats = await self._user_week(user_id)
+            text = await llm.generate_content(model, self._build_prompt(stats), scope='coach', guild_id=guild_id,
+                                              channel_id=channel_id, rate_limit=rate_limit)
+            return text or MOCK_FEEDBACK
         except Exception:
             return MOCK_FEEDBACK
 
+    @staticmethod
+    def _is_throttled(error: Exception) -> bool:
+        # google.api_core.exceptions.ResourceExhausted / HTTP 429
+        return type(error).__name__ in ('ResourceExhausted', 'TooManyRequests') or '429' in str(error)
+
+    async def _batch_report(self, stats: Dict) -> str:
+        """Like `_generate_report`, but backs off and retries while Gemini is throttling."""
+        model = await get_genai_model() if self.gemini else None
+        if not model:
+            return MOCK_FEEDBACK
+        prompt = self._build_prompt(stats)
+        for attempt in range(COACH_LLM_RETRIES + 1):
+            try:
+                return await llm.generate_content(model, prompt, scope='coach', rate_limit=False) or MOCK_FEEDBACK
+            except Exception as e:
+                if not self._is_throttled(e) or attempt == COACH_LLM_RETRIES:
+                    return MOCK_FEEDBACK
+                await asyncio.sleep(2 ** attempt * 5)
+        return MOCK_FEEDBACK
+
+    async def run_weekly_reports(self, week_key: str, now: Optional[int] = None) -> Dict[str, int]:
+        """Generate and DM every active user's report, resuming past users already done this week."""
+        await db.DB.set_kv(ACTIVE_RUN_KEY, week_key)
+        stats = await self._weekly_stats(now)
+        done = await db.DB.get_coach_reports_sent(week_key)
+        queue: asyncio.Queue = asyncio.Queue()
+        for user_id, user_stats in stats.items():
+            if user_id not in done:
+                queue.put_nowait((user_id, user_stats))
+        counts = {'users': len(stats), 'skipped': len(stats) - queue.qsize(), 'sent': 0, 'failed': 0}
+        dm_bucket = TokenBucket(COACH_DMS_PER_SECOND, capacity=COACH_CONCURRENCY)
+        footer = local_time.now().strftime("%B %d, %Y")
+
+        async def worker():
+            while True:
+                try:
+                    user_id, user_stats = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    # Try to DM the user
+                    user = self.bot.get_user(user_id)
+                    if not user:
+                        continue
+                    report = await self._batch_report(user_stats)
+                    embed = discord.Embed(
+                        title="📊 Your Weekly Study Analysis",
+                        description=report,
+                        color=discord.Color.blue()
+                    )
+                    embed.set_footer(text=footer)
+                    await dm_bucket.acquire()
+                    await user.send(embed=embed)
+                    counts['sent'] += 1
+                except Exception:
+                    counts['failed'] += 1  # Skip if can't DM
+                # checkpoint: a restarted run skips this user
+                await db.DB.mark_coach_reports_sent(week_key, [user_id])
+
+        await asyncio.gather(*(worker() for _ in range(max(1, COACH_CONCURRENCY))))
+        await db.DB.set_kv(ACTIVE_RUN_KEY, '')
+        return counts
+
     @tasks.loop(hours=24)
     async def weekly_analysis(self):
-        """Send weekly reports every Sunday."""
+        """Send weekly reports every Sunday, or finish a run that was interrupted."""
         await self.bot.wait_until_ready()
         
-        # Only run on Sundays
-        if datetime.now().weekday() != 6:  # 6 = Sunday
-            return
-            
-        # Get all users with study logs in the last week
-        week_ago = int(time.time() - (7 * 24 * 60 * 60))
-        logs = await db.DB.fetchall('SELECT DISTINCT user_id FROM study_logs WHERE ts >= ?', (week_ago,))
-        
-        for row in logs:
-            user_id = row['user_id']
-            try:
-                # Try to DM the user
-                user = self.bot.get_user(user_id)
-                if not user:
-                    continue
-                    
-                report = await self._generate_report(user_id)
-                
-                embed = discord.Embed(
-                    title="📊 Your Weekly Study Analysis",
-                    description=report,
-                    color=discord.Color.blue()
-                )
-                embed.set_footer(text=datetime.now().strftime("%B %d, %Y"))
-                
-                await user.send(embed=embed)
-            except Exception:
-                continue  # Skip if can't DM
+        week_key = await db.DB.get_kv(ACTIVE_RUN_KEY)
+        if not week_key:
+            # Only start new runs on Sundays
+            today = local_time.today()
+            if today.weekday() != 6:  # 6 = Sunday
+                return
+            week_key = today.isoformat()
+        counts = await self.run_weekly_reports(week_key)
+        print(f"[COACH] Weekly reports {week_key}: {counts['sent']} sent, {counts['failed']} failed, "
+              f"{counts['skipped']} already done of {counts['users']}")
 
     @weekly_analysis.before_loop
     async def before_weekly_analysis(self):
         await self.bot.wait_until_ready()
         
+        # An interrupted run resumes right away
+        if await db.DB.get_kv(ACTIVE_RUN_KEY):
+            return
+
         # Wait until next Sunday
-        now = datetime.now()
+        now = local_time.now()
         days_ahead = 6 - now.weekday()
         if days_ahead <= 0:
             days_ahead += 7
@@ -184,14 +261,18 @@ Format with clear sections and include relevant emojis. Keep it motivational but
     async def report(self, ctx):
         """Get your weekly study report now"""
         async with ctx.typing():
-            report = await self._generate_report(ctx.author.id)
+            report = await self._generate_report(
+                ctx.author.id,
+                guild_id=ctx.guild.id if ctx.guild else None,
+                channel_id=ctx.channel.id
+            )
             
             embed = discord.Embed(
                 title="📊 Your Weekly Study Analysis",
                 description=report,
                 color=discord.Color.blue()
             )
-            embed.set_footer(text=datetime.now().strftime("%B %d, %Y"))
+            embed.set_footer(text=local_time.now().strftime("%B %d, %Y"))
             
             await ctx.send(embed=embed)
 
@@ -7,10 +7,14 @@ from discord import app_commands # Ensure app_commands is imported for slash com
 import datetime
 import time
 import os
-import zipfile
-import io
+import asyncio
+import json
+import math
 from typing import Literal # Used for specific choices in slash commands
 
+from utils.db import DB
+from utils.zip_export import build_volumes, plan_export
+
 class Extras(commands.Cog):
     """Utility commands and slash wrappers"""
 
@@ -57,9 +61,11 @@ class Extras(commands.Cog):
 
     # --- Owner-Only Command ---
     @commands.hybrid_command(name='getfiles', description='Download bot files (owner only).')
-    @app_commands.describe(scope='Choose "all" (includes secrets, excludes venv/.git) or "some" (excludes secrets/venv/.git).')
+    @app_commands.describe(scope='Choose "all" (includes secrets, excludes venv/.git) or "some" (excludes secrets/venv/.git).',
+                           mode='"full" for every file, "changed" for files changed since the last export of this scope.')
     @commands.is_owner()
-    async def getfiles(self, ctx: commands.Context, scope: Literal['all', 'some']):
+    async def getfiles(self, ctx: commands.Context, scope: Literal['all', 'some'],
+                       mode: Literal['full', 'changed'] = 'full'):
         """Zips and sends the bot's deployed files based on the specified scope."""
 
         await ctx.defer(ephemeral=True)
@@ -81,75 +87,70 @@ class Extras(commands.Cog):
             excluded.update(secret_files)
             excluded.update(data_dirs)
             zip_type = "safe_small"
-            print("Zipping files (excluding secrets, venv, .git, data)...")
         elif scope == 'all':
             # Exclude only the largest common folders, keep secrets and data
             excluded.update(common_large_exclusions)
             # Secrets and data are NOT added to excluded here
             zip_type = "full_large"
-            print("Zipping ALL files (excluding venv, .git, but INCLUDING secrets and data)...")
         else:
             await ctx.send("Invalid scope. Use `all` or `some`.", ephemeral=True)
             return
 
+        manifest_key = f'getfiles_manifest:{scope}'
+        volumes = []
         try:
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Determine project root (assuming cogs folder is one level down)
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                project_root = os.path.abspath(os.path.join(script_dir, '..'))
-                print(f"Project root identified as: {project_root}")
-
-                for root, dirs, files in os.walk(project_root, topdown=True):
-                    # Check if the current directory itself should be excluded
-                    root_relative = os.path.relpath(root, project_root)
-                    # Skip if the first part of the relative path is in the exclusion set
-                    # (e.g., skips walking into 'data/' if 'data' is excluded)
-                    if root_relative != '.' and root_relative.split(os.path.sep)[0] in excluded:
-                        dirs[:] = [] # Don't descend into this directory
-                        continue
-
-                    # Filter subdirectories to exclude from further walking
-                    dirs[:] = [d for d in dirs if d not in excluded]
-
-                    for file in files:
-                        # Exclude specific files by name
-                        if file in excluded:
-                            continue
-
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, project_root)
-
-                        # Skip the zip file itself
-                        if file.endswith('.zip'):
-                             continue
-
-                        print(f"Adding: {arcname}")
-                        zipf.write(file_path, arcname)
-
-            zip_buffer.seek(0)
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"bot_files_{zip_type}_{timestamp}.zip"
-
-            zip_size_mb = zip_buffer.getbuffer().nbytes / (1024 * 1024)
-            print(f"Zip file created: {filename}, Size: {zip_size_mb:.2f} MB")
-
-            if zip_size_mb > 24.5: # Check Discord's limit (leave a small margin)
-                 await ctx.send(
-                    f"Error: The `{zip_type}` zip file is too large ({zip_size_mb:.2f} MB) for Discord. "
-                    f"Current exclusions might not be enough. Excluded items/folders: `{', '.join(excluded)}`.",
-                    ephemeral=True
-                 )
-                 return
-
+            # Determine project root (assuming cogs folder is one level down)
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            project_root = os.path.abspath(os.path.join(script_dir, '..'))
+
+            previous = None
+            if mode == 'changed':
+                saved = await DB.get_kv(manifest_key)
+                previous = json.loads(saved) if saved else None
+                if previous is None:
+                    await ctx.send("No earlier export of this scope is recorded; sending everything.", ephemeral=True)
+
+            plan = await asyncio.to_thread(plan_export, project_root, excluded, previous)
+            if not plan.files:
+                await ctx.send(f"No files changed since the last `{zip_type}` export "
+                               f"({plan.unchanged} unchanged).", ephemeral=True)
+                return
+
+            # Discord's upload limit for this server (10 MB in DMs), with a small margin
+            limit = int(getattr(ctx.guild, 'filesize_limit', 10 * 1024 * 1024) * 0.98)
+            estimate_mb = plan.estimated_size / (1024 * 1024)
+            print(f"Zipping {len(plan.files)} files for a {zip_type} {mode} export, ~{estimate_mb:.2f} MB estimated")
             await ctx.send(
-                f"Here is the `{zip_type}` zip file of the bot's source code ({zip_size_mb:.2f} MB).",
-                file=discord.File(zip_buffer, filename=filename),
+                f"Zipping {len(plan.files)} files (~{estimate_mb:.2f} MB estimated, "
+                f"about {max(1, math.ceil(plan.estimated_size / limit))} volume(s) of up to "
+                f"{limit / (1024 * 1024):.1f} MB)"
+                + (f", {plan.unchanged} unchanged files skipped" if previous else "") + "...",
                 ephemeral=True
             )
+
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            name = f"bot_files_{zip_type}{'_changes' if previous else ''}_{timestamp}"
+            try:
+                volumes = await asyncio.to_thread(build_volumes, plan.files, limit, name)
+            except ValueError as e:
+                await ctx.send(f"Error: {e}. Excluded items/folders: `{', '.join(sorted(excluded))}`.", ephemeral=True)
+                return
+
+            total_mb = sum(v.size for v in volumes) / (1024 * 1024)
+            print(f"Zip export created: {len(volumes)} volume(s), {total_mb:.2f} MB")
+            for volume in volumes:
+                await ctx.send(
+                    f"`{volume.filename}`: {volume.count} files ({volume.size / (1024 * 1024):.2f} MB)",
+                    file=discord.File(volume.fp, filename=volume.filename),
+                    ephemeral=True
+                )
+            await DB.set_kv(manifest_key, json.dumps(plan.manifest))
         except Exception as e:
             await ctx.send(f"An error occurred while creating the zip file: {type(e).__name__} - {e}", ephemeral=True)
             print(f"Zip creation failed: {e}") # Log detailed error
+        finally:
+            for volume in volumes:
+                volume.fp.close()
 
 
 async def setup(bot: commands.Bot):
@@ -5,6 +5,9 @@ import json
 from discord import Embed, app_commands
 from pathlib import Path
 from utils.helper import async_load_json, async_save_json
+from utils.input_router import InputRouter
+from utils.board_engine import Connect4, Engine, TicTacToe
+from utils.leaderboard import TopK
 import random
 import asyncio
 import time
@@ -18,6 +21,12 @@ BANK_PATH = Path(__file__).parent.parent / 'data' / 'games_bank.json'
 MEMORY_EMOJIS = ['🌟', '🎈', '🎨', '🎭', '🎪', '🎯', '🎲', '🎰', '🎳', '🎼', '🎵', '🎹', '🎸', '🎮', '🎲']
 WORD_LIST = ['python', 'coding', 'algorithm', 'programming', 'computer', 'software', 'developer', 'learning']
 MATH_OPERATORS = ['+', '-', '*']
+LEADERBOARD_SIZE = 10
+DIFFICULTY_CHOICES = [
+    app_commands.Choice(name='Easy', value='easy'),
+    app_commands.Choice(name='Medium', value='medium'),
+    app_commands.Choice(name='Hard', value='hard'),
+]
 
 # Load game content from bank
 TRUTH = [
@@ -51,7 +60,18 @@ class Games(commands.Cog):
         self.bot = bot
         self.data = {'leaderboard': {}, 'game_scores': {}, 'quiz_history': {}}
         self.current_quiz = {}
+        # replies to running games, routed by (channel, player)
+        self.inputs = InputRouter()
+        self._index_scores()
         bot.loop.create_task(self.load_data())
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if not message.author.bot:
+            self.inputs.dispatch(message)
+
+    async def cog_unload(self):
+        self.inputs.cancel_all()
         
     async def show_quiz_results(self, ctx, user_id: int, questions, answers, score: int):
         """Show detailed quiz results in an embed"""
@@ -88,21 +108,17 @@ class Games(commands.Cog):
         await async_save_json(DATA_PATH, self.data)
         
         # Show quiz leaderboard
-        quiz_scores = []
-        for uid, scores in self.data.get('game_scores', {}).items():
-            if 'quiz' in scores:
-                quiz_scores.append((uid, scores['quiz']))
+        quiz_scores = self.game_boards.get('quiz')
         
         if quiz_scores:
-            quiz_scores.sort(key=lambda x: x[1], reverse=True)
-            leaderboard = []
-            for i, (uid, score) in enumerate(quiz_scores[:5], 1):
+            def line(i, uid, score):
                 user = self.bot.get_user(int(uid))
                 name = user.display_name if user else 'Unknown'
-                leaderboard.append(f"{i}. {name}: {score}")
+                return f"{i}. {name}: {score}\n"
             
+            leaderboard = self._leaderboard_lines(('quiz-top5', None), quiz_scores, line, n=5)
             embed.add_field(name="Quiz Leaderboard (Top 5)", 
-                          value='\n'.join(leaderboard), inline=False)
+                          value=leaderboard.rstrip('\n'), inline=False)
         
         await ctx.send(embed=embed)
 
@@ -123,6 +139,38 @@ class Games(commands.Cog):
         except FileNotFoundError:
             self.data = {'leaderboard': {}, 'game_scores': {}, 'quiz_history': {}}
             await async_save_json(DATA_PATH, self.data)
+        self._index_scores()
+
+    def _index_scores(self):
+        """Build the leaderboards from self.data; update_score keeps them current afterwards."""
+        self.data.setdefault('game_scores', {})
+        self.data.setdefault('leaderboard', {})
+        self.data.setdefault('quiz_history', {})
+        self.game_boards = {}
+        self.total_board = TopK(LEADERBOARD_SIZE)
+        for uid, games in self.data['game_scores'].items():
+            for game, score in games.items():
+                self.game_boards.setdefault(game, TopK(LEADERBOARD_SIZE)).set(uid, score)
+            self.total_board.set(uid, sum(games.values()))
+        self.quiz_board = TopK(LEADERBOARD_SIZE)
+        stats = self.data.get('quiz_stats', {})
+        self.quiz_totals = {'quizzes': 0, 'questions': 0, 'accuracy': 0.0}
+        for uid, points in self.data['leaderboard'].items():
+            self.quiz_board.set(uid, points)
+            self.quiz_totals['quizzes'] += len(stats.get(uid, {}).get('quizzes', []))
+            self.quiz_totals['questions'] += stats.get(uid, {}).get('total_questions', 0)
+            self.quiz_totals['accuracy'] += stats.get(uid, {}).get('accuracy', 0)
+        # (board name, guild) -> (board version, rendered text)
+        self._leaderboard_text = {}
+
+    def _leaderboard_lines(self, cache_key, board: TopK, render, n: int = None) -> str:
+        """Rendered board text, re-rendered only when the board's top entries change."""
+        cached = self._leaderboard_text.get(cache_key)
+        if cached and cached[0] == board.version:
+            return cached[1]
+        text = ''.join(render(i, uid, score) for i, (uid, score) in enumerate(board.top(n), 1))
+        self._leaderboard_text[cache_key] = (board.version, text)
+        return text
 
     async def update_score(self, user_id: int, game: str, score: int):
         """Update a user's score for a specific game"""
@@ -131,6 +179,9 @@ class Games(commands.Cog):
         if game not in self.data['game_scores'][str(user_id)]:
             self.data['game_scores'][str(user_id)][game] = 0
         self.data['game_scores'][str(user_id)][game] += score
+        self.game_boards.setdefault(game, TopK(LEADERBOARD_SIZE)).set(
+            str(user_id), self.data['game_scores'][str(user_id)][game])
+        self.total_board.add(str(user_id), score)
         await async_save_json(DATA_PATH, self.data)
         
     async def show_game_stats(self, ctx, user_id: int, game: str, score: int, additional_fields: dict = None):
@@ -150,10 +201,6 @@ class Games(commands.Cog):
         embed.set_footer(text=f"Play more games to improve your score!")
         await ctx.send(embed=embed)
         
-    def generate_board(self, size=3):
-        """Generate a board for games like tic-tac-toe"""
-        return [[' ' for _ in range(size)] for _ in range(size)]
-        
     def format_board(self, board):
         """Format a board for display"""
         rows = []
@@ -171,20 +218,6 @@ class Games(commands.Cog):
             rows.append(' '.join(formatted_row))
         return '\n'.join(rows)
         
-    def check_win(self, board, player):
-        """Check if a player has won on the board"""
-        size = len(board)
-        # Check rows and columns
-        for i in range(size):
-            if all(board[i][j] == player for j in range(size)) or \
-               all(board[j][i] == player for j in range(size)):
-                return True
-        # Check diagonals
-        if all(board[i][i] == player for i in range(size)) or \
-           all(board[i][size-1-i] == player for i in range(size)):
-            return True
-        return False
-
     @commands.hybrid_command(name='memory-match', description='Play memory matching game')
     async def memory_match(self, ctx):
         """Play a memory matching game with emojis"""
@@ -202,14 +235,11 @@ class Games(commands.Cog):
         matched = 0
         first = None
         
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
-            
         while matched < 6:
             try:
                 # Get player move
                 await ctx.send("Enter row,col (e.g. 1,2):")
-                response = await self.bot.wait_for('message', check=check, timeout=30)
+                response = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
                 
                 try:
                     row, col = map(lambda x: int(x.strip())-1, response.content.split(','))
@@ -255,12 +285,9 @@ class Games(commands.Cog):
         
         await ctx.send(f"Unscramble this word: **{scrambled}**")
         
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
-            
         try:
             start_time = time.time()
-            msg = await self.bot.wait_for('message', check=check, timeout=30)
+            msg = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
             
             if msg.content.lower() == word:
                 duration = time.time() - start_time
@@ -366,10 +393,7 @@ class Games(commands.Cog):
             
             try:
                 start_time = time.time()
-                msg = await self.bot.wait_for('message', 
-                    check=lambda m: m.author == ctx.author and m.channel == ctx.channel,
-                    timeout=30
-                )
+                msg = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
                 
                 duration = time.time() - start_time
                 total_time += duration
@@ -451,43 +475,33 @@ class Games(commands.Cog):
 
         embed = discord.Embed(title="🏆 Game Leaderboard", color=discord.Color.gold())
         
+        def line(i, user_id, score):
+            user = self.bot.get_user(int(user_id)) or "Unknown User"
+            return f"{i}. {user}: {score} points\n"
+
         if game:
             # Show leaderboard for specific game
-            scores = []
-            for user_id, games in self.data['game_scores'].items():
-                if game in games:
-                    scores.append((user_id, games[game]))
-            
+            scores = self.game_boards.get(game)
             if not scores:
                 await ctx.send(f"No scores recorded for {game} yet!")
                 return
 
-            scores.sort(key=lambda x: x[1], reverse=True)
-            leaderboard = ""
-            for i, (user_id, score) in enumerate(scores[:10], 1):
-                user = self.bot.get_user(int(user_id)) or "Unknown User"
-                leaderboard += f"{i}. {user}: {score} points\n"
-            
+            leaderboard = self._leaderboard_lines((game, None), scores, line)
             embed.add_field(name=f"{game} Leaderboard", value=leaderboard or "No scores yet!")
 
         else:
             # Show top players across all games
-            total_scores = {}
-            for user_id, games in self.data['game_scores'].items():
-                total_scores[user_id] = sum(games.values())
-
-            scores = sorted(total_scores.items(), key=lambda x: x[1], reverse=True)
-            leaderboard = ""
-            for i, (user_id, score) in enumerate(scores[:10], 1):
-                user = self.bot.get_user(int(user_id)) or "Unknown User"
-                leaderboard += f"{i}. {user}: {score} points\n"
-            
+            leaderboard = self._leaderboard_lines(('overall', None), self.total_board, line)
             embed.add_field(name="Overall Leaderboard", value=leaderboard or "No scores yet!")
 
+        stats = self.inputs.stats
+        embed.set_footer(text=f"{stats['waiting']} games waiting for a move (peak {stats['peak']}) | "
+                              f"{stats['delivered']} moves routed, {stats['timeouts']} timed out")
         await ctx.send(embed=embed)
 
     async def cog_load(self):
         self.data = await async_load_json(DATA_PATH, default={'leaderboard': {}})
+        self._index_scores()
         # Load banks if available
         if BANK_PATH.exists():
             try:
@@ -514,12 +528,9 @@ class Games(commands.Cog):
         
         await ctx.send("I'm thinking of a number between 1 and 100. You have 7 attempts!")
         
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
-            
         while attempts < max_attempts:
             try:
-                msg = await self.bot.wait_for('message', check=check, timeout=30)
+                msg = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
                 
                 try:
                     guess = int(msg.content)
@@ -569,11 +580,8 @@ class Games(commands.Cog):
         
         await ctx.send(embed=embed)
         
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
-            
         try:
-            msg = await self.bot.wait_for('message', check=check, timeout=30)
+            msg = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
             answer = msg.content.lower()
             
             if answer in answers:
@@ -675,9 +683,6 @@ class Games(commands.Cog):
         correct_answers = []
         wrong_answers = []
 
-        def check(m: discord.Message):
-            return m.author.id == user.id and m.channel.id == getattr(channel, 'id', None)
-
         for q in questions:
             embed = Embed(title='Quiz', description=q['q'])
             for i, c in enumerate(q['choices'], start=1):
@@ -696,7 +701,7 @@ class Games(commands.Cog):
 
             start_time = time.time()
             try:
-                msg = await self.bot.wait_for('message', check=check, timeout=30)
+                msg = await self.inputs.wait(channel.id, user.id, timeout=30)
                 answer_time = time.time() - start_time
                 total_time += answer_time
                 
@@ -734,6 +739,7 @@ class Games(commands.Cog):
         # Update leaderboard
         lb = self.data.setdefault('leaderboard', {})
         lb[uid] = lb.get(uid, 0) + points
+        self.quiz_board.set(uid, lb[uid])
         
         # Update detailed stats
         stats = self.data.setdefault('quiz_stats', {})
@@ -753,6 +759,7 @@ class Games(commands.Cog):
             'avg_time': total_time / len(questions),
             'questions': len(questions)
         }
+        previous_accuracy = user_stats['accuracy']
         user_stats['quizzes'].append(quiz_result)
         user_stats['total_questions'] += len(questions)
         user_stats['correct_answers'] += score
@@ -766,6 +773,9 @@ class Games(commands.Cog):
         total_questions = user_stats['total_questions']
         if total_questions > 0:
             user_stats['accuracy'] = (user_stats['correct_answers'] / total_questions) * 100
+        self.quiz_totals['quizzes'] += 1
+        self.quiz_totals['questions'] += len(questions)
+        self.quiz_totals['accuracy'] += user_stats['accuracy'] - previous_accuracy
         
         try:
             await async_save_json(DATA_PATH, self.data)
@@ -855,20 +865,16 @@ class Games(commands.Cog):
         )
         
         # Add global stats
-        total_quizzes = sum(len(stats.get(uid, {}).get('quizzes', [])) for uid in lb)
-        total_questions = sum(stats.get(uid, {}).get('total_questions', 0) for uid in lb)
-        avg_accuracy = sum(stats.get(uid, {}).get('accuracy', 0) for uid in lb) / len(lb) if lb else 0
+        total_quizzes = self.quiz_totals['quizzes']
+        total_questions = self.quiz_totals['questions']
+        avg_accuracy = self.quiz_totals['accuracy'] / len(lb) if lb else 0
         
         embed.add_field(name="Total Quizzes Taken", value=str(total_quizzes), inline=True)
         embed.add_field(name="Questions Answered", value=str(total_questions), inline=True)
         embed.add_field(name="Average Accuracy", value=f"{avg_accuracy:.1f}%", inline=True)
         
-        # Sort and filter players
-        items = sorted(lb.items(), key=lambda x: x[1], reverse=True)[:10]
-        
         # Format leaderboard with detailed stats
-        leaderboard = []
-        for i, (uid, pts) in enumerate(items, 1):
+        def entry(i, uid, pts):
             member = ctx.guild.get_member(int(uid))
             name = member.display_name if member else uid
             
@@ -877,14 +883,14 @@ class Games(commands.Cog):
             quizzes = len(user_stats.get('quizzes', []))
             fastest = user_stats.get('fastest_answer', 0)
             
-            entry = (
+            return (
                 f"**{i}.** __{name}__\n"
                 f"Points: **{pts}** | Accuracy: **{accuracy:.1f}%**\n"
-                f"Quizzes: {quizzes} | Best Time: {fastest:.1f}s"
+                f"Quizzes: {quizzes} | Best Time: {fastest:.1f}s\n\n"
             )
-            leaderboard.append(entry)
             
-        embed.description = '\n\n'.join(leaderboard) if leaderboard else 'No scores yet!'
+        leaderboard = self._leaderboard_lines(('quiz', ctx.guild.id), self.quiz_board, entry).rstrip('\n')
+        embed.description = leaderboard or 'No scores yet!'
         
         # Add time period note
         embed.set_footer(text='Leaderboard updates after each quiz completed')
@@ -908,12 +914,9 @@ class Games(commands.Cog):
         
         await ctx.send(embed=embed)
         
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
-            
         try:
             start_time = time.time()
-            msg = await self.bot.wait_for('message', check=check, timeout=60)
+            msg = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=60)
             end_time = time.time()
             
             duration = end_time - start_time
@@ -939,52 +942,60 @@ class Games(commands.Cog):
             await ctx.send("Time's up!")
             
     @commands.hybrid_command(name='tic-tac-toe', description='Play Tic-tac-toe')
-    async def tictactoe(self, ctx):
+    @app_commands.describe(difficulty='How hard the bot plays')
+    @app_commands.choices(difficulty=DIFFICULTY_CHOICES)
+    async def tictactoe(self, ctx, difficulty: str = 'medium'):
         """Play Tic-tac-toe against the bot"""
-        board = self.generate_board(3)
-        player = 'X'
-        bot_char = 'O'
+        difficulty = difficulty.lower()
+        if difficulty not in TicTacToe.LEVELS:
+            await ctx.send(f"Choose a difficulty: {', '.join(TicTacToe.LEVELS)}")
+            return
+        game = TicTacToe()
+        engine = Engine(TicTacToe)
+
+        def board():
+            marks = {None: ' ', 0: 'X', 1: 'O'}
+            return [[marks[game.cell_owner(row * 3 + col)] for col in range(3)] for row in range(3)]
         
         # Show initial board
-        msg = await ctx.send(f"Tic-tac-toe\nYour move (row,col):\n{self.format_board(board)}")
+        msg = await ctx.send(f"Tic-tac-toe\nYour move (row,col):\n{self.format_board(board())}")
         
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
-            
         while True:
             try:
                 # Player move
-                response = await self.bot.wait_for('message', check=check, timeout=30)
+                response = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
                 try:
                     row, col = map(lambda x: int(x.strip())-1, response.content.split(','))
-                    if not (0 <= row < 3 and 0 <= col < 3) or board[row][col] != ' ':
+                    if not (0 <= row < 3 and 0 <= col < 3) or not game.can_play(row * 3 + col):
                         await ctx.send("Invalid move! Try again.")
                         continue
                 except:
                     await ctx.send("Invalid format! Use row,col (e.g. 1,2)")
                     continue
                     
-                board[row][col] = player
-                if self.check_win(board, player):
-                    await msg.edit(content=f"You win!\n{self.format_board(board)}")
+                if game.play(row * 3 + col):
+                    await msg.edit(content=f"You win!\n{self.format_board(board())}")
                     await self.update_score(ctx.author.id, 'tic-tac-toe', 100)
                     return
                     
                 # Bot move
-                moves = [(i, j) for i in range(3) for j in range(3) if board[i][j] == ' ']
-                if not moves:
-                    await msg.edit(content=f"It's a draw!\n{self.format_board(board)}")
+                if game.is_full():
+                    await msg.edit(content=f"It's a draw!\n{self.format_board(board())}")
                     await self.update_score(ctx.author.id, 'tic-tac-toe', 50)
                     return
                     
-                bot_row, bot_col = random.choice(moves)
-                board[bot_row][bot_col] = bot_char
-                await msg.edit(content=f"Your move (row,col):\n{self.format_board(board)}")
+                result = await asyncio.to_thread(engine.best_move, game.position, game.mask, difficulty)
+                bot_won = game.play(result.move)
+                await msg.edit(content=f"Your move (row,col):\n{self.format_board(board())}")
                 
-                if self.check_win(board, bot_char):
-                    await msg.edit(content=f"Bot wins!\n{self.format_board(board)}")
+                if bot_won:
+                    await msg.edit(content=f"Bot wins!\n{self.format_board(board())}")
                     await self.update_score(ctx.author.id, 'tic-tac-toe', 25)
                     return
+                if game.is_full():
+                    await msg.edit(content=f"It's a draw!\n{self.format_board(board())}")
+                    await self.update_score(ctx.author.id, 'tic-tac-toe', 50)
+                    return
                     
             except asyncio.TimeoutError:
                 await ctx.send("Game timed out!")
@@ -1044,64 +1055,38 @@ class Games(commands.Cog):
         await self.update_score(ctx.author.id, 'rps', score)
         
     @commands.hybrid_command(name='connect4', description='Play Connect 4 game')
-    async def connect4(self, ctx):
+    @app_commands.describe(difficulty='How hard the bot plays')
+    @app_commands.choices(difficulty=DIFFICULTY_CHOICES)
+    async def connect4(self, ctx, difficulty: str = 'medium'):
         """Play Connect 4 against the bot"""
-        WIDTH = 7
-        HEIGHT = 6
-        board = [[' ' for _ in range(WIDTH)] for _ in range(HEIGHT)]
+        difficulty = difficulty.lower()
+        if difficulty not in Connect4.LEVELS:
+            await ctx.send(f"Choose a difficulty: {', '.join(Connect4.LEVELS)}")
+            return
+        WIDTH = Connect4.WIDTH
+        HEIGHT = Connect4.HEIGHT
+        game = Connect4()
+        engine = Engine(Connect4)
         
         def format_board():
+            marks = {None: ' ', 0: 'X', 1: 'O'}
             nums = ' '.join(str(i+1) for i in range(WIDTH))
-            rows = ['\n'.join('|' + ''.join(row) + '|' for row in board)]
-            return f'```\n{nums}\n{"-"*(WIDTH+2)}\n{"".join(rows)}\n{"-"*(WIDTH+2)}```'
-            
-        def can_place(col):
-            return board[0][col] == ' '
-            
-        def place_piece(col, piece):
-            for row in range(HEIGHT-1, -1, -1):
-                if board[row][col] == ' ':
-                    board[row][col] = piece
-                    return row
-            return -1
-            
-        def check_winner(row, col, piece):
-            # Check horizontal
-            for c in range(max(0, col-3), min(col+1, WIDTH-3)):
-                if all(board[row][c+i] == piece for i in range(4)):
-                    return True
-                    
-            # Check vertical
-            if row <= HEIGHT-4 and all(board[row+i][col] == piece for i in range(4)):
-                return True
-                
-            # Check diagonals
-            for r, c in [(row-i, col-i) for i in range(4)]:
-                if 0 <= r <= HEIGHT-4 and 0 <= c <= WIDTH-4:
-                    if all(board[r+i][c+i] == piece for i in range(4)):
-                        return True
-                        
-            for r, c in [(row-i, col+i) for i in range(4)]:
-                if 0 <= r <= HEIGHT-4 and 0 <= c >= 3:
-                    if all(board[r+i][c-i] == piece for i in range(4)):
-                        return True
-            return False
+            rows = '\n'.join('|' + ''.join(marks[game.owner(col, row)] for col in range(WIDTH)) + '|'
+                             for row in range(HEIGHT-1, -1, -1))
+            return f'```\n{nums}\n{"-"*(WIDTH+2)}\n{rows}\n{"-"*(WIDTH+2)}```'
             
         # Game loop
         msg = await ctx.send(f"Connect 4\nYour move (1-7):{format_board()}")
         
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
-            
         while True:
             try:
-                response = await self.bot.wait_for('message', check=check, timeout=30)
+                response = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
                 try:
                     col = int(response.content) - 1
                     if not (0 <= col < WIDTH):
                         await ctx.send("Please choose a column between 1 and 7")
                         continue
-                    if not can_place(col):
+                    if not game.can_play(col):
                         await ctx.send("That column is full!")
                         continue
                 except ValueError:
@@ -1109,28 +1094,30 @@ class Games(commands.Cog):
                     continue
                     
                 # Player move
-                row = place_piece(col, 'X')
-                if check_winner(row, col, 'X'):
+                if game.play(col):
                     await msg.edit(content=f"You win!{format_board()}")
                     await self.update_score(ctx.author.id, 'connect4', 100)
                     return
                     
                 # Bot move
-                valid_moves = [c for c in range(WIDTH) if can_place(c)]
-                if not valid_moves:
+                if game.is_full():
                     await msg.edit(content=f"It's a draw!{format_board()}")
                     await self.update_score(ctx.author.id, 'connect4', 50)
                     return
                     
-                bot_col = random.choice(valid_moves)
-                bot_row = place_piece(bot_col, 'O')
+                result = await asyncio.to_thread(engine.best_move, game.position, game.mask, difficulty)
+                bot_won = game.play(result.move)
                 
                 await msg.edit(content=f"Your move (1-7):{format_board()}")
                 
-                if check_winner(bot_row, bot_col, 'O'):
+                if bot_won:
                     await msg.edit(content=f"Bot wins!{format_board()}")
                     await self.update_score(ctx.author.id, 'connect4', 25)
                     return
+                if game.is_full():
+                    await msg.edit(content=f"It's a draw!{format_board()}")
+                    await self.update_score(ctx.author.id, 'connect4', 50)
+                    return
                     
             except asyncio.TimeoutError:
                 await ctx.send("Game timed out!")
@@ -1146,12 +1133,10 @@ class Games(commands.Cog):
     async def guess(self, ctx):
         number = random.randint(1, 100)
         await ctx.send('I have chosen a number between 1 and 100. Send guesses in chat. You have 10 attempts.')
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel
         attempts = 10
         for i in range(attempts):
             try:
-                msg = await self.bot.wait_for('message', check=check, timeout=30)
+                msg = await self.inputs.wait(ctx.channel.id, ctx.author.id, timeout=30)
                 val = int(msg.content.strip())
                 if val == number:
                     await ctx.send(f'Correct! You took {i+1} attempts.')
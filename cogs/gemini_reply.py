@@ -11,13 +11,14 @@ Notes:
 """
 import os
 import json
-import aiohttp
 import asyncio
 from discord.ext import commands
 import discord
 from pathlib import Path
 from dotenv import load_dotenv
 from utils.db import DB
+from utils.llm import llm, LLMRateLimited, PASSIVE_MAX_WAIT
+from utils.http_client import http_client
 
 BASE_DIR = Path(__file__).parents[1]
 load_dotenv(BASE_DIR / '.env')
@@ -41,7 +42,6 @@ if GEMINI_API_KEY:
 class GeminiReply(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
 
     async def is_enabled_for_channel(self, guild_id: int, channel_id: int) -> bool:
         """Return True if Gemini is enabled for the given guild/channel.
@@ -83,25 +83,39 @@ class GeminiReply(commands.Cog):
         prompt = f"{system}\n\nPlease explain the following questions and provide step-by-step solutions where applicable:\n{questions_text}\nKeep the explanation brief (max ~120 tokens)."
         return await self._call_gemini(prompt)
 
-    def cog_unload(self):
-        try:
-            asyncio.create_task(self.session.close())
-        except Exception:
-            pass
+    async def _call_gemini(self, prompt: str, max_tokens: int = 120, guild_id: int = None, channel_id: int = None,
+                           quiet_when_busy: bool = False) -> str:
+        """Call Gemini through the shared LLM client (cache, coalescing, rate limits).
 
-    async def _call_gemini(self, prompt: str, max_tokens: int = 120) -> str:
-        """Call Gemini API with typing indicator and response limiting.
-        
         Args:
             prompt: The text prompt to send to Gemini
             max_tokens: Maximum tokens in response (default 120 for concise replies)
-            
+            guild_id/channel_id: Scope used for per-channel rate limiting
+            quiet_when_busy: Return None instead of a notice when the channel is rate limited,
+                and give up after a short wait instead of holding the listener
+
         Returns:
-            Generated response text
+            Generated response text, or a short error string
         """
         if not GEMINI_API_KEY:
             return "(Gemini API key not configured)"
-        
+
+        async def fetch():
+            return await self._request_gemini(prompt, max_tokens)
+
+        try:
+            return await llm.generate(f"{max_tokens}|{prompt}", fetch, model=GEMINI_MODEL, scope='gemini_reply',
+                                      guild_id=guild_id, channel_id=channel_id,
+                                      max_wait=PASSIVE_MAX_WAIT if quiet_when_busy else None)
+        except LLMRateLimited:
+            if quiet_when_busy:
+                return None
+            return "(Gemini is busy in this channel, please try again shortly)"
+        except Exception as e:
+            return f"(Error calling Gemini API: {e})"
+
+    async def _request_gemini(self, prompt: str, max_tokens: int = 120) -> str:
+        """Perform the raw Gemini REST call. Raises on API errors so they are never cached."""
         url = f"{GEMINI_ENDPOINT}/{GEMINI_MODEL}:generateText"
         
         # System prompt to ensure consistent bot behavior
@@ -130,23 +144,21 @@ class GeminiReply(commands.Cog):
             "maxOutputTokens": 120,
             "temperature": 0.45,
         }
-        try:
-            async with self.session.post(url, headers=HEADERS, json=payload, timeout=30) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    return f"(Gemini API error {resp.status}: {text})"
-                data = await resp.json()
-                # Response format may vary; attempt to extract generated text
-                if 'candidates' in data and isinstance(data['candidates'], list) and data['candidates']:
-                    text = data['candidates'][0].get('content', '') or ''
-                    # Trim to a safe length (keep it short)
-                    if len(text) > 800:
-                        text = text[:800].rsplit('\n', 1)[0] + '...'
-                    return text
-                # fallback
-                return json.dumps(data)
-        except Exception as e:
-            return f"(Error calling Gemini API: {e})"
+        # Generation is safe to repeat, so transient failures are retried
+        resp = await http_client.post(url, headers=HEADERS, json=payload, timeout=30, retries=2)
+        if resp.status != 200:
+            text = await resp.text()
+            raise RuntimeError(f"Gemini API error {resp.status}: {text}")
+        data = await resp.json()
+        # Response format may vary; attempt to extract generated text
+        if 'candidates' in data and isinstance(data['candidates'], list) and data['candidates']:
+            text = data['candidates'][0].get('content', '') or ''
+            # Trim to a safe length (keep it short)
+            if len(text) > 800:
+                text = text[:800].rsplit('\n', 1)[0] + '...'
+            return text
+        # fallback
+        return json.dumps(data)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -192,30 +204,15 @@ class GeminiReply(commands.Cog):
         )
         prompt = f"{system}\n\nUser: {content}\nAssistant:"
 
-        # Process with typing indicator
-        async with message.channel.typing():
-            try:
-                # Log interaction
-                print(f"[GEMINI] Message from {message.author}: {content[:100]}")
-                
-                # Get response from Gemini
-                reply = await self._call_gemini(prompt, max_tokens=120)
-                
-                # Clean and format response
-                if not isinstance(reply, str):
-                    reply = str(reply)
-                
-                if len(reply) > 1000:
-                    reply = reply[:1000].rsplit('\n', 1)[0] + '...'
-                    
-            except Exception as e:
-                print(f"[GEMINI] Error processing message: {e}")
-                return
+        # Process with typing indicator; a single Gemini call per message
         try:
             async with message.channel.typing():
-                # Log to terminal
-                print(f"[GEMINI] Prompt for {message.author}: {content[:200]}")
-                reply = await self._call_gemini(prompt)
+                print(f"[GEMINI] Message from {message.author}: {content[:100]}")
+                reply = await self._call_gemini(prompt, max_tokens=120, guild_id=guild_id,
+                                                channel_id=channel_id, quiet_when_busy=True)
+                if reply is None:
+                    print(f"[GEMINI] Channel {channel_id} rate limited; skipping reply")
+                    return
                 # Limit reply size to avoid huge messages
                 if not isinstance(reply, str):
                     reply = str(reply)
@@ -62,8 +62,7 @@ class Leaderboard(commands.Cog):
         streak = await db.DB.get_streak(ctx.author.id)
         streak_count = streak['count'] if streak else 0
         
-        total_logs = await db.DB.get_user_logs(ctx.author.id)
-        total_minutes = sum(log['minutes'] for log in total_logs)
+        total_minutes = (await db.DB.get_user_stats(ctx.author.id)).total_minutes
         total_xp = total_minutes * XP_PER_MINUTE
         
         # Apply streak bonus
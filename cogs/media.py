@@ -7,7 +7,8 @@ Features
 - Optionally send a random file (`!sendrandom <#channel>`)
 - Only users with manage_guild or administrator permissions can send files
 - Uses non-blocking file reads by delegating to an executor
-- Supports files up to 5GB in size using chunked uploads
+- Supports files up to 5GB in size using chunked uploads (.partN files plus a
+  .manifest.json with checksums for reassembly)
 
 Usage:
  - Prefix: !listfiles
@@ -25,15 +26,28 @@ from pathlib import Path
 import asyncio
 import os
 from typing import Optional
-import random
 import logging
-import math
 from utils.db import DB
-import aiohttp
+from utils.chunked_upload import upload_in_parts
+from utils.edit_scheduler import EditScheduler
+from utils.media_catalog import MediaCatalog
+from utils.media_store import MediaStore, dedup_report
 
 # Maximum file size (5GB)
 MAX_FILE_SIZE = 5 * 1024 * 1024 * 1024  # 5GB in bytes
-CHUNK_SIZE = 25 * 1024 * 1024  # 25MB chunks
+CHUNK_SIZE = 25 * 1024 * 1024  # 25MB chunks, capped at the guild's upload limit
+UPLOAD_CONCURRENCY = int(os.getenv('MEDIA_UPLOAD_CONCURRENCY', '3'))  # parts in flight at once
+UPLOADS_PER_SECOND = float(os.getenv('MEDIA_UPLOADS_PER_SECOND', '1'))  # part messages per second
+SCAN_INTERVAL = float(os.getenv('MEDIA_SCAN_INTERVAL', '60'))  # seconds between media/ catalog scans
+RECOMPRESS = os.getenv('MEDIA_RECOMPRESS', '0') != '0'  # lossless PNG re-encoding on upload
+INGEST_WORKERS = int(os.getenv('MEDIA_INGEST_WORKERS', '2'))
+
+
+def _format_size(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.1f} {unit}' if unit != 'B' else f'{int(size)} B'
+        size /= 1024
 
 
 LOGGER = logging.getLogger('studybot.media')
@@ -43,17 +57,36 @@ MEDIA_ROOT = Path(__file__).parent.parent / 'media'
 class MediaManager(commands.Cog):
 
     async def media_file_autocomplete(self, interaction: discord.Interaction, current: str):
-        files = await self._list_files()
-        return [app_commands.Choice(name=f, value=f) for f in files if current.lower() in f.lower()][:25]
+        # answered from the in-memory catalog index; no filesystem walk per keystroke
+        return [app_commands.Choice(name=f, value=f) for f in self.catalog.search(current, limit=25)]
     """Cog to manage media files stored in a `media/` folder."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # progress edits are coalesced, so fast uploads don't edit once per part
+        self.edits = EditScheduler(rate=1)
         MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+        # uploads are stored once per content hash; names are hardlinks to the blob
+        self.store = MediaStore(MEDIA_ROOT, recompress=RECOMPRESS, workers=INGEST_WORKERS)
+        self.catalog = MediaCatalog(MEDIA_ROOT, scan_interval=SCAN_INTERVAL, after_refresh=self._prune_blobs)
+
+    async def cog_load(self):
+        await self.catalog.load()
+        self.catalog.start_watching()
+
+    async def cog_unload(self):
+        self.catalog.stop_watching()
+        self.store.close()
+        await self.edits.close()
+
+    async def _prune_blobs(self):
+        live = [e['sha256'] for e in self.catalog.entries.values()]
+        removed = await asyncio.to_thread(self.store.prune, live)
+        if removed:
+            LOGGER.info('Pruned %d unreferenced media blobs', removed)
 
     async def _list_files(self) -> list:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, lambda: [p.relative_to(MEDIA_ROOT).as_posix() for p in MEDIA_ROOT.rglob('*') if p.is_file()])
+        return self.catalog.paths()
 
     async def _read_file_for_send(self, relative_path: str) -> Optional[tuple[Path, int]]:
         # Validate path to avoid traversal and confirm the file exists
@@ -71,33 +104,62 @@ class MediaManager(commands.Cog):
         except Exception:
             return None
 
+    @staticmethod
+    def _chunk_size(channel) -> int:
+        limit = getattr(getattr(channel, 'guild', None), 'filesize_limit', None)
+        return min(CHUNK_SIZE, limit) if limit else CHUNK_SIZE
+
+    async def _previous_upload(self, channel, sha256: Optional[str]):
+        """The manifest message of an earlier chunked upload of the same content to `channel`."""
+        if not sha256:
+            return None
+        message_id = await DB.get_kv(f'media_parts:{channel.id}:{sha256}')
+        if not message_id:
+            return None
+        try:
+            return await channel.fetch_message(int(message_id))
+        except (discord.NotFound, discord.Forbidden):
+            return None
+
     async def _send_large_file(self, channel: discord.TextChannel, file_path: Path, progress_msg=None):
-        """Send a large file in chunks"""
-        file_size = file_path.stat().st_size
-        chunks = math.ceil(file_size / CHUNK_SIZE)
-        
-        async def update_progress(current_chunk):
+        """Send a large file as .partN chunks followed by a checksum manifest"""
+        def update_progress(done, total):
             if progress_msg:
-                progress = (current_chunk / chunks) * 100
-                await progress_msg.edit(content=f"Uploading: {progress:.1f}% complete...")
+                self.edits.schedule(progress_msg, content=f"Uploading: {done / total * 100:.1f}% complete...")
 
         try:
-            with open(file_path, 'rb') as f:
-                for i in range(chunks):
-                    chunk = f.read(CHUNK_SIZE)
-                    chunk_file = discord.File(io.BytesIO(chunk), filename=f"{file_path.name}.part{i+1}")
-                    await channel.send(file=chunk_file)
-                    await update_progress(i + 1)
-                
+            # the same content was already split into this channel: link it instead of re-uploading
+            relative = file_path.resolve().relative_to(MEDIA_ROOT.resolve()).as_posix()
+            sha256 = (self.catalog.entries.get(relative) or {}).get('sha256')
+            previous = await self._previous_upload(channel, sha256)
+            if previous:
                 if progress_msg:
-                    await progress_msg.edit(content="Upload complete!")
+                    self.edits.schedule(progress_msg, content=f"Already uploaded here: {previous.jump_url}")
                 return True
+
+            _, manifest_msg = await upload_in_parts(channel, file_path, self._chunk_size(channel),
+                                                    concurrency=UPLOAD_CONCURRENCY, rate=UPLOADS_PER_SECOND,
+                                                    on_progress=update_progress)
+            if sha256:
+                await DB.set_kv(f'media_parts:{channel.id}:{sha256}', str(manifest_msg.id))
+            if progress_msg:
+                self.edits.schedule(progress_msg, content="Upload complete! See the .manifest.json to reassemble and verify.")
+            return True
         except Exception as e:
             LOGGER.exception('Failed to send large file')
             if progress_msg:
-                await progress_msg.edit(content=f"Failed to upload: {str(e)}")
+                self.edits.schedule(progress_msg, content=f"Failed to upload: {str(e)}")
             return False
 
+    async def _send_target(self, ctx, channel: discord.TextChannel, target: Path, size: int) -> bool:
+        """Send a media file directly, or in parts when it exceeds the upload limit"""
+        if size > self._chunk_size(channel):
+            progress_msg = await ctx.send("📤 Starting large file upload...")
+            return await self._send_large_file(channel, target, progress_msg)
+        # discord.File streams from the open file; nothing is read up front
+        await channel.send(file=File(str(target), filename=target.name))
+        return True
+
     async def _get_allowed_role(self, guild_id: int) -> Optional[int]:
         key = f'media_allowed_role_{guild_id}'
         val = await DB.get_kv(key)
@@ -134,6 +196,29 @@ class MediaManager(commands.Cog):
         await DB.set_kv(f'media_allowed_role_{ctx.guild.id}', str(role.id))
         await ctx.send(f'Set allowed media role to {role.name}')
 
+    @commands.hybrid_command(name='mediastats', description='Show media library size and deduplication savings')
+    @commands.has_permissions(manage_guild=True)
+    async def mediastats(self, ctx):
+        report = dedup_report(self.catalog.entries.values())
+        embed = discord.Embed(title='📦 Media Library', color=discord.Color.blurple())
+        embed.add_field(name='Files', value=f"{report['files']} ({report['unique']} unique)")
+        embed.add_field(name='Logical size', value=_format_size(report['logical_bytes']))
+        embed.add_field(name='Unique content', value=_format_size(report['unique_bytes']))
+        embed.add_field(name='Dedup ratio', value=f"{report['ratio']:.2f}x")
+        stats = self.store.stats
+        embed.set_footer(text=f"This session: {stats['ingested']} uploads, {stats['deduplicated']} deduplicated, "
+                              f"{_format_size(stats['recompressed_bytes_saved'])} saved by recompression")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='mediadedup', description='Hardlink duplicate files already in the media folder')
+    @commands.has_permissions(manage_guild=True)
+    async def mediadedup(self, ctx):
+        await ctx.defer()
+        before = dedup_report(self.catalog.entries.values())
+        merged = await self.store.adopt(list(self.catalog.entries.values()))
+        await ctx.send(f'✅ Merged {merged} duplicate files into shared storage '
+                       f"(up to {_format_size(before['logical_bytes'] - before['unique_bytes'])} reclaimed).")
+
     @commands.hybrid_command(name='upload', description='Upload a file to the server media folder')
     async def upload(self, ctx):
         """Upload a file to the media folder (Admin or allowed role only)"""
@@ -151,15 +236,18 @@ class MediaManager(commands.Cog):
             
         # Process each attachment
         for att in attachments:
-            filename = att.filename
-            save_path = MEDIA_ROOT / filename.replace('..', '')
-            save_path.parent.mkdir(parents=True, exist_ok=True)
+            filename = att.filename.replace('..', '')
             
             try:
                 data = await att.read()
-                loop = asyncio.get_running_loop()
-                await loop.run_in_executor(None, save_path.write_bytes, data)
-                await ctx.send(f'✅ Successfully uploaded {filename}')
+                stored = await self.store.ingest(data, filename)
+                await self.catalog.add_file(stored['path'])
+                note = ''
+                if stored['deduplicated']:
+                    note = ' (identical content already stored; no extra disk used)'
+                elif stored['saved']:
+                    note = f" (recompressed, saved {_format_size(stored['saved'])})"
+                await ctx.send(f'✅ Successfully uploaded {filename}{note}')
             except Exception as e:
                 LOGGER.exception('Failed to upload')
                 await ctx.send(f'❌ Failed to upload {filename}: {e}')
@@ -183,45 +271,13 @@ class MediaManager(commands.Cog):
             return
             
         target, size = result
-        progress_msg = None
-        
         try:
-            if size > 8 * 1024 * 1024:  # If file is larger than 8MB
-                progress_msg = await ctx.send("📤 Starting large file upload...")
-                success = await self._send_large_file(channel, target, progress_msg)
-                if success:
-                    await ctx.send(f'✅ Sent {filename} to {channel.mention} in chunks')
-            else:
-                await channel.send(file=File(str(target), filename=target.name))
-                await ctx.send(f'✅ Sent {filename} to {channel.mention}')
+            chunked = size > self._chunk_size(channel)
+            if await self._send_target(ctx, channel, target, size):
+                await ctx.send(f'✅ Sent {filename} to {channel.mention}' + (' in chunks' if chunked else ''))
         except Exception as e:
             LOGGER.exception('Failed to send file')
             await ctx.send(f'❌ Failed to send file: {e}')
-        if not interaction.user.guild_permissions.manage_guild:
-            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
-            return
-        
-        await interaction.response.defer()
-        result = await self._read_file_for_send(filename)
-        if not result:
-            await interaction.followup.send('File not found or invalid path.', ephemeral=True)
-            return
-            
-        target, size = result
-        progress_msg = None
-        
-        try:
-            if size > 8 * 1024 * 1024:  # If file is larger than 8MB
-                progress_msg = await interaction.followup.send("Starting large file upload...", wait=True)
-                success = await self._send_large_file(channel, target, progress_msg)
-                if success:
-                    await interaction.followup.send(f'Sent {filename} to {channel.mention} in chunks', ephemeral=True)
-            else:
-                await channel.send(file=File(str(target), filename=target.name))
-                await interaction.followup.send(f'Sent {filename} to {channel.mention}', ephemeral=True)
-        except Exception as e:
-            LOGGER.exception('Failed to send file (slash)')
-            await interaction.followup.send(f'Failed to send file: {e}', ephemeral=True)
 
     @commands.hybrid_command(name='sendrandom', description='Send a random file from media folder')
     @app_commands.describe(
@@ -232,12 +288,11 @@ class MediaManager(commands.Cog):
         """Send a random file from the media folder to a channel (Admin only)"""
         await ctx.defer()
         
-        files = await self._list_files()
-        if not files:
+        filename = self.catalog.random_path()
+        if not filename:
             await ctx.send('❌ No files available to send.')
             return
             
-        filename = random.choice(files)
         result = await self._read_file_for_send(filename)
         if not result:
             await ctx.send('❌ Failed to access the chosen file.')
@@ -245,36 +300,12 @@ class MediaManager(commands.Cog):
             
         target, size = result
         try:
-            if size > 8 * 1024 * 1024:  # If file is larger than 8MB
-                progress_msg = await ctx.send("📤 Starting large file upload...")
-                success = await self._send_large_file(channel, target, progress_msg)
-                if success:
-                    await ctx.send(f'✅ Sent random file {filename} to {channel.mention} in chunks')
-            else:
-                await channel.send(file=File(str(target), filename=target.name))
-                await ctx.send(f'✅ Sent random file {filename} to {channel.mention}')
+            chunked = size > self._chunk_size(channel)
+            if await self._send_target(ctx, channel, target, size):
+                await ctx.send(f'✅ Sent random file {filename} to {channel.mention}' + (' in chunks' if chunked else ''))
         except Exception as e:
             LOGGER.exception('Failed to send random file')
             await ctx.send(f'❌ Failed to send file: {e}')
-        if not interaction.user.guild_permissions.manage_guild:
-            await interaction.response.send_message('You do not have permission to use this command.', ephemeral=True)
-            return
-        await interaction.response.defer()
-        files = await self._list_files()
-        if not files:
-            await interaction.followup.send('No files to send.', ephemeral=True)
-            return
-        filename = random.choice(files)
-        target = await self._read_file_for_send(filename)
-        if not target:
-            await interaction.followup.send('Failed to find chosen file.', ephemeral=True)
-            return
-        try:
-            await channel.send(file=File(str(target), filename=target.name))
-            await interaction.followup.send(f'Sent {filename} to {channel.mention}', ephemeral=True)
-        except Exception as e:
-            LOGGER.exception('Failed to send random file (slash)')
-            await interaction.followup.send(f'Failed to send file: {e}', ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
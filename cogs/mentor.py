@@ -5,12 +5,11 @@ from discord import app_commands
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-import google.generativeai as genai
 from utils import db
+from utils.llm import llm, genai_configured, get_genai_model
+from utils.lazy_import import register_warm_up
 
 
-CONFIG_PATH = Path(__file__).parent.parent / 'config.json'
-
 # Mock study plan for when Gemini is unavailable
 MOCK_PLAN = """Here's your 5-day Chemistry study plan:
 
@@ -45,33 +44,28 @@ class Mentor(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.gemini = None
-        self.model = None
         
     async def cog_load(self):
-        try:
-            config = json.loads(CONFIG_PATH.read_text())
-            if 'gemini_api_key' in config:
-                genai.configure(api_key=config['gemini_api_key'])
-                self.model = genai.GenerativeModel('gemini-pro')
-                self.gemini = True
-        except Exception:
-            self.gemini = False
+        self.gemini = genai_configured()
+        if self.gemini:
+            register_warm_up('google.generativeai')
 
-    async def _generate_plan(self, user_id: int, subject: str, days: int) -> str:
+    async def _generate_plan(self, user_id: int, subject: str, days: int,
+                             guild_id: int = None, channel_id: int = None) -> str:
         """Generate a study plan using Gemini or fall back to mock."""
-        if not self.gemini or not self.model:
+        model = await get_genai_model() if self.gemini else None
+        if not model:
             return MOCK_PLAN.replace('5-day', f'{days}-day').replace('Chemistry', subject)
             
         try:
-            # Get user's study logs for context
-            logs = await db.DB.get_user_logs(user_id)
-            total_minutes = sum(log['minutes'] for log in logs)
+            # Get user's study totals for context
+            total_minutes = (await db.DB.get_user_stats(user_id)).total_minutes
             
-            # Get progress in this subject
-            progress = await db.DB.get_progress(user_id, None)
+            # Get progress in this subject (best across servers)
+            progress = await db.DB.get_best_progress(user_id)
             subject_progress = 0
             for p in progress:
-                if p['subject'].lower() == subject.lower():
+                if p['subject'] == subject.lower():
                     subject_progress = p['percent']
                     break
                     
@@ -96,8 +90,8 @@ Day 1: Topic (time)
 
 Keep it focused and achievable."""
 
-            response = await self.model.generate_content(prompt)
-            return response.text if response else MOCK_PLAN
+            text = await llm.generate_content(model, prompt, scope='mentor', guild_id=guild_id, channel_id=channel_id)
+            return text or MOCK_PLAN
         except Exception:
             return MOCK_PLAN
 
@@ -113,7 +107,11 @@ Keep it focused and achievable."""
             return
             
         async with ctx.typing():
-            plan = await self._generate_plan(ctx.author.id, subject, days)
+            plan = await self._generate_plan(
+                ctx.author.id, subject, days,
+                guild_id=ctx.guild.id if ctx.guild else None,
+                channel_id=ctx.channel.id
+            )
             
             embed = discord.Embed(
                 title=f"📚 {days}-Day {subject} Study Plan",
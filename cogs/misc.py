@@ -1,8 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import datetime
-import aiohttp
+from utils.http_client import http_client
+from utils.timebuckets import local_time, utc_time
 
 
 class Misc(commands.Cog):
@@ -14,14 +14,13 @@ class Misc(commands.Cog):
     @commands.hybrid_command(name='time', description='Get current UTC time')
     async def time_cmd(self, ctx: commands.Context):
         """Show current UTC time."""
-        now = datetime.datetime.utcnow()
+        now = utc_time.now()
         await ctx.send(f"Current UTC time: {now.strftime('%H:%M:%S')} (UTC)")
 
     @commands.hybrid_command(name='date', description='Show today\'s date')
     async def date_cmd(self, ctx: commands.Context):
-        """Show today's date (UTC)."""
-        today = datetime.datetime.utcnow().date()
-        await ctx.send(f"Today's date (UTC): {today.isoformat()}")
+        """Show today's date in the bot's timezone (BOT_TIMEZONE)."""
+        await ctx.send(f"Today's date ({local_time.tz_name}): {local_time.day_key()}")
 
     @commands.hybrid_command(name='weather', description='Get weather for a location')
     @app_commands.describe(location="Location name, e.g. London or 94016")
@@ -30,10 +29,9 @@ class Misc(commands.Cog):
         loc = location.strip() or "your location"
         url = f"https://wttr.in/{location.replace(' ', '%20')}?format=3"
         try:
-            async with aiohttp.ClientSession() as s:
-                async with s.get(url, timeout=10) as r:
-                    text = await r.text()
-                    await ctx.send(f"Weather for {loc}: {text}")
+            r = await http_client.get(url, timeout=10)
+            text = await r.text()
+            await ctx.send(f"Weather for {loc}: {text}")
         except Exception:
             await ctx.send("Could not fetch weather. Try again later or provide a location.")
 
@@ -6,13 +6,11 @@ import json
 import random
 from pathlib import Path
 from utils.helper import async_load_json
-import google.generativeai as genai
+from utils.llm import llm, genai_configured, get_genai_model, PASSIVE_MAX_WAIT
+from utils.lazy_import import register_warm_up
 from typing import Optional
 
 
-# Load Gemini config
-CONFIG_PATH = Path(__file__).parent.parent / 'config.json'
-
 # Pre-defined responses for when Gemini is not available
 MOTIVATION_RESPONSES = {
     'demotivated': [
@@ -45,17 +43,11 @@ class Motivation(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.gemini = None
-        self.model = None
         
     async def cog_load(self):
-        try:
-            config = json.loads(CONFIG_PATH.read_text())
-            if 'gemini_api_key' in config:
-                genai.configure(api_key=config['gemini_api_key'])
-                self.model = genai.GenerativeModel('gemini-pro')
-                self.gemini = True
-        except Exception:
-            self.gemini = False  # Fall back to pre-defined responses
+        self.gemini = genai_configured()  # Fall back to pre-defined responses
+        if self.gemini:
+            register_warm_up('google.generativeai')
 
     def _get_preset_response(self, content: str) -> Optional[str]:
         """Get a pre-defined response based on message content."""
@@ -65,9 +57,12 @@ class Motivation(commands.Cog):
                 return random.choice(responses)
         return None
 
-    async def _get_gemini_response(self, content: str) -> Optional[str]:
+    async def _get_gemini_response(self, content: str, guild_id: Optional[int] = None,
+                                   channel_id: Optional[int] = None,
+                                   max_wait: Optional[float] = None) -> Optional[str]:
         """Get an AI-generated response using Gemini."""
-        if not self.gemini or not self.model:
+        model = await get_genai_model() if self.gemini else None
+        if not model:
             return None
             
         try:
@@ -81,8 +76,8 @@ class Motivation(commands.Cog):
             
             Include 1-2 relevant emojis. Respond directly without any prefixes."""
 
-            response = await self.model.generate_content(prompt)
-            return response.text if response else None
+            return await llm.generate_content(model, prompt, scope='motivation', guild_id=guild_id,
+                                              channel_id=channel_id, max_wait=max_wait)
         except Exception:
             return None
 
@@ -101,8 +96,13 @@ class Motivation(commands.Cog):
         if not any(t in content for t in triggers):
             return
             
-        # Try Gemini first, fall back to preset
-        response = await self._get_gemini_response(message.content)
+        # Try Gemini first, fall back to preset (don't hold the listener if the channel is busy)
+        response = await self._get_gemini_response(
+            message.content,
+            guild_id=message.guild.id if message.guild else None,
+            channel_id=message.channel.id,
+            max_wait=PASSIVE_MAX_WAIT
+        )
         if not response:
             response = self._get_preset_response(message.content)
             
@@ -116,7 +116,11 @@ class Motivation(commands.Cog):
             await ctx.send("Tell me what's troubling you, and I'll help motivate you!")
             return
             
-        response = await self._get_gemini_response(message)
+        response = await self._get_gemini_response(
+            message,
+            guild_id=ctx.guild.id if ctx.guild else None,
+            channel_id=ctx.channel.id
+        )
         if not response:
             response = self._get_preset_response(message)
         if not response:
@@ -7,6 +7,12 @@ Features:
 
 Implementation notes:
 - Spotify API is NOT used. The cog scrapes the public Spotify playlist page to extract track titles (best-effort), then uses yt-dlp to search YouTube for each track and stream audio via ffmpeg.
+- Each guild gets its own `GuildPlayer` (voice client, queue, volume, player task), so many guilds can stream at once.
+  While a track plays, the player resolves the next track's info and stream URL in the background so transitions are gapless.
+- Extraction results are cached in SQLite by video id (utils/track_cache.py); a track is only re-extracted once its
+  signed stream URL is about to expire. The playlist is synced by diffing entry ids, at most every PLAYLIST_SYNC_INTERVAL seconds.
+- Track completion is signalled by the voice client's after= callback; now-playing progress edits for all guilds go
+  through one ticker and a shared rate-limited EditScheduler.
 - Dependencies: yt-dlp, PyNaCl, ffmpeg must be installed on host.
 """
 
@@ -16,205 +22,173 @@ from __future__ import annotations
 import asyncio
 import os
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import discord
-import yt_dlp
 from discord import Embed
 from discord.ext import commands
 from discord.utils import get
 
+from utils.lazy_import import lazy_import, register_warm_up
+from utils.edit_scheduler import EditScheduler
+from utils.presence import PRIORITY_MUSIC
+from utils.track_cache import REFRESH_MARGIN, TrackCache, stream_expiry, video_id_from_url
+
+yt_dlp = lazy_import('yt_dlp')
+
 # Updated with your new playlist URL
 YTM_PLAYLIST = os.getenv('YTM_PLAYLIST', 'https://www.youtube.com/playlist?list=PLmbqRMXb-lI4cd56TptqtNCn9Ibe9fLmO')
-
-class Music(commands.Cog):
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
+COOKIES_PATH = '/etc/secrets/cookies.txt'
+PLAYLIST_SYNC_INTERVAL = int(os.getenv('PLAYLIST_SYNC_INTERVAL', str(6 * 3600)))
+# Seconds between now-playing progress refreshes, and the bot-wide embed edit budget
+PROGRESS_INTERVAL = int(os.getenv('MUSIC_PROGRESS_INTERVAL', '10'))
+EMBED_EDITS_PER_SECOND = float(os.getenv('MUSIC_EDITS_PER_SECOND', '2'))
+FFMPEG_BEFORE_OPTIONS = '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin'
+
+
+def _format_duration(seconds: Optional[int]) -> str:
+    if seconds is None: return 'N/A'
+    try:
+        seconds = int(seconds)
+        m, s = divmod(seconds, 60)
+        h, m = divmod(m, 60)
+        return f'{h}:{m:02d}:{s:02d}' if h else f'{m:02d}:{s:02d}'
+    except (ValueError, TypeError):
+         return 'N/A'
+
+
+class GuildPlayer:
+    """Playback state for one guild: voice client, queue and the player task."""
+
+    def __init__(self, cog: 'Music', guild: discord.Guild):
+        self.cog = cog
+        self.bot = cog.bot
+        self.guild = guild
         self.voice_client: Optional[discord.VoiceClient] = None
-        self.queue: List[str] = []
-        self._player_task = None
-        self._playlist_cache = []
+        self.queue: List[str] = list(cog._playlist_cache)
         self.volume = 0.15
-
-        self._announce_channel = {}
-        self._announce_channel_secondary = {}
-        self._now_playing_task = {}
-        self._track_start_time = {}
-        self._track_duration = {}
-        self.current_track_info = {}
-
-    async def cog_load(self):
-        print(f'[MUSIC] Cog loaded. Attempting to pre-load playlist from: {YTM_PLAYLIST}')
-        await self._load_ytm_playlist()
-        if not self._playlist_cache:
-            print('[MUSIC] Warning: Playlist cache is empty. Ensure URL is valid and cookies are set correctly.')
-        else:
-            self.queue = list(self._playlist_cache)
-
-    async def _load_ytm_playlist(self):
-        """Loads the YouTube playlist using the secure cookies file from Render's secret path."""
-        cookies_path = '/etc/secrets/cookies.txt'
-
-        try:
-            if not os.path.exists(cookies_path):
-                print(f"[MUSIC] CRITICAL ERROR: Secret cookies file not found at {cookies_path}.")
-                return
-
-            print(f'[MUSIC] Attempting playlist extraction with secret cookies from {cookies_path}...')
-            ytdl_opts = {
-                'quiet': True,
-                'extract_flat': False,
-                'cachedir': False,
-                'noplaylist': False,
-                'force_generic_extractor': False,
-                'cookies': cookies_path
-            }
-            ytdl = yt_dlp.YoutubeDL(ytdl_opts)
-
-            info = await asyncio.to_thread(ytdl.extract_info, YTM_PLAYLIST, download=False)
-
-            entries = info.get('entries', []) if info else []
-            urls = [e.get('webpage_url') for e in entries if e and e.get('webpage_url')]
-            self._playlist_cache = urls[:100] # Limiting to 100 tracks for stability
-            print(f'[MUSIC] Successfully loaded {len(self._playlist_cache)} entries from {YTM_PLAYLIST}')
-
-        except Exception as e:
-            print(f'[MUSIC] Failed to load YTM playlist: {e}')
-            self._playlist_cache = []
-
-    def _build_now_playing_embed(self, info: dict) -> discord.Embed:
-        title = info.get('title', 'Unknown Title')
-        url = info.get('webpage_url')
-        thumbnail = info.get('thumbnail')
-        duration = info.get('duration')
-        artist = info.get('uploader', 'Unknown Artist')
-
-        embed = Embed(title=title, url=url, color=discord.Color.green())
-        if thumbnail:
-            embed.set_thumbnail(url=thumbnail)
-
-        embed.add_field(name="Artist/Channel", value=artist, inline=True)
-        embed.add_field(name="Duration", value=self._format_duration(duration), inline=True)
-        embed.add_field(name="Progress", value="Starting...", inline=False)
-        return embed
-
-    async def _announce_now_playing(self, guild: discord.Guild, info: dict):
-        guild_id = guild.id
-        embed = self._build_now_playing_embed(info)
-
-        if guild_id in self._now_playing_task:
-            self._now_playing_task[guild_id].cancel()
-
-        sent_msgs = []
-        channels_to_send = [ch for ch in [self._announce_channel.get(guild_id), self._announce_channel_secondary.get(guild_id)] if ch]
-        channels_to_send = list(dict.fromkeys(channels_to_send))
-
-        for channel in channels_to_send:
+        self.current_info: Optional[dict] = None
+        self.track_start_time: Optional[float] = None
+        self.announce_channel: Optional[discord.abc.Messageable] = None
+        self.announce_channel_secondary: Optional[discord.abc.Messageable] = None
+        self._ytdl = None
+        self._task: Optional[asyncio.Task] = None
+        self.now_playing_msgs: List[discord.Message] = []
+        # (url, task resolving its info) for the track after the current one
+        self._prefetch: Optional[Tuple[str, asyncio.Task]] = None
+
+    @property
+    def is_active(self) -> bool:
+        return bool(self.voice_client and (self.voice_client.is_playing() or self.voice_client.is_paused()))
+
+    async def _get_ytdl(self):
+        if self._ytdl is None:
+            ytdl_opts = {'format': 'bestaudio/best', 'noplaylist': True, 'quiet': True, 'default_search': 'auto', 'cachedir': False}
+            # Use cookies file for the yt-dlp instance used by the player as well
+            if os.path.exists(COOKIES_PATH):
+                ytdl_opts['cookies'] = COOKIES_PATH
+            else:
+                print("[MUSIC] Player loop: Cookie file not found, continuing without cookies.")
+            # One YoutubeDL per guild: instances are not safe to share between worker threads
+            self._ytdl = await asyncio.to_thread(lambda: yt_dlp.YoutubeDL(ytdl_opts))
+        return self._ytdl
+
+    async def _resolve(self, url: str) -> Optional[dict]:
+        video_id = video_id_from_url(url)
+        if video_id:
+            cached = await self.cog.track_cache.get(video_id)
+            if cached:
+                return cached
+        ytdl = await self._get_ytdl()
+        info = await asyncio.to_thread(ytdl.extract_info, url, download=False)
+        # Handle potential playlist entries if noplaylist=True failed
+        if info and 'entries' in info and info.get('entries'):
+            info = info['entries'][0]
+        if info:
             try:
-                m = await channel.send(embed=embed)
-                sent_msgs.append(m)
+                await self.cog.track_cache.put(info, video_id)
             except Exception as e:
-                print(f"[MUSIC] Failed to send now-playing message to channel {channel.id}: {e}")
-
-        if not sent_msgs:
+                print(f"[MUSIC] Failed to cache track info for {url}: {e}")
+        return info
+
+    def _next_url(self) -> Optional[str]:
+        if not self.queue and self.cog._playlist_cache:
+            # The playlist loops forever
+            self.queue = list(self.cog._playlist_cache)
+        return self.queue.pop(0) if self.queue else None
+
+    def _start_prefetch(self):
+        """Resolve the next queued track in the background while the current one plays."""
+        if self._prefetch or not (self.queue or self.cog._playlist_cache):
             return
-
-        self._track_start_time[guild_id] = time.time()
-        self._track_duration[guild_id] = info.get('duration')
-
-        async def updater():
-            try:
-                while True:
-                    await asyncio.sleep(5)
-                    elapsed = int(time.time() - self._track_start_time.get(guild_id, 0))
-                    dur = self._track_duration.get(guild_id)
-
-                    if not self.voice_client or not (self.voice_client.is_playing() or self.voice_client.is_paused()):
-                        break
-
-                    progress = f"{self._format_duration(elapsed)} / {self._format_duration(dur)}" if dur else "Live"
-
-                    for m in sent_msgs:
-                        try:
-                            new_embed = m.embeds[0]
-                            # Check if embed has enough fields before trying to set field at index 2
-                            if len(new_embed.fields) > 2:
-                                new_embed.set_field_at(2, name="Progress", value=progress, inline=False)
-                                await m.edit(embed=new_embed)
-                            else:
-                                # Handle cases where the embed might be different (e.g., first creation)
-                                print(f"[MUSIC] Warning: Embed for message {m.id} has fewer than 3 fields.")
-
-                        except (discord.NotFound, IndexError):
-                            sent_msgs.remove(m) # Remove if message deleted or embed structure issue
-                        except Exception as e:
-                            print(f"[MUSIC] Error updating now-playing message {m.id}: {e}")
-            except asyncio.CancelledError:
-                for m in sent_msgs:
-                    try:
-                        new_embed = m.embeds[0]
-                        new_embed.set_footer(text="Playback has ended.")
-                        new_embed.color = discord.Color.red()
-                        await m.edit(embed=new_embed)
-                    except Exception:
-                        pass # Ignore errors during cleanup
-
-        self._now_playing_task[guild_id] = self.bot.loop.create_task(updater())
-
-    def _format_duration(self, seconds: Optional[int]) -> str:
-        if seconds is None: return 'N/A'
-        try:
-            seconds = int(seconds)
-            m, s = divmod(seconds, 60)
-            h, m = divmod(m, 60)
-            return f'{h}:{m:02d}:{s:02d}' if h else f'{m:02d}:{s:02d}'
-        except (ValueError, TypeError):
-             return 'N/A'
-
-
-    def _ensure_player(self):
-        if not self._player_task or self._player_task.done():
-            self._player_task = self.bot.loop.create_task(self._player_loop())
+        url = self._next_url()
+        if url:
+            self._prefetch = (url, asyncio.create_task(self._resolve(url)))
+
+    async def _take_next(self) -> Tuple[Optional[str], Optional[dict]]:
+        if self._prefetch:
+            url, task = self._prefetch
+            self._prefetch = None
+            info = await task
+            # A long pause can outlive the prefetched signed URL
+            if info and info.get('url') and \
+                    stream_expiry(info['url']) < time.time() + (info.get('duration') or 0) + REFRESH_MARGIN:
+                info = await self._resolve(url)
+            return url, info
+        url = self._next_url()
+        if not url:
+            return None, None
+        return url, await self._resolve(url)
+
+    def _clear_prefetch(self):
+        if self._prefetch:
+            url, task = self._prefetch
+            if task.done() and not task.cancelled():
+                task.exception()  # already failed; nobody will await it now
+            task.cancel()
+            self.queue.insert(0, url)
+            self._prefetch = None
+
+    def ensure_running(self):
+        if not self._task or self._task.done():
+            self._task = self.bot.loop.create_task(self._player_loop())
+
+    async def stop(self):
+        """Stop playback, cancel background tasks and disconnect."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._clear_prefetch()
+        if self.voice_client:
+            if self.is_active:
+                self.voice_client.stop()
+            await self.voice_client.disconnect()
+            self.voice_client = None
+        self._end_now_playing()
+        self.current_info = None
 
     async def _player_loop(self):
-        ytdl_opts = {'format': 'bestaudio/best', 'noplaylist': True, 'quiet': True, 'default_search': 'auto', 'cachedir': False}
-        # Use cookies file for yt-dlp instance used in the player loop as well
-        cookies_path = '/etc/secrets/cookies.txt'
-        if os.path.exists(cookies_path):
-            ytdl_opts['cookies'] = cookies_path
-        else:
-             print("[MUSIC] Player loop: Cookie file not found, continuing without cookies.")
-
-        ytdl = yt_dlp.YoutubeDL(ytdl_opts)
-
         while True:
+            item_url = None
             try:
-                if not self.queue:
-                    if self._playlist_cache:
-                        self.queue = list(self._playlist_cache)
-                    else:
+                if not self.queue and not self._prefetch:
+                    if not self.cog._playlist_cache:
                         # If cache is also empty, wait and maybe try reloading
                         print("[MUSIC] Queue and cache empty, waiting...")
                         await asyncio.sleep(15)
-                        if not self._playlist_cache: # Try reloading if still empty
-                             await self._load_ytm_playlist()
+                        if not self.cog._playlist_cache: # Try reloading if still empty
+                             await self.cog._load_ytm_playlist()
                         continue
 
-                item_url = self.queue.pop(0)
-
                 if not self.voice_client or not self.voice_client.is_connected():
-                    self.queue.insert(0, item_url) # Re-add to front
-                    print("[MUSIC] Voice client disconnected, waiting to reconnect...")
+                    print(f"[MUSIC] Voice client disconnected in guild {self.guild.id}, waiting to reconnect...")
                     await asyncio.sleep(10)
                     continue
 
-                print(f"[MUSIC] Processing: {item_url}")
-                info = await asyncio.to_thread(ytdl.extract_info, item_url, download=False)
+                item_url, info = await self._take_next()
 
-                # Handle potential playlist entries if noplaylist=True failed
-                if 'entries' in info and info.get('entries'):
-                     info = info['entries'][0]
-                elif not info:
+                print(f"[MUSIC] Processing: {item_url}")
+                if not info:
                     print(f"[MUSIC] Failed to get info for {item_url}")
                     continue # Skip this item
 
@@ -223,36 +197,37 @@ class Music(commands.Cog):
                      print(f"[MUSIC] No stream URL found for {item_url}")
                      continue # Skip this item
 
-                guild = self.voice_client.channel.guild
-                self.current_track_info[guild.id] = info
-
+                self.current_info = info
                 title = info.get('title', 'Unknown Title')
-                artist = info.get('uploader', 'Unknown Artist')
-                activity = discord.Activity(type=discord.ActivityType.listening, name=f"🎵 {title} ~ {artist} ✨")
-                try:
-                    await self.bot.change_presence(activity=activity)
-                except Exception as e:
-                    print(f"[MUSIC] Failed to change presence: {e}")
-
 
-                await self._announce_now_playing(guild, info)
+                await self._announce_now_playing(info)
 
-                player = discord.FFmpegPCMAudio(stream_url, before_options='-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin', options='-vn')
+                player = discord.FFmpegPCMAudio(stream_url, before_options=FFMPEG_BEFORE_OPTIONS, options='-vn')
                 audio_source = discord.PCMVolumeTransformer(player, volume=self.volume)
 
-                self.voice_client.play(audio_source, after=lambda e: print(f'[MUSIC] Player error: {e}') if e else None)
+                # The after= callback runs on the audio thread when the track ends,
+                # is skipped or the voice client stops; hand it back to the loop
+                loop = asyncio.get_running_loop()
+                finished = loop.create_future()
 
-                while self.voice_client.is_playing() or self.voice_client.is_paused():
-                    await asyncio.sleep(1)
+                def after(error):
+                    if error:
+                        print(f'[MUSIC] Player error: {error}')
+                    loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(error))
+
+                self.voice_client.play(audio_source, after=after)
+                self.cog.refresh_presence()
+                # Resolve the following track while this one plays
+                self._start_prefetch()
+
+                await finished
+                self._end_now_playing()
 
                 print(f"[MUSIC] Finished playing: {title}")
-                # Clear activity after song finishes
-                try:
-                     # Set a default activity when nothing is playing, or clear it
-                     default_activity = discord.Activity(type=discord.ActivityType.listening, name="Music!")
-                     await self.bot.change_presence(activity=default_activity)
-                except Exception as e:
-                     print(f"[MUSIC] Failed to clear presence: {e}")
+                self.cog.refresh_presence()
+
+            except asyncio.CancelledError:
+                raise
 
             except yt_dlp.utils.DownloadError as e:
                  print(f"[MUSIC] DownloadError in player loop for {item_url}: {e}")
@@ -270,14 +245,182 @@ class Music(commands.Cog):
 
             except Exception as e:
                 print(f'[MUSIC] Unexpected player loop error: {e}')
-                try:
-                    # Reset presence on unexpected error
-                     default_activity = discord.Activity(type=discord.ActivityType.listening, name="Music!")
-                     await self.bot.change_presence(activity=default_activity)
-                except Exception as presence_e:
-                     print(f"[MUSIC] Failed to reset presence on error: {presence_e}")
+                self.cog.refresh_presence()
                 await asyncio.sleep(10) # Longer delay on unexpected errors
 
+    def progress_text(self, live_label: str = "Live") -> str:
+        elapsed = int(time.time() - (self.track_start_time or time.time()))
+        dur = (self.current_info or {}).get('duration')
+        return f"{_format_duration(elapsed)} / {_format_duration(dur)}" if dur else live_label
+
+    async def _announce_now_playing(self, info: dict):
+        embed = Music._build_now_playing_embed(info)
+        self._end_now_playing()
+
+        channels_to_send = [ch for ch in [self.announce_channel, self.announce_channel_secondary] if ch]
+        channels_to_send = list(dict.fromkeys(channels_to_send))
+
+        for channel in channels_to_send:
+            try:
+                m = await channel.send(embed=embed)
+                self.now_playing_msgs.append(m)
+            except Exception as e:
+                print(f"[MUSIC] Failed to send now-playing message to channel {channel.id}: {e}")
+
+        self.track_start_time = time.time()
+        if self.now_playing_msgs:
+            self.cog.ensure_progress_updates()
+
+    def progress_embed(self) -> Optional[discord.Embed]:
+        if not self.current_info:
+            return None
+        embed = Music._build_now_playing_embed(self.current_info)
+        embed.set_field_at(2, name="Progress", value=self.progress_text(), inline=False)
+        return embed
+
+    def _end_now_playing(self):
+        """Mark the current now-playing messages as finished (edits go through the shared scheduler)."""
+        if not self.now_playing_msgs:
+            return
+        embed = self.progress_embed() or discord.Embed()
+        embed.set_footer(text="Playback has ended.")
+        embed.color = discord.Color.red()
+        for m in self.now_playing_msgs:
+            self.cog.edits.schedule(m, embed=embed)
+        self.now_playing_msgs = []
+
+
+class Music(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.players: Dict[int, GuildPlayer] = {}
+        self._playlist_cache = []
+        self.track_cache = TrackCache()
+        # One edit queue and one progress ticker for every guild's now-playing embeds
+        self.edits = EditScheduler(rate=EMBED_EDITS_PER_SECOND)
+        self._progress_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        register_warm_up('yt_dlp')
+        if getattr(self.bot, 'presence', None):
+            self.bot.presence.register('music', self.now_playing_activity, priority=PRIORITY_MUSIC, rotate=False)
+        print(f'[MUSIC] Cog loaded. Attempting to pre-load playlist from: {YTM_PLAYLIST}')
+        # Start from the stored playlist; only hit the extractor when it is missing or stale
+        try:
+            self._playlist_cache = (await self.track_cache.playlist(YTM_PLAYLIST))[:100]
+            synced_at = await self.track_cache.playlist_synced_at(YTM_PLAYLIST)
+        except Exception as e:
+            print(f'[MUSIC] Failed to read stored playlist: {e}')
+            synced_at = 0
+        if not self._playlist_cache or time.time() - synced_at > PLAYLIST_SYNC_INTERVAL:
+            await self._load_ytm_playlist()
+        else:
+            print(f'[MUSIC] Using stored playlist ({len(self._playlist_cache)} entries)')
+        if not self._playlist_cache:
+            print('[MUSIC] Warning: Playlist cache is empty. Ensure URL is valid and cookies are set correctly.')
+
+    async def cog_unload(self):
+        for player in list(self.players.values()):
+            try:
+                await player.stop()
+            except Exception:
+                pass
+        self.players.clear()
+        if getattr(self.bot, 'presence', None):
+            self.bot.presence.unregister('music')
+        if self._progress_task:
+            self._progress_task.cancel()
+        await self.edits.close()
+
+    def now_playing_activity(self, shard_id: Optional[int] = None) -> Optional[discord.Activity]:
+        """Presence source: the track playing (or paused) in a guild on this shard."""
+        for player in self.players.values():
+            if not player.is_active or not player.current_info:
+                continue
+            if shard_id is not None and player.guild.shard_id != shard_id:
+                continue
+            title = player.current_info.get('title', 'Unknown Title')
+            artist = player.current_info.get('uploader', 'Unknown Artist')
+            return discord.Activity(type=discord.ActivityType.listening, name=f"🎵 {title} ~ {artist} ✨")
+        return None
+
+    def refresh_presence(self):
+        if getattr(self.bot, 'presence', None):
+            self.bot.presence.refresh()
+
+    def ensure_progress_updates(self):
+        if not self._progress_task or self._progress_task.done():
+            self._progress_task = self.bot.loop.create_task(self._progress_loop())
+
+    async def _progress_loop(self):
+        """Refresh the progress field of every active now-playing embed; stops when nothing plays."""
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            active = [p for p in self.players.values() if p.is_active and p.now_playing_msgs]
+            if not active:
+                return
+            for player in active:
+                embed = player.progress_embed()
+                if embed is None:
+                    continue
+                player.now_playing_msgs = [m for m in player.now_playing_msgs if m.id not in self.edits.gone]
+                for m in player.now_playing_msgs:
+                    self.edits.schedule(m, embed=embed)
+
+    def get_player(self, guild: discord.Guild) -> GuildPlayer:
+        player = self.players.get(guild.id)
+        if player is None:
+            player = GuildPlayer(self, guild)
+            self.players[guild.id] = player
+        return player
+
+    async def _load_ytm_playlist(self):
+        """Loads the YouTube playlist using the secure cookies file from Render's secret path."""
+        try:
+            if not os.path.exists(COOKIES_PATH):
+                print(f"[MUSIC] CRITICAL ERROR: Secret cookies file not found at {COOKIES_PATH}.")
+                return
+
+            print(f'[MUSIC] Attempting playlist extraction with secret cookies from {COOKIES_PATH}...')
+            # Flat extraction lists entry ids without resolving every video;
+            # tracks are extracted (and cached) when they are about to play
+            ytdl_opts = {
+                'quiet': True,
+                'extract_flat': 'in_playlist',
+                'cachedir': False,
+                'noplaylist': False,
+                'force_generic_extractor': False,
+                'cookies': COOKIES_PATH
+            }
+            # Build the extractor in the worker thread too: the first use imports yt_dlp
+            info = await asyncio.to_thread(
+                lambda: yt_dlp.YoutubeDL(ytdl_opts).extract_info(YTM_PLAYLIST, download=False))
+
+            entries = list(info.get('entries') or []) if info else []
+            added, removed = await self.track_cache.sync_playlist(YTM_PLAYLIST, entries)
+            self._playlist_cache = (await self.track_cache.playlist(YTM_PLAYLIST))[:100] # Limiting to 100 tracks for stability
+            print(f'[MUSIC] Successfully loaded {len(self._playlist_cache)} entries from {YTM_PLAYLIST} '
+                  f'(+{added} / -{removed} since last sync)')
+
+        except Exception as e:
+            print(f'[MUSIC] Failed to load YTM playlist: {e}')
+
+    @staticmethod
+    def _build_now_playing_embed(info: dict) -> discord.Embed:
+        title = info.get('title', 'Unknown Title')
+        url = info.get('webpage_url')
+        thumbnail = info.get('thumbnail')
+        duration = info.get('duration')
+        artist = info.get('uploader', 'Unknown Artist')
+
+        embed = Embed(title=title, url=url, color=discord.Color.green())
+        if thumbnail:
+            embed.set_thumbnail(url=thumbnail)
+
+        embed.add_field(name="Artist/Channel", value=artist, inline=True)
+        embed.add_field(name="Duration", value=_format_duration(duration), inline=True)
+        embed.add_field(name="Progress", value="Starting...", inline=False)
+        return embed
 
     @commands.hybrid_command(name='start', description='Starts the music bot in your voice channel.')
     async def start(self, ctx: commands.Context):
@@ -291,48 +434,41 @@ class Music(commands.Cog):
             await self._load_ytm_playlist()
             if not self._playlist_cache:
                  return await ctx.send("Failed to load playlist. Please check logs and ensure cookies are valid.")
-            self.queue = list(self._playlist_cache) # Load queue if successful
 
+        player = self.get_player(ctx.guild)
+        if not player.queue:
+            player.queue = list(self._playlist_cache) # Load queue if successful
 
-        if self.voice_client is None or not self.voice_client.is_connected():
+        if player.voice_client is None or not player.voice_client.is_connected():
             try:
-                self.voice_client = await channel.connect()
+                player.voice_client = await channel.connect()
             except Exception as e:
                 return await ctx.send(f"Failed to connect to voice channel: {e}")
         else:
             try:
-                await self.voice_client.move_to(channel)
+                await player.voice_client.move_to(channel)
             except Exception as e:
                  return await ctx.send(f"Failed to move to voice channel: {e}")
 
         await ctx.send(f'Joined **{channel.name}** and started playback. The playlist will loop forever.')
 
-        self._announce_channel[ctx.guild.id] = ctx.channel
+        player.announce_channel = ctx.channel
         voice_chat_channel = get(ctx.guild.text_channels, name=channel.name)
         if voice_chat_channel:
-            self._announce_channel_secondary[ctx.guild.id] = voice_chat_channel
+            player.announce_channel_secondary = voice_chat_channel
 
-        self._ensure_player()
+        player.ensure_running()
 
     @commands.hybrid_command(name='leave', description='Stops music and disconnects the bot (Bot Owner only).')
     async def leave(self, ctx: commands.Context):
         if not ctx.author.id == self.bot.owner_id:
             return await ctx.send("Only my owner can make me leave the voice channel.")
 
-        if self.voice_client:
-             # Stop player and cancel updater task
-            if self.voice_client.is_playing() or self.voice_client.is_paused():
-                self.voice_client.stop()
-            if ctx.guild.id in self._now_playing_task:
-                 self._now_playing_task[ctx.guild.id].cancel()
-                 del self._now_playing_task[ctx.guild.id] # Clean up task entry
-
-            await self.voice_client.disconnect()
-            self.voice_client = None
-            try:
-                await self.bot.change_presence(activity=None) # Clear activity on leave
-            except Exception as e:
-                 print(f"[MUSIC] Failed to clear presence on leave: {e}")
+        player = self.players.pop(ctx.guild.id, None) if ctx.guild else None
+        if player and player.voice_client:
+            # Stop player and cancel updater task
+            await player.stop()
+            self.refresh_presence()
             await ctx.send('Disconnected by owner.')
         else:
              await ctx.send("Not connected to a voice channel.")
@@ -343,12 +479,12 @@ class Music(commands.Cog):
         if not ctx.author.id == self.bot.owner_id:
             return await ctx.send("Only my owner can pause the music.")
 
-        if self.voice_client and self.voice_client.is_playing():
-            self.voice_client.pause()
+        player = self.players.get(ctx.guild.id) if ctx.guild else None
+        vc = player.voice_client if player else None
+        if vc and vc.is_playing():
+            vc.pause()
             await ctx.send("⏸️ Music paused.")
-            # Optionally change presence to indicate paused state
-            # await self.bot.change_presence(activity=discord.Activity(type=discord.ActivityType.listening, name="Paused"))
-        elif self.voice_client and self.voice_client.is_paused():
+        elif vc and vc.is_paused():
              await ctx.send("Music is already paused.")
         else:
              await ctx.send("Not playing anything to pause.")
@@ -359,21 +495,13 @@ class Music(commands.Cog):
         if not ctx.author.id == self.bot.owner_id:
             return await ctx.send("Only my owner can resume the music.")
 
-        if self.voice_client and self.voice_client.is_paused():
-            self.voice_client.resume()
+        player = self.players.get(ctx.guild.id) if ctx.guild else None
+        vc = player.voice_client if player else None
+        if vc and vc.is_paused():
+            vc.resume()
             await ctx.send("▶️ Music resumed.")
-            # Restore playing presence
-            info = self.current_track_info.get(ctx.guild.id)
-            if info:
-                 title = info.get('title', 'Unknown Title')
-                 artist = info.get('uploader', 'Unknown Artist')
-                 activity = discord.Activity(type=discord.ActivityType.listening, name=f"🎵 {title} ~ {artist} ✨")
-                 try:
-                    await self.bot.change_presence(activity=activity)
-                 except Exception as e:
-                    print(f"[MUSIC] Failed to restore presence on resume: {e}")
-
-        elif self.voice_client and self.voice_client.is_playing():
+
+        elif vc and vc.is_playing():
              await ctx.send("Music is already playing.")
         else:
              await ctx.send("Nothing is paused to resume.")
@@ -381,8 +509,9 @@ class Music(commands.Cog):
 
     @commands.hybrid_command(name='skip', description='Skips the current track.')
     async def skip(self, ctx: commands.Context):
-        if self.voice_client and self.voice_client.is_playing():
-            self.voice_client.stop() # stop() triggers the 'after' callback in play(), which starts the next song in the loop
+        player = self.players.get(ctx.guild.id) if ctx.guild else None
+        if player and player.voice_client and player.voice_client.is_playing():
+            player.voice_client.stop() # the player loop moves on to the (already prefetched) next track
             await ctx.send('Skipped to the next track. ⏩')
         else:
             await ctx.send("Not playing anything to skip.")
@@ -393,20 +522,22 @@ class Music(commands.Cog):
         if not (0 <= vol <= 200):
             return await ctx.send('Volume must be between 0 and 200.')
 
-        self.volume = vol / 100.0
+        player = self.players.get(ctx.guild.id) if ctx.guild else None
+        if not player or not player.voice_client:
+            return await ctx.send("Not connected to a voice channel.")
+
+        player.volume = vol / 100.0
         # Adjust volume if currently playing
-        if self.voice_client and self.voice_client.source:
+        if player.voice_client.source:
              # Ensure the source is a PCMVolumeTransformer
-            if isinstance(self.voice_client.source, discord.PCMVolumeTransformer):
-                self.voice_client.source.volume = self.volume
+            if isinstance(player.voice_client.source, discord.PCMVolumeTransformer):
+                player.voice_client.source.volume = player.volume
                 await ctx.send(f'Volume set to {vol}%.')
             else:
                  await ctx.send("Cannot change volume for the current audio source.")
-        elif self.voice_client:
+        else:
              # If connected but not playing, just set the value for the next track
              await ctx.send(f'Volume set to {vol}%. It will apply to the next track.')
-        else:
-             await ctx.send("Not connected to a voice channel.")
 
 
     @commands.hybrid_command(name='nowplaying', description='Shows details about the currently playing song.')
@@ -416,17 +547,14 @@ class Music(commands.Cog):
         if not guild_id:
             return await ctx.send("This command can only be used in a server.")
 
-        info = self.current_track_info.get(guild_id)
-
-        if not self.voice_client or not (self.voice_client.is_playing() or self.voice_client.is_paused()) or not info:
+        player = self.players.get(guild_id)
+        if not player or not player.is_active or not player.current_info:
             return await ctx.send('Not playing anything right now.')
 
-        embed = self._build_now_playing_embed(info)
+        embed = self._build_now_playing_embed(player.current_info)
 
         # Calculate and update progress before sending
-        elapsed = int(time.time() - self._track_start_time.get(guild_id, 0))
-        dur = self._track_duration.get(guild_id)
-        progress = f"{self._format_duration(elapsed)} / {self._format_duration(dur)}" if dur else "Live Stream / Unknown Duration"
+        progress = player.progress_text("Live Stream / Unknown Duration")
         # Check if embed has enough fields before setting
         if len(embed.fields) > 2:
             embed.set_field_at(2, name="Progress", value=progress, inline=False)
@@ -438,4 +566,4 @@ class Music(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(Music(bot))
\ No newline at end of file
+    await bot.add_cog(Music(bot))
@@ -25,8 +25,8 @@ class Owner(commands.Cog):
                 except Exception as e:
                     await ctx.send(f"❌ Error reloading {extension}: {e}")
                     return
-            # Sync commands
-            await self.bot.tree.sync()
+            # Sync commands (only scopes whose commands changed)
+            await self.bot.command_syncer.sync(guilds=self.bot.guilds)
             await ctx.send("✅ Bot restarted and all files reloaded successfully!")
         except Exception as e:
             await ctx.send(f"❌ Error during restart: {e}")
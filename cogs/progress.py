@@ -3,9 +3,9 @@ import discord
 from discord.ext import commands, tasks
 from pathlib import Path
 from utils.helper import async_load_json, async_save_json
-import datetime
 from discord import app_commands
 from utils import db
+from utils.timebuckets import local_time
 
 
 DATA_PATH = Path(__file__).parent.parent / 'data' / 'progress.json'
@@ -75,7 +75,7 @@ class Progress(commands.Cog):
         if not self.data.get('report_channel'):
             return
         # Check if today is Monday
-        if datetime.date.today().weekday() != 0:
+        if local_time.today().weekday() != 0:
             return
         ch_id = self.data['report_channel']
         channel = self.bot.get_channel(ch_id)
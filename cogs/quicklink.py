@@ -1,33 +1,51 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import qrcode
 import aiohttp
+from utils.http_client import http_client
 import asyncio
+import functools
+import io
 import os
-import tempfile
-from PIL import Image
-from pyzbar.pyzbar import decode
+from utils.lazy_import import lazy_import, is_available, register_warm_up
+
+qrcode = lazy_import('qrcode')
+Image = lazy_import('PIL.Image')
+pyzbar = lazy_import('pyzbar.pyzbar')
 
 # --- CONFIG ---
 API_URL = "https://quick-link-url-shortener.vercel.app/api/v1/st"
 API_KEY = os.getenv("QUICKLINK_API_KEY")  # set this in .env
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "256"))  # rendered QR PNGs kept in memory
+
+# (error correction level, box size, border) — qrcode.make()'s defaults
+DEFAULT_QR_STYLE = ("M", 10, 4)
+
+
+@functools.lru_cache(maxsize=QR_CACHE_SIZE)
+def render_qr_png(payload: str, style: tuple = DEFAULT_QR_STYLE) -> bytes:
+    """PNG bytes for a QR code; cached per (payload, style) so repeated links skip rendering."""
+    level, box_size, border = style
+    qr = qrcode.QRCode(
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{level}"),
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image().save(buffer)
+    return buffer.getvalue()
+
 
 class QuickLink(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.cleanup_temp.start()
-
-    # --- 🧹 Auto delete temp files every 5 mins ---
-    @tasks.loop(minutes=5)
-    async def cleanup_temp(self):
-        for f in os.listdir(tempfile.gettempdir()):
-            path = os.path.join(tempfile.gettempdir(), f)
-            if f.startswith("qr_") and os.path.isfile(path):
-                try:
-                    os.remove(path)
-                except:
-                    pass
+
+    async def cog_load(self):
+        register_warm_up('qrcode', 'PIL.Image')
+        if is_available('pyzbar'):
+            register_warm_up('pyzbar.pyzbar')
 
     # --- QR GENERATOR ---
     @app_commands.command(name="qrgen", description="Generate a QR code (text, link, wifi, email, whatsapp, etc.)")
@@ -70,11 +88,10 @@ class QuickLink(commands.Cog):
         elif qrtype.value == "message":
             qr_data = f"SMSTO:{data1}:{data2 or ''}"
 
-        temp_path = os.path.join(tempfile.gettempdir(), f"qr_{interaction.id}.png")
-        qr_img = qrcode.make(qr_data)
-        qr_img.save(temp_path)
+        # Render in memory in a worker thread; the first call also imports qrcode/PIL
+        png = await asyncio.to_thread(render_qr_png, qr_data)
 
-        file = discord.File(temp_path, filename="qr.png")
+        file = discord.File(io.BytesIO(png), filename="qr.png")
         embed = discord.Embed(title="✅ QR Code Generated", color=0x00ff99)
         embed.add_field(name="Type", value=qrtype.name)
         embed.add_field(name="Encoded Data", value=f"```{qr_data}```", inline=False)
@@ -95,14 +112,12 @@ class QuickLink(commands.Cog):
         except asyncio.TimeoutError:
             return await interaction.followup.send("⏰ Time out! You didn’t send any image.", ephemeral=True)
 
-        img_bytes = await msg.attachments[0].read()
-        temp_path = os.path.join(tempfile.gettempdir(), f"qr_{interaction.id}.png")
-        with open(temp_path, "wb") as f:
-            f.write(img_bytes)
+        attachment = msg.attachments[0]
+        img_bytes = await attachment.read()
 
-        # Try local decode
+        # Try local decode, straight from the downloaded bytes
         try:
-            decoded = decode(Image.open(temp_path))
+            decoded = await asyncio.to_thread(lambda: pyzbar.decode(Image.open(io.BytesIO(img_bytes))))
             if decoded:
                 result = decoded[0].data.decode("utf-8")
                 embed = discord.Embed(title="✅ QR Code Decoded (Local)", description=f"```{result}```", color=0x00ff66)
@@ -114,17 +129,17 @@ class QuickLink(commands.Cog):
         view = discord.ui.View()
         async def yes_callback(interact):
             await interact.response.defer()
-            async with aiohttp.ClientSession() as session:
-                form = aiohttp.FormData()
-                form.add_field("file", open(temp_path, "rb"), filename="qr.png", content_type="image/png")
-                async with session.post("https://api.qrserver.com/v1/read-qr-code/", data=form) as resp:
-                    data = await resp.json()
-                    text = data[0]["symbol"][0]["data"] if data and data[0]["symbol"][0]["data"] else None
-                    if text:
-                        embed = discord.Embed(title="✅ QR Code Decoded (via GoQR API)", description=f"```{text}```", color=0x00ffcc)
-                        await interaction.followup.send(embed=embed)
-                    else:
-                        await interaction.followup.send("❌ Could not decode even with external API.")
+            form = aiohttp.FormData()
+            form.add_field("file", img_bytes, filename=attachment.filename or "qr.png",
+                           content_type=attachment.content_type or "image/png")
+            resp = await http_client.post("https://api.qrserver.com/v1/read-qr-code/", data=form, retries=0)
+            data = await resp.json()
+            text = data[0]["symbol"][0]["data"] if data and data[0]["symbol"][0]["data"] else None
+            if text:
+                embed = discord.Embed(title="✅ QR Code Decoded (via GoQR API)", description=f"```{text}```", color=0x00ffcc)
+                await interaction.followup.send(embed=embed)
+            else:
+                await interaction.followup.send("❌ Could not decode even with external API.")
         async def no_callback(interact):
             await interact.response.send_message("🚫 Decode cancelled.", ephemeral=True)
 
@@ -143,17 +158,16 @@ class QuickLink(commands.Cog):
         headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
         payload = {"longUrl": url}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(API_URL, headers=headers, json=payload) as resp:
-                data = await resp.json()
-                if data.get("status") == "success":
-                    short_url = data["shortUrl"]
-                    embed = discord.Embed(title="✅ URL Shortened", color=0x00ff99)
-                    embed.add_field(name="Original", value=url, inline=False)
-                    embed.add_field(name="Shortened", value=short_url, inline=False)
-                    await interaction.followup.send(embed=embed)
-                else:
-                    await interaction.followup.send(f"❌ Error: {data.get('message', 'Unknown error')}", ephemeral=True)
+        resp = await http_client.post(API_URL, headers=headers, json=payload)
+        data = await resp.json()
+        if data.get("status") == "success":
+            short_url = data["shortUrl"]
+            embed = discord.Embed(title="✅ URL Shortened", color=0x00ff99)
+            embed.add_field(name="Original", value=url, inline=False)
+            embed.add_field(name="Shortened", value=short_url, inline=False)
+            await interaction.followup.send(embed=embed)
+        else:
+            await interaction.followup.send(f"❌ Error: {data.get('message', 'Unknown error')}", ephemeral=True)
 
 
 async def setup(bot):
@@ -1,79 +1,9 @@
 """
-Study cog: /log and /logs view commands to record study sessions and view history.
-
-Features:
-- Log study sessions
-- View study logs
-- Track streaks and progress
-"""
-import discord
-from discord.ext import commands
-from discord import app_commands
-import time
-from datetime import datetime, date
-from utils import db
-
-
-class Study(commands.Cog):
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
-
-    @commands.hybrid_command(name='log')
-    async def log(self, ctx, *, args: str = ''):
-        """Log a study session: !log subject:math time:120 topic:integration"""
-        # parse simple key:value pairs from args
-        parts = { }
-        for token in args.split():
-            if ':' in token:
-                k, v = token.split(':', 1)
-                parts[k.lower()] = v
-        subject = parts.get('subject', '')
-        time_str = parts.get('time', '')
-        topic = parts.get('topic', '')
-        minutes = 0
-        try:
-            if time_str.endswith('h'):
-                minutes = int(float(time_str[:-1]) * 60)
-            elif time_str.endswith('m'):
-                minutes = int(float(time_str[:-1]))
-            else:
-                minutes = int(float(time_str))
-        except Exception:
-            await ctx.send('Could not parse time. Use `time:30` or `time:1.5h` or `time:30m`.')
-            return
-
-        # Log the study session
-        ts = int(time.time())
-        await db.DB.add_study_log(ctx.author.id, minutes, ts, topic)
-
-        # Update streak
-        today = date.today().isoformat()
-        streak = await db.DB.get_streak(ctx.author.id)
-        if not streak:
-            # First time studying
-            await db.DB.set_streak(ctx.author.id, 1, today)
-            streak_msg = "🎉 First day of your study streak!"
-        else:
-            last_date = datetime.fromisoformat(streak['last_date']).date()
-            if last_date < date.today():
-                # Studying on a new day
-                if (date.today() - last_date).days == 1:
-                    # Consecutive day
-                    await db.DB.set_streak(ctx.author.id, streak['count'] + 1, today)
-                    streak_msg = f"🔥 {streak['count'] + 1} day streak!"
-                else:
-                    # Streak broken
-                    await db.DB.set_streak(ctx.author.id, 1, today)
-                    streak_msg = "Starting a new streak today! 💪"
-            else:
-                streak_msg = f"Current streak: {streak['count']} days 🔥"
-"""
 Study cog: log and logs commands, simple focus session, streaks and leaderboard helpers.
 This is a cleaned, single-version implementation to avoid duplicated code and unterminated strings.
 """
 import time
 import asyncio
-import datetime
 import json
 from typing import Optional, Dict, Any
 from pathlib import Path
@@ -83,10 +13,11 @@ from discord.ext import commands
 from discord import app_commands
 
 from utils.db import DB
+from utils.timebuckets import local_time
 
 
 def _now_ts() -> int:
-    return int(datetime.datetime.utcnow().timestamp())
+    return int(time.time())
 
 
 class Study(commands.Cog):
@@ -118,8 +49,8 @@ class Study(commands.Cog):
             return
 
         ts = _now_ts()
-        await DB.add_study_log(ctx.author.id, minutes, ts, topic)
-        # update streak/leaderboard (best-effort)
+        streak = await DB.add_study_log(ctx.author.id, minutes, ts, topic)
+        # update leaderboard (best-effort)
         try:
             guild_id = ctx.guild.id if ctx.guild else None
             if guild_id:
@@ -127,25 +58,19 @@ class Study(commands.Cog):
         except Exception:
             pass
 
-        await ctx.send(f'Logged {minutes} minutes for {subject or "(no subject)"} — topic: {topic}')
+        await ctx.send(f'Logged {minutes} minutes for {subject or "(no subject)"} — topic: {topic}\n'
+                       f'🔥 Streak: {streak.count} day{"s" if streak.count != 1 else ""}')
 
     @commands.hybrid_command(name='logs')
     async def logs(self, ctx, action: str = None):
         """View logs: !logs view"""
         if action == 'view':
-            rows = await DB.get_user_logs(ctx.author.id)
-            if not rows:
+            stats = await DB.get_user_stats(ctx.author.id)
+            if not stats.recent:
                 await ctx.send('No study logs found.')
                 return
-            lines = []
-            total = 0
-            for r in rows[:10]:
-                ts = int(r['ts'])
-                minutes = int(r['minutes'])
-                topic = r.get('topic') or ''
-                total += minutes
-                lines.append(f'- {minutes} min — {topic} — <t:{ts}:f>')
-            lines.append(f'**Total minutes:** {total}')
+            lines = [f'- {minutes} min — {topic} — <t:{ts}:f>' for ts, minutes, topic in stats.recent]
+            lines.append(f'**Total minutes:** {stats.total_minutes} in {stats.sessions} sessions')
             await ctx.send('\n'.join(lines))
             return
         await ctx.send('Usage: logs view')
@@ -155,31 +80,6 @@ async def setup(bot: commands.Bot):
     await DB.init_db()
     await bot.add_cog(Study(bot))
 
-    async def _update_streak(self, user_id: int):
-        # simple streak: if user logged something today, increment if yesterday logged
-        today = datetime.date.today()
-        val = await DB.get_streak(user_id)
-        if val:
-            try:
-                count = int(val.get('count', 0))
-                last_date = val.get('last_date', '')
-            except Exception:
-                count = 0
-                last_date = ''
-        else:
-            count = 0
-            last_date = ''
-
-        if last_date == today.isoformat():
-            return
-        yesterday = (today - datetime.timedelta(days=1)).isoformat()
-        if last_date == yesterday:
-            count = count + 1
-        else:
-            count = 1
-        last_date = today.isoformat()
-        await DB.set_streak(user_id, count, last_date)
-
     # ------------------ Log command ------------------
     @commands.hybrid_command(name='log', description='Log study hours or minutes')
     @app_commands.describe(subject='Subject name', time='Time in minutes or like 2h', topic='Optional topic')
@@ -201,21 +101,6 @@ async def setup(bot: commands.Bot):
         await self._add_log(ctx.author.id, minutes, topic or subject)
         await ctx.send(f'✅ Logged {minutes} minutes for {subject}.')
 
-    # ------------------ Streak ------------------
-    @commands.hybrid_command(name='streak', description='Show your study streak')
-    async def streak(self, ctx: commands.Context):
-        key = self._streak_key(ctx.author.id)
-        val = await DB.get_kv(key)
-        if not val:
-            await ctx.send('No streak yet. Start logging your study to build a streak!')
-            return
-        try:
-            obj = json.loads(val)
-        except Exception:
-            await ctx.send('No streak data found.')
-            return
-        await ctx.send(f"🔥 Your current streak: {obj.get('count',0)} days")
-
     # ------------------ Leaderboard ------------------
     @commands.hybrid_command(name='leaderboard', description='Show top study users this week')
     async def leaderboard(self, ctx: commands.Context):
@@ -275,12 +160,14 @@ async def setup(bot: commands.Bot):
                 parts = t.split(':')
                 h = int(parts[0])
                 m = int(parts[1])
-                now = datetime.datetime.utcnow()
-                target = datetime.datetime(now.year, now.month, now.day, h, m)
-                if target.timestamp() <= now.timestamp():
+                if not (0 <= h < 24 and 0 <= m < 60):
+                    raise ValueError(t)
+                # HH:MM is read in BOT_TIMEZONE
+                now = _now_ts()
+                remind_ts = local_time.day_start(now) + h * 3600 + m * 60
+                if remind_ts <= now:
                     # schedule next day
-                    target = target + datetime.timedelta(days=1)
-                remind_ts = int(target.timestamp())
+                    remind_ts += 24 * 60 * 60
             else:
                 # try minutes as integer
                 mins = int(t)
@@ -490,9 +377,9 @@ async def setup(bot: commands.Bot):
 
             try:
                 while True:
-                    now = datetime.datetime.utcnow()
+                    now = local_time.now()
                     if now.hour == quote_hour and now.minute == 0:
-                        today = now.date().isoformat()
+                        today = local_time.day_key()
                         for guild in list(self.bot.guilds):
                             try:
                                 key = f'last_quote_{guild.id}'
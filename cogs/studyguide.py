@@ -4,14 +4,13 @@ from discord.ext import commands
 from discord import app_commands
 import json
 from pathlib import Path
-import time
 from datetime import datetime, timedelta
-import google.generativeai as genai
 from utils import db
+from utils.llm import llm, genai_configured, get_genai_model
+from utils.lazy_import import register_warm_up
+from utils.timebuckets import local_time
 
 
-CONFIG_PATH = Path(__file__).parent.parent / 'config.json'
-
 # Mock suggestions for when Gemini is unavailable
 MOCK_SUGGESTIONS = [
     "I notice you've spent more time on Physics lately. Consider balancing with some Chemistry practice!",
@@ -26,43 +25,28 @@ class StudyGuide(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.gemini = None
-        self.model = None
         
     async def cog_load(self):
-        try:
-            config = json.loads(CONFIG_PATH.read_text())
-            if 'gemini_api_key' in config:
-                genai.configure(api_key=config['gemini_api_key'])
-                self.model = genai.GenerativeModel('gemini-pro')
-                self.gemini = True
-        except Exception:
-            self.gemini = False
+        self.gemini = genai_configured()
+        if self.gemini:
+            register_warm_up('google.generativeai')
 
-    async def _analyze_study_pattern(self, user_id: int) -> str:
+    async def _analyze_study_pattern(self, user_id: int, guild_id: int = None, channel_id: int = None) -> str:
         """Analyze study logs and progress to make suggestions."""
-        if not self.gemini or not self.model:
+        model = await get_genai_model() if self.gemini else None
+        if not model:
             import random
             return random.choice(MOCK_SUGGESTIONS)
             
         try:
-            # Get recent logs (last 7 days)
-            week_ago = int(time.time() - (7 * 24 * 60 * 60))
-            logs = await db.DB.get_user_logs(user_id, since_ts=week_ago)
-            
-            # Aggregate by subject
-            subjects = {}
-            for log in logs:
-                topic = log['topic'].lower() if log['topic'] else 'unknown'
-                minutes = log['minutes']
-                if topic in subjects:
-                    subjects[topic]['minutes'] += minutes
-                    subjects[topic]['sessions'] += 1
-                else:
-                    subjects[topic] = {'minutes': minutes, 'sessions': 1}
+            # Per-subject minutes and sessions over the last 7 days
+            stats = await db.DB.get_user_stats(user_id)
+            subjects = {subject: {'minutes': minutes, 'sessions': sessions}
+                        for subject, (minutes, sessions) in stats.subject_window(local_time.day_number()).items()}
             
-            # Get progress in each subject
-            progress = await db.DB.get_progress(user_id, None)
-            progress_data = {p['subject'].lower(): p['percent'] for p in progress}
+            # Get progress in each subject (best across servers)
+            progress = await db.DB.get_best_progress(user_id)
+            progress_data = {p['subject']: p['percent'] for p in progress}
             
             # Build context for Gemini
             context = ["Study pattern analysis:\n"]
@@ -74,9 +58,10 @@ class StudyGuide(commands.Cog):
             for subj, pct in progress_data.items():
                 context.append(f"- {subj}: {pct}% complete")
             
+            context_text = '\n'.join(context)
             prompt = f"""Based on this student's data:
 
-{'\n'.join(context)}
+{context_text}
 
 Provide ONE specific, actionable study suggestion that:
 1. Addresses any subject imbalances
@@ -85,8 +70,8 @@ Provide ONE specific, actionable study suggestion that:
 
 Keep it conversational and encouraging, max 2-3 sentences. Include a relevant emoji."""
 
-            response = await self.model.generate_content(prompt)
-            return response.text if response else random.choice(MOCK_SUGGESTIONS)
+            text = await llm.generate_content(model, prompt, scope='studyguide', guild_id=guild_id, channel_id=channel_id)
+            return text or random.choice(MOCK_SUGGESTIONS)
         except Exception:
             import random
             return random.choice(MOCK_SUGGESTIONS)
@@ -95,7 +80,11 @@ Keep it conversational and encouraging, max 2-3 sentences. Include a relevant em
     async def suggest(self, ctx):
         """Get a personalized study suggestion"""
         async with ctx.typing():
-            suggestion = await self._analyze_study_pattern(ctx.author.id)
+            suggestion = await self._analyze_study_pattern(
+                ctx.author.id,
+                guild_id=ctx.guild.id if ctx.guild else None,
+                channel_id=ctx.channel.id
+            )
             await ctx.send(f"📝 Study Suggestion:\n{suggestion}")
 
 
@@ -3,13 +3,21 @@ import discord
 from discord.ext import commands
 import asyncio
 import json
+import os
 from pathlib import Path
-import speech_recognition as sr
-from pydub import AudioSegment
-import io
-import wave
-import tempfile
 import logging
+from utils.lazy_import import lazy_import, is_available, ensure_loaded, register_warm_up
+from utils.voice_pipeline import EnergyVAD, SpeechPipeline
+from utils.speech_engines import TranscriptionError, create_engine, match_command
+
+sr = lazy_import('speech_recognition')
+
+# RMS level (16-bit samples) a 30 ms frame must reach to count as speech
+VAD_THRESHOLD = int(os.getenv('VOICE_VAD_THRESHOLD', '300'))
+# speech recognitions allowed in flight across all channels
+RECOGNITION_CONCURRENCY = int(os.getenv('VOICE_RECOGNITION_CONCURRENCY', '2'))
+# auto | vosk | whisper | google; auto prefers an installed offline engine
+VOICE_ENGINE = os.getenv('VOICE_ENGINE', 'auto')
 
 
 # Configure logging
@@ -28,8 +36,20 @@ VOICE_COMMANDS = {
 class VoiceCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.recognizer = sr.Recognizer()
         self.listening = {}  # {channel_id: bool}
+        # keyword-spotting engines only listen for the command phrases
+        self.engine = create_engine(VOICE_ENGINE, phrases=VOICE_COMMANDS)
+        # offline engines answer quickly enough for shorter slices
+        self.slice_seconds = float(os.getenv('VOICE_SLICE_SECONDS') or (2 if self.engine.offline else 5))
+        self.pipeline = SpeechPipeline(
+            self.engine.transcribe,
+            vad=EnergyVAD(threshold=VAD_THRESHOLD),
+            max_concurrency=RECOGNITION_CONCURRENCY,
+        )
+
+    async def cog_load(self):
+        register_warm_up('speech_recognition')
+        logger.info(f"Voice commands use the {self.engine.name} speech engine")
 
     @commands.hybrid_command(name='voiceon')
     @commands.has_permissions(manage_channels=True)
@@ -52,6 +72,8 @@ class VoiceCommands(commands.Cog):
             return
             
         try:
+            # offline models load once, off the event loop, before the first slice
+            await asyncio.to_thread(self.engine.load)
             await channel.connect()
             self.listening[channel.id] = True
             
@@ -112,16 +134,16 @@ class VoiceCommands(commands.Cog):
                 if not voice_client:
                     break
                     
-                # Create sink to receive audio
-                sink = discord.sinks.MP3Sink()
+                # Raw PCM sink: no per-slice MP3 encode/decode
+                sink = discord.sinks.PCMSink()
                 voice_client.start_recording(
                     sink,
                     self._recording_finished,
                     channel
                 )
                 
-                # Record for 5 seconds
-                await asyncio.sleep(5)
+                # Record one slice
+                await asyncio.sleep(self.slice_seconds)
                 voice_client.stop_recording()
                 
             except Exception as e:
@@ -131,63 +153,54 @@ class VoiceCommands(commands.Cog):
     async def _recording_finished(self, sink, channel):
         """Process recorded audio for commands."""
         try:
-            # Get recorded audio
-            for user_id, audio in sink.audio_data.items():
-                # Convert to WAV format
-                with tempfile.NamedTemporaryFile(suffix='.wav') as temp_wav:
-                    audio_segment = AudioSegment.from_mp3(
-                        io.BytesIO(audio.file.read())
-                    )
-                    audio_segment.export(temp_wav.name, format='wav')
-                    
-                    # Recognize speech
-                    with sr.AudioFile(temp_wav.name) as source:
-                        audio_data = self.recognizer.record(source)
-                        try:
-                            text = self.recognizer.recognize_google(audio_data)
-                            
-                            # Check for commands
-                            text = text.lower()
-                            for trigger, command in VOICE_COMMANDS.items():
-                                if trigger in text:
-                                    # Get user and create mock message
-                                    user = self.bot.get_user(user_id)
-                                    if user:
-                                        # Create context
-                                        ctx = await self.bot.get_context(
-                                            type(
-                                                'MockMessage',
-                                                (),
-                                                {
-                                                    'author': user,
-                                                    'channel': channel,
-                                                    'guild': channel.guild,
-                                                    'content': command
-                                                }
-                                            )
-                                        )
-                                        
-                                        # Process command
-                                        await self.bot.process_commands(ctx)
-                                        break
-                                        
-                        except sr.UnknownValueError:
-                            pass  # Speech not recognized
-                        except sr.RequestError as e:
-                            logger.error(f"Speech recognition error: {e}")
-                            
+            # First use imports speech_recognition off the event loop
+            await ensure_loaded(sr)
+            await asyncio.gather(*(
+                self._process_speaker(user_id, audio.file.getbuffer(), channel)
+                for user_id, audio in sink.audio_data.items()
+            ))
         except Exception as e:
             logger.error(f"Error processing recording: {e}")
 
+    async def _process_speaker(self, user_id, pcm, channel):
+        """Recognize one speaker's slice and run the first command it mentions."""
+        try:
+            text = await self.pipeline.transcribe(pcm)
+        except TranscriptionError as e:
+            logger.error(f"Speech recognition error: {e}")
+            return
+
+        # Check for commands; None means silence or nothing intelligible
+        command = match_command(text, VOICE_COMMANDS)
+        if not command:
+            return
+        # Get user and create mock message
+        user = self.bot.get_user(user_id)
+        if user:
+            # Create context
+            ctx = await self.bot.get_context(
+                type(
+                    'MockMessage',
+                    (),
+                    {
+                        'author': user,
+                        'channel': channel,
+                        'guild': channel.guild,
+                        'content': command
+                    }
+                )
+            )
+
+            # Process command
+            await self.bot.process_commands(ctx)
+
 
 async def setup(bot):
-    # Check if required packages are available
-    try:
-        import speech_recognition
-        import pydub
+    # Check if required packages are available (without importing them yet)
+    if is_available('speech_recognition'):
         await bot.add_cog(VoiceCommands(bot))
-    except ImportError:
+    else:
         logger.warning(
             "Voice commands disabled: Required packages not installed. "
-            "Install: speech_recognition, pydub"
+            "Install: SpeechRecognition"
         )
\ No newline at end of file
@@ -70,17 +70,19 @@ def music_status():
             'volume': 0,
         }
 
-        if hasattr(music_cog, 'voice_client') and music_cog.voice_client and music_cog.voice_client.is_connected():
-            if music_cog.voice_client.is_playing() or music_cog.voice_client.is_paused():
+        # Report the first guild that is currently playing
+        players = getattr(music_cog, 'players', {})
+        for player in list(players.values()):
+            if player.voice_client and player.voice_client.is_connected() and player.is_active:
                 status['playing'] = True
-                status['volume'] = music_cog.volume
-                guild_id = music_cog.voice_client.guild.id
-                current_info = music_cog.current_track_info.get(guild_id)
+                status['volume'] = player.volume
+                current_info = player.current_info
                 if current_info:
                     track_title = current_info.get('title')
                     status['current_track'] = track_title if track_title else 'Loading info...'
                 else:
                     status['current_track'] = 'Loading info...' # Or set to Radio Stream if using that version
+                break
 
         return jsonify(status)
     except Exception as e:
@@ -0,0 +1,69 @@
+"""Benchmark the Connect-4 and Tic-Tac-Toe search engines.
+
+Plays `--games` games per level of the engine against a random opponent and
+reports search speed (nodes/second), the median, p95 and worst move latency,
+the average depth reached within the time budget and the engine's results.
+
+    python scripts/benchmark_games.py [--games 20] [--budget 0.08]
+
+Moves must stay well under 100 ms for the bot to feel instant in chat.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.board_engine import Connect4, Engine, TicTacToe  # noqa: E402
+
+
+def play(game_cls, level, budget, engine_first, rng):
+    game = game_cls()
+    engine = Engine(game_cls, time_budget=budget)
+    searches = []
+    while True:
+        engine_turn = (game.plies % 2 == 0) == engine_first
+        if engine_turn:
+            result = engine.best_move(game.position, game.mask, level)
+            searches.append(result)
+            move = result.move
+        else:
+            move = rng.choice(game.moves(game.position, game.mask))
+        if game.play(move):
+            return ('win' if engine_turn else 'loss'), searches
+        if game.is_full():
+            return 'draw', searches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--games', type=int, default=20, help='games per level')
+    parser.add_argument('--budget', type=float, default=0.08, help='per-move time budget in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'game':<11}{'level':<8}{'nodes/s':>10}{'median':>9}{'p95':>9}{'max':>9}"
+          f"{'depth':>7}{'  win/draw/loss':>16}")
+    for game_cls in (TicTacToe, Connect4):
+        for level in game_cls.LEVELS:
+            results = {'win': 0, 'draw': 0, 'loss': 0}
+            searches = []
+            for i in range(args.games):
+                outcome, moves = play(game_cls, level, args.budget, i % 2 == 0, rng)
+                results[outcome] += 1
+                searches.extend(moves)
+            latencies = sorted(s.elapsed * 1000 for s in searches)
+            nodes = sum(s.nodes for s in searches)
+            seconds = sum(s.elapsed for s in searches) or 1e-9
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            depth = statistics.mean(s.depth for s in searches)
+            print(f'{game_cls.__name__:<11}{level:<8}{nodes / seconds:>10.0f}'
+                  f'{statistics.median(latencies):>7.1f}ms{p95:>7.1f}ms{latencies[-1]:>7.1f}ms'
+                  f"{depth:>7.1f}  {results['win']:>5}/{results['draw']}/{results['loss']}")
+
+
+if __name__ == '__main__':
+    main()
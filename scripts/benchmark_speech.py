@@ -0,0 +1,103 @@
+"""Benchmark voice-command speech engines on a folder of sample clips.
+
+Clips are wav files named after the phrase they contain, with an optional
+numeric suffix: `start_timer.wav`, `show_stats-2.wav`. Clips whose phrase is not
+a voice command (e.g. `noise-1.wav`, `hello_there.wav`) count as negatives: any
+command matched in them is a false trigger.
+
+    python scripts/benchmark_speech.py path/to/clips [--engines vosk,google]
+
+For each installed engine it reports the median and p95 recognition latency
+(VAD + transcription, model load excluded), command accuracy and false triggers.
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+import wave
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.voice import VOICE_COMMANDS  # noqa: E402
+from utils.speech_engines import ENGINES, TranscriptionError, match_command  # noqa: E402
+from utils.voice_pipeline import RECOGNIZE_RATE, SAMPLE_WIDTH, SpeechPipeline  # noqa: E402
+
+
+def load_clips(folder):
+    clips = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith('.wav'):
+            continue
+        phrase = re.sub(r'[-_]?\d+$', '', os.path.splitext(name)[0]).replace('_', ' ')
+        with wave.open(os.path.join(folder, name), 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                print(f'skipping {name}: only 16-bit PCM wav is supported')
+                continue
+            pcm = wav.readframes(wav.getnframes())
+            clips.append((name, VOICE_COMMANDS.get(phrase), pcm, wav.getframerate(), wav.getnchannels()))
+    return clips
+
+
+def bench(engine, clips):
+    pipeline = SpeechPipeline(engine.transcribe)
+    latencies, correct, false_triggers, errors = [], 0, 0, 0
+    for name, expected, pcm, rate, channels in clips:
+        start = time.perf_counter()
+        try:
+            speech = pipeline.prepare(pcm, rate, channels)
+            text = engine.transcribe(_audio(speech)) if speech else None
+        except TranscriptionError as e:
+            errors += 1
+            print(f'  {name}: {e}')
+            continue
+        latencies.append(time.perf_counter() - start)
+        got = match_command(text, VOICE_COMMANDS)
+        if expected is None:
+            false_triggers += got is not None
+        else:
+            correct += got == expected
+        print(f'  {name:<28} {latencies[-1] * 1000:7.0f}ms  {text!r}')
+    positives = sum(1 for clip in clips if clip[1] is not None)
+    return latencies, correct, positives, false_triggers, errors
+
+
+def _audio(pcm):
+    import speech_recognition as sr
+    return sr.AudioData(pcm, RECOGNIZE_RATE, SAMPLE_WIDTH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('clips', help='folder of .wav clips named after their phrase')
+    parser.add_argument('--engines', default=','.join(ENGINES), help='comma-separated engine names')
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips)
+    if not clips:
+        sys.exit(f'No wav clips found in {args.clips}')
+
+    rows = []
+    for name in args.engines.split(','):
+        cls = ENGINES.get(name.strip())
+        if cls is None or not cls.available():
+            print(f'{name}: not installed, skipped')
+            continue
+        engine = cls(phrases=VOICE_COMMANDS)
+        load_start = time.perf_counter()
+        engine.load()
+        load_time = time.perf_counter() - load_start
+        print(f'{name} (model load {load_time:.1f}s)')
+        latencies, correct, positives, false_triggers, errors = bench(engine, clips)
+        if latencies:
+            p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+            rows.append(f'{name:<10}{statistics.median(latencies) * 1000:>8.0f}ms{p95 * 1000:>8.0f}ms'
+                        f'{correct:>6}/{positives:<4}{false_triggers:>8}{errors:>8}')
+
+    print(f"\n{'engine':<10}{'median':>10}{'p95':>10}{'correct':>11}{'false':>8}{'errors':>8}")
+    print('\n'.join(rows) or 'no engine could be benchmarked')
+
+
+if __name__ == '__main__':
+    main()
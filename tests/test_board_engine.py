@@ -0,0 +1,61 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.board_engine import Connect4, Engine, TicTacToe
+
+
+def test_win_detection_in_every_direction():
+    for cells in ([0, 1, 2], [0, 3, 6], [0, 4, 8], [2, 4, 6]):
+        stones = 0
+        for cell in cells:
+            stones |= TicTacToe.cell_bit(cell)
+        assert TicTacToe.aligned(stones)
+    assert not TicTacToe.aligned(TicTacToe.cell_bit(2) | TicTacToe.cell_bit(3) | TicTacToe.cell_bit(4))
+
+    lines = [[(c, 0) for c in range(4)], [(0, r) for r in range(4)],
+             [(i, i) for i in range(4)], [(3 - i, i) for i in range(4)]]
+    for line in lines:
+        assert Connect4.aligned(sum(Connect4.bit(c, r) for c, r in line))
+    # a vertical run must not wrap over the top of a column into the next
+    assert not Connect4.aligned(sum(Connect4.bit(0, r) for r in (4, 5)) + sum(Connect4.bit(1, r) for r in (0, 1)))
+
+
+def test_connect4_takes_wins_and_blocks_within_budget():
+    game = Connect4()
+    for col in (0, 6, 0, 6, 0):  # first player has three in column 0
+        game.play(col)
+    engine = Engine(Connect4)
+    result = engine.best_move(game.position, game.mask, 'medium')
+    assert result.move == 0  # block
+    assert result.elapsed < 0.1
+
+    game.play(5)
+    result = engine.best_move(game.position, game.mask, 'hard')
+    assert result.move == 0 and result.score > 0  # win
+    assert game.play(result.move) and game.owner(0, 3) == 0
+
+
+def test_tictactoe_hard_never_leaves_a_win():
+    engine = Engine(TicTacToe)
+    for opening in [None] + list(range(9)):
+        game = TicTacToe()
+        if opening is not None:
+            game.play(opening)
+        while True:
+            if game.play(engine.best_move(game.position, game.mask, 'hard').move) or game.is_full():
+                break
+            replies = game.moves(game.position, game.mask)
+            assert not any(TicTacToe.aligned(game.position | TicTacToe.cell_bit(m)) for m in replies)
+            game.play(replies[-1])
+            if game.is_full():
+                break
+
+
+def test_connect4_hard_deepens_past_the_number_of_columns():
+    game = Connect4()
+    game.play(3)
+    result = Engine(Connect4, time_budget=0.5).best_move(game.position, game.mask, 'hard')
+    assert result.depth > Connect4.WIDTH
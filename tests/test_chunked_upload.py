@@ -0,0 +1,63 @@
+import os
+import sys
+import asyncio
+import json
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.chunked_upload import FileSlice, reassemble, upload_in_parts
+
+
+class FakeChannel:
+    """Saves each attachment to `folder`, like a user downloading them."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, file):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        # read in small pieces, the way aiohttp streams a file payload
+        with open(os.path.join(self.folder, file.filename), 'wb') as out:
+            while chunk := file.fp.read(4096):
+                out.write(chunk)
+        self.in_flight -= 1
+
+
+def test_file_slice_reads_and_seeks():
+    part = FileSlice(memoryview(b'0123456789')[2:8])
+    assert part.read(3) == b'234'
+    assert part.read() == b'567'
+    part.seek(0)
+    assert part.read() == b'234567'
+    part.close()
+
+
+@pytest.mark.asyncio
+async def test_parts_upload_concurrently_and_reassemble(tmp_path):
+    source = tmp_path / 'notes.bin'
+    source.write_bytes(os.urandom(100_000))
+    downloads = tmp_path / 'downloads'
+    downloads.mkdir()
+    channel = FakeChannel(downloads)
+
+    progress = []
+    manifest, _ = await upload_in_parts(channel, source, chunk_size=16_384, concurrency=3, rate=1000,
+                                        on_progress=lambda done, total: progress.append((done, total)))
+
+    assert len(manifest['parts']) == 7
+    assert 1 < channel.max_in_flight <= 3
+    assert progress[-1] == (7, 7)
+    saved = json.loads((downloads / 'notes.bin.manifest.json').read_text())
+    assert saved == manifest
+    rebuilt = reassemble(downloads / 'notes.bin.manifest.json', tmp_path / 'rebuilt.bin')
+    assert rebuilt.read_bytes() == source.read_bytes()
+
+    (downloads / 'notes.bin.part3').write_bytes(b'corrupt')
+    with pytest.raises(ValueError, match='part3'):
+        reassemble(downloads / 'notes.bin.manifest.json', tmp_path / 'again.bin')
@@ -0,0 +1,94 @@
+import os
+import sys
+import uuid
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from types import SimpleNamespace
+from utils.db import DB
+from utils.timebuckets import local_time
+from cogs.coach import WEEK, WeeklyCoach, MOCK_FEEDBACK
+
+# far enough in the future that only this test's logs fall in the window
+NOW = 4_000_000_000
+USERS = (910001, 910002, 910003)
+
+
+async def seed_logs():
+    await DB.init_db()
+    await DB.execute('DELETE FROM study_logs WHERE ts >= ?', (NOW - 3 * WEEK,))
+    a, b, c = USERS
+    for user_id, minutes, ts, topic in [
+        (a, 60, NOW - 100, 'Physics'), (a, 30, NOW - 200, 'physics'), (a, 45, NOW - WEEK - 100, 'Math'),
+        (b, 20, NOW - 100, ''), (c, 90, NOW - WEEK - 100, 'Chemistry'),  # c only studied last week
+    ]:
+        await DB.add_study_log(user_id=user_id, minutes=minutes, ts=ts, topic=topic, guild_id=1)
+
+
+async def clear_logs():
+    await DB.execute('DELETE FROM study_logs WHERE ts >= ?', (NOW - 3 * WEEK,))
+    for user_id in USERS:
+        await DB.forget_user_stats(user_id)
+
+
+class FakeUser:
+    def __init__(self, sent):
+        self.sent = sent
+
+    async def send(self, embed):
+        self.sent.append(embed)
+
+
+@pytest.mark.asyncio
+async def test_weekly_stats_aggregates_all_users_in_one_pass():
+    await seed_logs()
+    stats = await WeeklyCoach._weekly_stats(NOW)
+    await clear_logs()
+    a, b, c = USERS
+    assert stats[a]['current'] == {'physics': 90}
+    assert stats[a]['previous'] == {'math': 45}
+    assert stats[b]['current'] == {'unknown': 20}
+    assert c not in stats
+
+
+
+@pytest.mark.asyncio
+async def test_weekly_stats_uses_local_day_windows():
+    await DB.init_db()
+    user = 910004
+    week_start, previous_start = WeeklyCoach._week_windows(NOW)
+    assert local_time.day_number(week_start) == local_time.day_number(NOW) - 6
+    assert local_time.day_number(previous_start) == local_time.day_number(NOW) - 13
+    for minutes, ts in [(10, week_start), (25, week_start - 1), (40, previous_start - 1)]:
+        await DB.add_study_log(user_id=user, minutes=minutes, ts=ts, topic='Math', guild_id=1)
+    try:
+        stats = await WeeklyCoach._weekly_stats(NOW)
+        assert (stats[user]['current'], stats[user]['previous']) == ({'math': 10}, {'math': 25})
+        # the same windows /report reads from the per-user stats
+        user_stats = await DB.get_user_stats(user)
+        assert user_stats.week_minutes(local_time.day_number(NOW)) == ({'math': 10}, {'math': 25})
+    finally:
+        await DB.execute('DELETE FROM study_logs WHERE user_id = ?', (user,))
+        await DB.execute('DELETE FROM streaks WHERE user_id = ?', (user,))
+        await DB.forget_user_stats(user)
+
+
+@pytest.mark.asyncio
+async def test_weekly_run_skips_users_already_checkpointed():
+    await seed_logs()
+    sent = []
+    bot = SimpleNamespace(get_user=lambda uid: FakeUser(sent))
+    coach = WeeklyCoach.__new__(WeeklyCoach)
+    coach.bot, coach.gemini = bot, False
+    week_key = f'test-{uuid.uuid4()}'
+    await DB.mark_coach_reports_sent(week_key, [USERS[0]])
+
+    counts = await coach.run_weekly_reports(week_key, now=NOW)
+    await clear_logs()
+
+    assert (counts['users'], counts['skipped'], counts['sent']) == (2, 1, 1)
+    assert sent[0].description == MOCK_FEEDBACK
+    assert await DB.get_coach_reports_sent(week_key) == {USERS[0], USERS[1]}
+    assert not await DB.get_kv('coach_weekly_active_run')
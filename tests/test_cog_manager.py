@@ -0,0 +1,55 @@
+import os
+import sys
+import asyncio
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils import cog_manager
+from utils.cog_manager import resolve_load_order, load_cogs_concurrently, split_optional
+
+
+def test_resolve_load_order_respects_dependencies_and_priority(monkeypatch):
+    monkeypatch.setattr(cog_manager, 'COG_DEPENDENCIES', {'a': {'b'}, 'b': {'c'}})
+    monkeypatch.setattr(cog_manager, 'OPTIONAL_COGS', set())
+    order = resolve_load_order(['a', 'b', 'c', 'owner', 'zzz'])
+    assert order.index('c') < order.index('b') < order.index('a')
+    assert order[0] == 'owner'
+
+    monkeypatch.setattr(cog_manager, 'COG_DEPENDENCIES', {'a': {'b'}, 'b': {'a'}})
+    with pytest.raises(ValueError):
+        resolve_load_order(['a', 'b'])
+
+
+def test_required_cogs_never_wait_for_optional(monkeypatch):
+    monkeypatch.setattr(cog_manager, 'COG_DEPENDENCIES', {'games': {'music'}})
+    monkeypatch.setattr(cog_manager, 'OPTIONAL_COGS', {'music'})
+    assert split_optional(['games', 'music']) == (['games'], ['music'])
+    assert resolve_load_order(['games', 'music']) == ['games', 'music']
+
+
+@pytest.mark.asyncio
+async def test_load_cogs_concurrently(monkeypatch):
+    monkeypatch.setattr(cog_manager, 'COG_DEPENDENCIES', {'late': {'slow1'}})
+    monkeypatch.setattr(cog_manager, 'OPTIONAL_COGS', set())
+    events = []
+
+    class FakeBot:
+        async def load_extension(self, ext):
+            name = ext.split('.', 1)[1]
+            events.append(('start', name))
+            if name == 'broken':
+                raise RuntimeError('boom')
+            await asyncio.sleep(0.05)
+            events.append(('done', name))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await load_cogs_concurrently(FakeBot(), ['slow1', 'slow2', 'slow3', 'late', 'broken'])
+    elapsed = loop.time() - start
+    # three independent cogs overlap, 'late' waits for 'slow1': ~2 rounds, not 4
+    assert elapsed < 0.15
+    assert events.index(('done', 'slow1')) < events.index(('start', 'late'))
+    assert isinstance(results['broken'], RuntimeError)
+    assert results['late'] is None
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import discord
+import pytest
+from discord import app_commands
+from utils.db import DB
+from utils.command_sync import CommandSyncer, SYNCED, UNCHANGED
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_unchanged_scopes():
+    await DB.init_db()
+    client = discord.Client(intents=discord.Intents.none())
+    tree = app_commands.CommandTree(client)
+    pushed = []
+
+    async def fake_sync(*, guild=None):
+        pushed.append(guild.id if guild else None)
+        return []
+    tree.sync = fake_sync
+
+    @tree.command(name='ping', description='Ping')
+    async def ping(interaction: discord.Interaction):
+        pass
+
+    guild = discord.Object(id=42)
+    syncer = CommandSyncer(tree, key_prefix=f'test_command_sync:{time.time_ns()}:')
+    assert await syncer.sync(guilds=[guild]) == {'global': SYNCED, 'guild:42': SYNCED}
+    assert sorted(pushed, key=str) == [42, None]
+
+    # nothing changed: no API calls
+    pushed.clear()
+    assert set((await syncer.sync(guilds=[guild])).values()) == {UNCHANGED}
+    assert pushed == []
+
+    # a changed global command only re-syncs the global scope
+    @tree.command(name='pong', description='Pong')
+    async def pong(interaction: discord.Interaction):
+        pass
+    assert await syncer.sync(guilds=[guild]) == {'global': SYNCED, 'guild:42': UNCHANGED}
+    assert pushed == [None]
+
+    pushed.clear()
+    await syncer.sync(force=True)
+    assert pushed == [None]
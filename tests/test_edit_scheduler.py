@@ -0,0 +1,50 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.edit_scheduler import EditScheduler
+
+
+class FakeMessage:
+    def __init__(self, message_id, channel_id, log):
+        self.id = message_id
+        self.channel = SimpleNamespace(id=channel_id)
+        self.log = log
+
+    async def edit(self, **kwargs):
+        self.log.append((self.id, kwargs['content']))
+
+
+@pytest.mark.asyncio
+async def test_edits_are_coalesced_per_message():
+    log = []
+    scheduler = EditScheduler(rate=100, per_channel_interval=0.05)
+    a = FakeMessage(1, 10, log)
+    b = FakeMessage(2, 20, log)
+    for i in range(5):
+        scheduler.schedule(a, content=f'a{i}')
+    scheduler.schedule(b, content='b0')
+    await asyncio.sleep(0.1)
+    assert log == [(1, 'a4'), (2, 'b0')]
+    assert scheduler.stats['coalesced'] == 4
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_same_channel_edits_are_spaced():
+    log = []
+    scheduler = EditScheduler(rate=100, per_channel_interval=0.1)
+    first = FakeMessage(1, 10, log)
+    second = FakeMessage(2, 10, log)
+    scheduler.schedule(first, content='x')
+    scheduler.schedule(second, content='y')
+    await asyncio.sleep(0.05)
+    assert log == [(1, 'x')]
+    await asyncio.sleep(0.1)
+    assert log == [(1, 'x'), (2, 'y')]
+    await scheduler.close()
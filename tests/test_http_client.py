@@ -0,0 +1,44 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from aiohttp import web
+from utils.http_client import HTTPClient
+
+
+@pytest.mark.asyncio
+async def test_http_client_retries_transient_errors():
+    hits = {'count': 0}
+
+    async def flaky(request):
+        hits['count'] += 1
+        if hits['count'] < 3:
+            return web.Response(status=503)
+        return web.json_response({'ok': True})
+
+    app = web.Application()
+    app.router.add_get('/flaky', flaky)
+    app.router.add_post('/flaky', flaky)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = HTTPClient(retries=2, backoff_base=0.01)
+    try:
+        resp = await client.get(f'http://127.0.0.1:{port}/flaky')
+        assert resp.status == 200
+        assert await resp.json() == {'ok': True}
+        assert hits['count'] == 3
+
+        # POSTs are not retried unless asked to
+        hits['count'] = 0
+        resp = await client.post(f'http://127.0.0.1:{port}/flaky')
+        assert resp.status == 503
+        assert hits['count'] == 1
+    finally:
+        await client.close()
+        await runner.cleanup()
@@ -0,0 +1,47 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.input_router import InputRouter
+
+
+def message(channel_id, author_id, content=''):
+    return SimpleNamespace(channel=SimpleNamespace(id=channel_id), author=SimpleNamespace(id=author_id),
+                           content=content)
+
+
+@pytest.mark.asyncio
+async def test_delivers_only_to_matching_session():
+    router = InputRouter()
+    alice = asyncio.ensure_future(router.wait(1, 10, timeout=1))
+    bob = asyncio.ensure_future(router.wait(1, 20, timeout=1))
+    await asyncio.sleep(0)
+    assert len(router) == 2
+
+    assert not router.dispatch(message(2, 10, 'other channel'))
+    assert router.dispatch(message(1, 10, 'e4'))
+    assert (await alice).content == 'e4'
+    assert not bob.done()
+
+    router.dispatch(message(1, 20, 'e5'))
+    assert (await bob).content == 'e5'
+    assert len(router) == 0 and router.stats['peak'] == 2 and router.stats['delivered'] == 2
+
+
+@pytest.mark.asyncio
+async def test_check_and_timeout():
+    router = InputRouter()
+    waiting = asyncio.ensure_future(router.wait(1, 10, timeout=1, check=lambda m: m.content.isdigit()))
+    await asyncio.sleep(0)
+    assert not router.dispatch(message(1, 10, 'abc'))
+    router.dispatch(message(1, 10, '42'))
+    assert (await waiting).content == '42'
+
+    with pytest.raises(asyncio.TimeoutError):
+        await router.wait(1, 10, timeout=0.01)
+    assert router.stats['timeouts'] == 1 and len(router) == 0 and not router._waiting
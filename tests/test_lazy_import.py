@@ -0,0 +1,38 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.lazy_import import lazy_import, is_available, register_warm_up, warm_up
+
+
+def test_lazy_import_defers_until_attribute_access():
+    sys.modules.pop('colorsys', None)
+    colorsys = lazy_import('colorsys')
+    assert not colorsys.loaded
+    assert 'colorsys' not in sys.modules
+    assert colorsys.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert colorsys.loaded
+    assert lazy_import('colorsys') is colorsys
+
+
+def test_is_available_does_not_import():
+    assert is_available('json')
+    assert not is_available('definitely_not_a_module_xyz')
+    assert not is_available('definitely_not_a_module_xyz.sub')
+
+
+@pytest.mark.asyncio
+async def test_warm_up_only_imports_registered_modules():
+    missing = lazy_import('definitely_not_a_module_xyz')
+    sys.modules.pop('fractions', None)
+    sys.modules.pop('wave', None)
+    fractions = lazy_import('fractions')
+    unused = lazy_import('wave')
+    register_warm_up('definitely_not_a_module_xyz', 'fractions')
+    await warm_up()
+    assert fractions.loaded
+    assert not missing.loaded
+    assert not unused.loaded
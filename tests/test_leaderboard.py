@@ -0,0 +1,35 @@
+import os
+import sys
+import random
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.leaderboard import TopK
+
+
+def test_top_k_matches_a_full_sort():
+    rng = random.Random(7)
+    board = TopK(5)
+    scores = {}
+    for _ in range(2000):
+        uid = str(rng.randrange(200))
+        delta = rng.randint(-20, 50)  # mostly up, sometimes down
+        scores[uid] = scores.get(uid, 0) + delta
+        assert board.add(uid, delta) == scores[uid]
+        expected = sorted(scores.values(), reverse=True)[:5]
+        assert [score for _, score in board.top()] == expected
+    assert len(board._heap) <= 4 * 5 + 16
+
+
+def test_version_only_changes_with_the_top():
+    board = TopK(2)
+    board.add('a', 10)
+    board.add('b', 20)
+    version = board.version
+    board.add('c', 5)   # below the top two
+    assert board.version == version
+    board.add('c', 10)  # 15 now beats 'a'
+    assert board.version != version
+    assert board.top() == [('b', 20), ('c', 15)]
+    assert board.top(1) == [('b', 20)]
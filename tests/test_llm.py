@@ -0,0 +1,113 @@
+import os
+import sys
+import asyncio
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.llm import LLMClient, LLMRateLimited
+
+
+@pytest.mark.asyncio
+async def test_llm_coalesces_and_caches():
+    client = LLMClient(rate_per_minute=600, burst=10)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    results = await asyncio.gather(*(client.generate('What is  2+2?', fetch, model='m') for _ in range(5)))
+    assert results == ['answer'] * 5
+    assert calls == 1
+    # normalized prompt hits the cache
+    assert await client.generate('what is 2+2?', fetch, model='m') == 'answer'
+    assert calls == 1
+    # a different model is a different cache entry
+    await client.generate('what is 2+2?', fetch, model='other')
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_errors_are_not_cached():
+    client = LLMClient(rate_per_minute=600, burst=10)
+
+    async def failing():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        await client.generate('q', failing)
+
+    async def ok():
+        return 'fine'
+
+    assert await client.generate('q', ok) == 'fine'
+
+
+@pytest.mark.asyncio
+async def test_llm_rate_limit_per_channel():
+    client = LLMClient(rate_per_minute=1, burst=1, max_wait=0.1)
+
+    async def fetch():
+        return 'x'
+
+    await client.generate('a', fetch, guild_id=1, channel_id=1, use_cache=False)
+    with pytest.raises(LLMRateLimited):
+        await client.generate('b', fetch, guild_id=1, channel_id=1, use_cache=False)
+    # another channel has its own bucket
+    assert await client.generate('c', fetch, guild_id=1, channel_id=2, use_cache=False) == 'x'
+
+
+@pytest.mark.asyncio
+async def test_llm_cancelled_caller_does_not_cancel_coalesced_waiters():
+    client = LLMClient(rate_per_minute=600, burst=10)
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return 'shared'
+
+    owner = asyncio.create_task(client.generate('q', fetch))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(client.generate('q', fetch))
+    await asyncio.sleep(0)
+    owner.cancel()
+    release.set()
+    assert await waiter == 'shared'
+    assert owner.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_llm_scopes_and_batch_callers_skip_channel_buckets():
+    client = LLMClient(rate_per_minute=1, burst=1, max_wait=0.1)
+
+    async def fetch():
+        return 'x'
+
+    await client.generate('a', fetch, scope='motivation', guild_id=1, channel_id=1, use_cache=False)
+    # another cog in the same channel is not starved
+    assert await client.generate('b', fetch, scope='gemini_reply', guild_id=1, channel_id=1, use_cache=False) == 'x'
+    # batch jobs bypass the buckets entirely
+    for i in range(5):
+        assert await client.generate(f'c{i}', fetch, rate_limit=False, use_cache=False) == 'x'
+
+
+@pytest.mark.asyncio
+async def test_llm_waiter_is_not_rate_limited_by_another_bucket():
+    client = LLMClient(rate_per_minute=1, burst=1, max_wait=0.05)
+
+    async def fetch():
+        return 'x'
+
+    await client.generate('warm up', fetch, scope='busy', use_cache=False)
+    # 'busy' has no tokens left; 'idle' joins its in-flight fetch for the same prompt
+    busy = asyncio.create_task(client.generate('q', fetch, scope='busy'))
+    await asyncio.sleep(0)
+    idle = asyncio.create_task(client.generate('q', fetch, scope='idle'))
+    with pytest.raises(LLMRateLimited):
+        await busy
+    assert await idle == 'x'
+    assert client.stats['coalesced'] == 1
@@ -0,0 +1,58 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.db import DB
+from utils.media_catalog import MediaCatalog
+
+
+def entry(path):
+    return {'path': path, 'size': 1, 'mtime': 0.0, 'mime': 'application/pdf', 'sha256': path}
+
+
+def test_search_prefix_then_substring_and_random_after_removal():
+    catalog = MediaCatalog('media')
+    for path in ['pdf/Notes-Physics.pdf', 'pdf/notes-chem.pdf', 'img/physics_diagram.png', 'zz.txt']:
+        catalog._index(entry(path))
+
+    assert catalog.search('PDF/notes') == ['pdf/notes-chem.pdf', 'pdf/Notes-Physics.pdf']
+    assert catalog.search('physics') == ['img/physics_diagram.png', 'pdf/Notes-Physics.pdf']
+    assert catalog.search('z') == ['zz.txt']
+    assert catalog.search('missing') == []
+
+    catalog._unindex('pdf/notes-chem.pdf')
+    assert 'pdf/notes-chem.pdf' not in catalog.search('notes')
+    assert {catalog.random_path() for _ in range(200)} == {
+        'pdf/Notes-Physics.pdf', 'img/physics_diagram.png', 'zz.txt'}
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_rehashes_changed_files(tmp_path, monkeypatch):
+    saved, deleted = [], []
+
+    async def save(rows):
+        saved.extend(r[0] for r in rows)
+
+    async def delete(paths):
+        deleted.extend(paths)
+
+    monkeypatch.setattr(DB, 'save_media_entries', save)
+    monkeypatch.setattr(DB, 'delete_media_entries', delete)
+    (tmp_path / 'pdf').mkdir()
+    (tmp_path / 'pdf' / 'a.pdf').write_bytes(b'a')
+    (tmp_path / 'b.txt').write_bytes(b'b')
+    catalog = MediaCatalog(tmp_path)
+
+    assert await catalog.refresh() == (2, 0)
+    assert catalog.entries['b.txt']['mime'] == 'text/plain'
+    saved.clear()
+    assert await catalog.refresh() == (0, 0)
+
+    (tmp_path / 'b.txt').unlink()
+    (tmp_path / 'c.md').write_bytes(b'c')
+    assert await catalog.refresh() == (1, 1)
+    assert saved == ['c.md'] and deleted == ['b.txt']
+    assert catalog.paths() == ['c.md', 'pdf/a.pdf']
@@ -0,0 +1,77 @@
+import os
+import sys
+import io
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.media_store import MediaStore, dedup_report
+
+
+@pytest.mark.asyncio
+async def test_same_content_is_stored_once_and_hardlinked(tmp_path):
+    store = MediaStore(tmp_path)
+    first = await store.ingest(b'%PDF notes', 'pdf/notes.pdf')
+    second = await store.ingest(b'%PDF notes', 'pdf/notes-copy.pdf')
+    store.close()
+
+    assert not first['deduplicated'] and second['deduplicated']
+    assert first['sha256'] == second['sha256']
+    assert (tmp_path / 'pdf' / 'notes-copy.pdf').read_bytes() == b'%PDF notes'
+    if second['hardlinked']:
+        assert os.path.samefile(tmp_path / 'pdf' / 'notes.pdf', tmp_path / 'pdf' / 'notes-copy.pdf')
+    assert len(list((tmp_path / '.blobs').glob('*/*'))) == 1
+
+
+@pytest.mark.asyncio
+async def test_blob_edited_in_place_is_not_reused(tmp_path):
+    store = MediaStore(tmp_path)
+    await store.ingest(b'original', 'a.txt')
+    with open(tmp_path / 'a.txt', 'wb') as f:  # edits the shared inode
+        f.write(b'edited!!')
+    again = await store.ingest(b'original', 'b.txt')
+    store.close()
+    assert not again['deduplicated']
+    assert (tmp_path / 'b.txt').read_bytes() == b'original'
+
+
+
+@pytest.mark.asyncio
+async def test_failed_ingest_leaves_no_temp_files(tmp_path, monkeypatch):
+    store = MediaStore(tmp_path)
+    await store.ingest(b'shared', 'a.txt')
+
+    def broken_replace(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', broken_replace)
+    with pytest.raises(OSError):
+        await store.ingest(b'shared', 'b.txt')
+    with pytest.raises(OSError):
+        await store.ingest(b'fresh', 'c.txt')
+    monkeypatch.undo()
+    store.close()
+    assert not [p for p in tmp_path.rglob('*') if p.name.endswith('.tmp')]
+    assert (tmp_path / 'a.txt').read_bytes() == b'shared'
+
+
+@pytest.mark.asyncio
+async def test_png_recompression_is_lossless(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    image = Image.new('RGB', (64, 64), (10, 200, 30))
+    raw = io.BytesIO()
+    image.save(raw, format='PNG', compress_level=0)
+    store = MediaStore(tmp_path, recompress=True)
+    result = await store.ingest(raw.getvalue(), 'img/flat.png')
+    store.close()
+    assert result['saved'] > 0
+    with Image.open(tmp_path / 'img' / 'flat.png') as stored:
+        assert stored.convert('RGB').tobytes() == image.tobytes()
+
+
+def test_dedup_report_ratio():
+    report = dedup_report([{'size': 100, 'sha256': 'a'}, {'size': 100, 'sha256': 'a'},
+                           {'size': 50, 'sha256': 'b'}])
+    assert report['unique'] == 2 and report['unique_bytes'] == 150
+    assert report['ratio'] == pytest.approx(250 / 150)
@@ -0,0 +1,51 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from cogs.music import GuildPlayer
+
+
+def make_player(playlist):
+    cog = SimpleNamespace(bot=SimpleNamespace(loop=None), _playlist_cache=list(playlist))
+    player = GuildPlayer(cog, SimpleNamespace(id=1))
+    resolved = []
+
+    async def fake_resolve(url):
+        resolved.append(url)
+        await asyncio.sleep(0.01)
+        return {'url': f'stream:{url}', 'title': url}
+    player._resolve = fake_resolve
+    return player, resolved
+
+
+@pytest.mark.asyncio
+async def test_prefetch_resolves_next_track_in_background():
+    player, resolved = make_player(['a', 'b'])
+    url, info = await player._take_next()
+    assert (url, info['url']) == ('a', 'stream:a')
+
+    player._start_prefetch()
+    await asyncio.sleep(0.05)
+    assert resolved == ['a', 'b']  # resolved while "a" would be playing
+    url, info = await player._take_next()
+    assert url == 'b' and resolved == ['a', 'b']
+
+    # the playlist loops once the queue is drained
+    url, _ = await player._take_next()
+    assert url == 'a'
+
+
+@pytest.mark.asyncio
+async def test_players_keep_separate_queues():
+    first, _ = make_player(['a', 'b'])
+    second, _ = make_player(['a', 'b'])
+    await first._take_next()
+    assert second.queue == ['a', 'b']
+    first._start_prefetch()
+    first._clear_prefetch()
+    assert first.queue == ['b']
@@ -0,0 +1,56 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import discord
+import pytest
+from utils.presence import PRIORITY_CREDIT, PRIORITY_MUSIC, PRIORITY_STATUS, PresenceManager
+
+
+class FakeBot:
+    def __init__(self, shards=None):
+        self.sent = []
+        if shards:
+            self.shards = dict.fromkeys(shards)
+
+    async def change_presence(self, activity=None, shard_id=None):
+        self.sent.append((shard_id, activity.name if activity else None))
+
+
+@pytest.mark.asyncio
+async def test_music_pins_over_rotation_and_only_changes_are_sent():
+    bot = FakeBot()
+    presence = PresenceManager(bot, min_interval=15)
+    playing = {}
+    presence.register('status', lambda shard: discord.Game(name='Ping: 40ms'), priority=PRIORITY_STATUS)
+    presence.register('credit', lambda shard: discord.Game(name='credit'), priority=PRIORITY_CREDIT)
+    presence.register('music', lambda shard: playing.get(shard), priority=PRIORITY_MUSIC, rotate=False)
+
+    await presence.push(now=0)
+    assert await presence.push(now=20) is None  # same presence: nothing sent
+    presence._step += 1
+    await presence.push(now=40)
+    assert bot.sent == [(None, 'Ping: 40ms'), (None, 'credit')]
+
+    playing[None] = discord.Activity(type=discord.ActivityType.listening, name='song')
+    assert await presence.push(now=45) == 55  # rate limited until 15s after the last update
+    await presence.push(now=55)
+    presence._step += 1
+    await presence.push(now=200)  # rotation does not replace a pinned source
+    playing.clear()
+    await presence.push(now=300)
+    assert bot.sent[2:] == [(None, 'song'), (None, 'Ping: 40ms')]
+    assert presence.stats['deferred'] == 1
+
+
+@pytest.mark.asyncio
+async def test_each_shard_gets_its_own_presence():
+    bot = FakeBot(shards=[0, 1])
+    presence = PresenceManager(bot, min_interval=15)
+    presence.register('credit', lambda shard: discord.Game(name='credit'), priority=PRIORITY_CREDIT)
+    presence.register('music', lambda shard: discord.Game(name='song') if shard == 1 else None,
+                      priority=PRIORITY_MUSIC, rotate=False)
+    await presence.push(now=0)
+    assert sorted(bot.sent) == [(0, 'credit'), (1, 'song')]
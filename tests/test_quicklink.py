@@ -0,0 +1,22 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+pytest.importorskip('qrcode')
+pytest.importorskip('discord')
+
+from cogs.quicklink import render_qr_png
+
+
+def test_qr_render_is_cached_per_payload_and_style():
+    render_qr_png.cache_clear()
+    first = render_qr_png('https://example.com')
+    again = render_qr_png('https://example.com')
+    assert first.startswith(b'\x89PNG') and again is first
+    assert render_qr_png('https://example.com', ('H', 10, 4)) != first
+    info = render_qr_png.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
@@ -0,0 +1,72 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.role_executor import RoleChangeExecutor
+
+
+class FakeGuild:
+    def __init__(self, guild_id, member_ids, fail=()):
+        self.id = guild_id
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.roles = {}
+        self._members = {uid: self._member(uid, uid in fail) for uid in member_ids}
+
+    def _member(self, uid, fail):
+        async def change(role, reason=None, add=True):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            if fail:
+                raise RuntimeError('Missing Permissions')
+            self.roles[uid] = add
+
+        return SimpleNamespace(id=uid,
+                               add_roles=lambda role, reason=None: change(role, reason, True),
+                               remove_roles=lambda role, reason=None: change(role, reason, False))
+
+    def get_member(self, uid):
+        return self._members.get(uid)
+
+
+@pytest.mark.asyncio
+async def test_changes_are_applied_with_a_per_guild_limit():
+    executor = RoleChangeExecutor(per_guild_rate=1000, per_guild_concurrency=2)
+    big = FakeGuild(1, range(20))
+    small = FakeGuild(2, range(3))
+    role = SimpleNamespace(id=99)
+    handled = []
+
+    async def checkpoint(uid):
+        handled.append(uid)
+
+    (ok_big, failed_big), (ok_small, _) = await asyncio.gather(
+        executor.apply(big, role, add=set(range(10)), remove=set(range(10, 20)), on_change=checkpoint),
+        executor.apply(small, role, add={0, 1, 2}))
+
+    assert (ok_big, failed_big, ok_small) == (20, 0, 3)
+    assert big.max_in_flight == 2 and small.max_in_flight <= 2
+    assert big.roles == {uid: uid < 10 for uid in range(20)}
+    assert sorted(handled) == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_missing_members_skipped():
+    executor = RoleChangeExecutor(per_guild_rate=1000)
+    guild = FakeGuild(1, [1, 2], fail={2})
+    handled = []
+
+    async def checkpoint(uid):
+        handled.append(uid)
+
+    ok, failed = await executor.apply(guild, SimpleNamespace(id=5), add={1, 2, 3}, on_change=checkpoint)
+    assert (ok, failed) == (2, 1)
+    assert sorted(handled) == [1, 3]
+    assert executor.stats['skipped'] == 1 and executor.stats['failed'] == 1
@@ -0,0 +1,29 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.speech_engines import (GoogleEngine, TranscriptionEngine, VoskEngine, WhisperEngine,
+                                  create_engine, match_command)
+
+COMMANDS = {'start timer': '/focus', 'show stats': '/stats'}
+
+
+def test_match_command_needs_whole_words():
+    assert match_command('Start timer, please!', COMMANDS) == '/focus'
+    assert match_command('could you SHOW   stats', COMMANDS) == '/stats'
+    assert match_command('restart timers', COMMANDS) is None
+    assert match_command(None, COMMANDS) is None
+
+
+def test_engine_phrases_are_normalized():
+    engine = TranscriptionEngine(phrases=['Show Stats!'])
+    assert engine.phrases == ['show stats']
+
+
+def test_unavailable_engine_falls_back_to_auto(monkeypatch):
+    monkeypatch.setattr(VoskEngine, 'available', classmethod(lambda cls: False))
+    monkeypatch.setattr(WhisperEngine, 'available', classmethod(lambda cls: False))
+    assert isinstance(create_engine('vosk', phrases=COMMANDS), GoogleEngine)
+    assert isinstance(create_engine('auto'), GoogleEngine)
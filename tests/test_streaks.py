@@ -0,0 +1,74 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.db import DB
+from utils.streaks import Streak
+from utils.timebuckets import local_time
+from utils.user_stats import UserStats
+
+USER = 920001
+# far-future local midnight, so the test's days are the user's only ones
+START = local_time.day_start(4_000_000_000)
+DAY = 86400
+
+
+def test_record_tracks_current_and_longest():
+    streak = Streak()
+    for day in (10, 11, 11, 12, 15, 16):
+        streak = streak.record(day)
+    assert (streak.count, streak.longest, streak.last_day) == (2, 3, 16)
+    assert streak.record(16) is streak
+    assert streak.current(17) == 2 and streak.current(18) == 0
+    assert streak.studied(16, window=7) == [True, True, True, False, False, True, True]
+    # late logs for days 14 and 13 join the two runs
+    late = streak.record(14).record(13)
+    assert (late.count, late.longest) == (7, 7)
+
+
+@pytest.mark.asyncio
+async def test_incremental_streak_matches_recompute():
+    await DB.init_db()
+    await DB.execute('DELETE FROM study_logs WHERE user_id = ?', (USER,))
+    await DB.execute('DELETE FROM streaks WHERE user_id = ?', (USER,))
+    try:
+        for day, hour in [(0, 1), (0, 20), (1, 12), (2, 23), (5, 6), (6, 6)]:
+            await DB.add_study_log(user_id=USER, minutes=30, ts=START + day * DAY + hour * 3600, topic='streaks')
+        incremental = await DB.get_streak_state(USER)
+        assert (incremental.count, incremental.longest) == (2, 3)
+        await DB.recompute_streaks(USER)
+        assert await DB.get_streak_state(USER) == incremental
+    finally:
+        await DB.execute('DELETE FROM study_logs WHERE user_id = ?', (USER,))
+        await DB.execute('DELETE FROM streaks WHERE user_id = ?', (USER,))
+        await DB.forget_user_stats(USER)
+
+
+@pytest.mark.asyncio
+async def test_failed_log_is_rolled_back(monkeypatch):
+    await DB.init_db()
+    await DB.execute('DELETE FROM study_logs WHERE user_id = ?', (USER,))
+    await DB.execute('DELETE FROM streaks WHERE user_id = ?', (USER,))
+    try:
+        await DB.add_study_log(user_id=USER, minutes=30, ts=START, topic='streaks')
+
+        def broken(self):
+            raise RuntimeError('disk full')
+
+        monkeypatch.setattr(UserStats, 'to_row', broken)
+        with pytest.raises(RuntimeError):
+            await DB.add_study_log(user_id=USER, minutes=45, ts=START + DAY, topic='streaks')
+        monkeypatch.undo()
+        await DB.set_kv('test_rollback', '')  # an unrelated commit must not persist the failed log
+
+        rows = await DB.fetchall('SELECT minutes FROM study_logs WHERE user_id = ?', (USER,))
+        assert [r['minutes'] for r in rows] == [30]
+        assert (await DB.get_streak_state(USER)).count == 1
+        assert (await DB.get_user_stats(USER)).total_minutes == 30
+    finally:
+        await DB.execute('DELETE FROM study_logs WHERE user_id = ?', (USER,))
+        await DB.execute('DELETE FROM streaks WHERE user_id = ?', (USER,))
+        await DB.forget_user_stats(USER)
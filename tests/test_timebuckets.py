@@ -0,0 +1,45 @@
+import os
+import sys
+import datetime
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.timebuckets import TimeBuckets, get_tz
+
+
+def _expected(tz_name, ts):
+    tz = get_tz(tz_name)
+    day = datetime.datetime.fromtimestamp(ts, tz).date()
+    monday = day - datetime.timedelta(days=day.weekday())
+
+    def midnight(d):
+        return int(tz.localize(datetime.datetime(d.year, d.month, d.day)).timestamp())
+
+    return midnight(day), midnight(monday), day
+
+
+def test_buckets_match_datetime():
+    # hourly across a year around now, plus the 2024 US DST switches
+    now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+    stamps = list(range(now - 200 * 86400, now + 200 * 86400, 3600 * 7 + 13))
+    stamps += list(range(1710043200 - 86400, 1710043200 + 86400, 900))   # 2024-03-10 America/New_York
+    stamps += list(range(1730606400 - 86400, 1730606400 + 86400, 900))   # 2024-11-03
+    for tz_name in ('UTC', 'Asia/Kolkata', 'America/New_York'):
+        buckets = TimeBuckets(tz_name)
+        for ts in stamps:
+            day_start, week_start, day = _expected(tz_name, ts)
+            assert buckets.day_start(ts) == day_start, (tz_name, ts)
+            assert buckets.week_start(ts) == week_start, (tz_name, ts)
+            assert buckets.day_key(ts) == day.isoformat(), (tz_name, ts)
+
+
+def test_fixed_offset_fast_path_and_day_numbers():
+    assert TimeBuckets('Asia/Kolkata')._offset == 5 * 3600 + 1800
+    assert TimeBuckets('America/New_York')._offset is None
+    ist = TimeBuckets('Asia/Kolkata')
+    now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+    midnight = ist.day_start(now)
+    assert ist.day_number(midnight) == ist.day_number(midnight - 1) + 1
+    assert ist.day_number(midnight + 86399) == ist.day_number(midnight)
+    assert ist.week_start(now) <= now < ist.week_start(now) + 7 * 86400
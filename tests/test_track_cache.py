@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.db import DB
+from utils.track_cache import TrackCache, stream_expiry, video_id_from_url
+
+
+def test_video_id_and_expiry_parsing():
+    assert video_id_from_url('https://www.youtube.com/watch?v=abc123&list=x') == 'abc123'
+    assert video_id_from_url('https://youtu.be/xyz789?t=3') == 'xyz789'
+    assert video_id_from_url('https://music.youtube.com/watch?v=m1') == 'm1'
+    assert video_id_from_url('https://example.com/a') is None
+    assert stream_expiry('https://r1.googlevideo.com/videoplayback?expire=1700000000&ei=x') == 1700000000
+    assert stream_expiry('https://host/videoplayback/expire/1700000001/ei/x') == 1700000001
+    assert stream_expiry('https://host/a.mp3', now=100) == 100 + 3600
+
+
+@pytest.mark.asyncio
+async def test_track_cache_refreshes_expired_stream_urls():
+    await DB.init_db()
+    cache = TrackCache()
+    vid = f'test-{time.time_ns()}'
+    fresh = int(time.time()) + 6 * 3600
+    info = {'id': vid, 'title': 'Song', 'duration': 200, 'formats': [{'format_id': '251', 'ext': 'webm', 'url': 'x'}],
+            'url': f'https://r1.googlevideo.com/videoplayback?expire={fresh}'}
+    await cache.put(info)
+    cached = await cache.get(vid)
+    assert cached['title'] == 'Song'
+    assert cached['formats'] == [{'format_id': '251', 'ext': 'webm'}]
+
+    info['url'] = f'https://r1.googlevideo.com/videoplayback?expire={int(time.time()) + 60}'
+    await cache.put(info)
+    assert await cache.get(vid) is None  # would lapse mid-track
+
+
+@pytest.mark.asyncio
+async def test_playlist_sync_diffs_ids():
+    await DB.init_db()
+    cache = TrackCache()
+    playlist = f'test-playlist-{time.time_ns()}'
+    assert await cache.sync_playlist(playlist, [{'id': 'a'}, {'id': 'b'}]) == (2, 0)
+    assert await cache.sync_playlist(playlist, [{'id': 'b'}, {'id': 'c'}, {'id': 'c'}]) == (1, 1)
+    assert await cache.playlist(playlist) == ['https://www.youtube.com/watch?v=b', 'https://www.youtube.com/watch?v=c']
+    assert await cache.playlist_synced_at(playlist) > 0
@@ -0,0 +1,58 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.db import DB
+from utils.timebuckets import local_time
+from utils.user_stats import RECENT_SESSIONS, UserStats, UserStatsCache
+
+USER = 930001
+DAY = 86400
+# far-future local midnight, so the test's logs are the user's only ones
+START = local_time.day_start(4_000_000_000)
+
+
+def test_weekly_windows_and_recent_sessions():
+    stats = UserStats(1)
+    for day, minutes, topic in [(0, 30, 'Math'), (3, 20, 'math'), (8, 45, 'Physics'), (10, 15, None), (10, 5, 'Math')]:
+        stats.add(minutes, day * DAY, topic, day)
+    assert (stats.total_minutes, stats.sessions) == (115, 5)
+    assert stats.subjects == {'math': 55, 'physics': 45, 'unknown': 15}
+    assert stats.week_minutes(10) == ({'physics': 45, 'unknown': 15, 'math': 5}, {'math': 50})
+    assert stats.subject_window(10, days=3) == {'physics': [45, 1], 'unknown': [15, 1], 'math': [5, 1]}
+    for i in range(RECENT_SESSIONS + 5):
+        stats.add(1, 30 * DAY + i, 'x', 30)
+    assert [s[0] for s in stats.recent] == [30 * DAY + i for i in range(RECENT_SESSIONS + 4, 4, -1)]
+    assert list(stats.days) == [30]  # older days fall out of the window
+
+    cache = UserStatsCache(maxsize=2)
+    for uid in (1, 2, 3):
+        cache.put(UserStats(uid))
+    assert cache.get(1) is None and cache.get(3).user_id == 3 and len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_logs_and_survive_a_rebuild():
+    await DB.init_db()
+    await DB.execute('DELETE FROM study_logs WHERE user_id = ?', (USER,))
+    await DB.forget_user_stats(USER)
+    try:
+        for offset, minutes, topic in [(0, 30, 'Math'), (DAY, 40, 'Physics'), (DAY + 60, 10, '')]:
+            await DB.add_study_log(user_id=USER, minutes=minutes, ts=START + offset, topic=topic)
+        stats = await DB.get_user_stats(USER)
+        assert (stats.total_minutes, stats.sessions) == (80, 3)
+        assert stats.recent[0] == (START + DAY + 60, 10, '')
+
+        # the summary row round-trips, and a rebuild from study_logs agrees with it
+        DB._user_stats.discard(USER)
+        stored = await DB.get_user_stats(USER)
+        assert (stored.subjects, stored.days, stored.recent) == (stats.subjects, stats.days, stats.recent)
+        rebuilt = await DB._build_user_stats(USER)
+        assert (rebuilt.total_minutes, rebuilt.subjects, rebuilt.recent) == (80, stats.subjects, stats.recent)
+    finally:
+        await DB.execute('DELETE FROM study_logs WHERE user_id = ?', (USER,))
+        await DB.execute('DELETE FROM streaks WHERE user_id = ?', (USER,))
+        await DB.forget_user_stats(USER)
@@ -0,0 +1,46 @@
+import os
+import sys
+import math
+import struct
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.voice_pipeline import DISCORD_RATE, RECOGNIZE_RATE, EnergyVAD, SpeechPipeline, to_mono
+
+
+def stereo_pcm(seconds, amplitude=0, rate=DISCORD_RATE):
+    """16-bit stereo PCM: a 440 Hz tone at `amplitude`, or silence."""
+    frames = []
+    for i in range(int(seconds * rate)):
+        sample = int(amplitude * math.sin(2 * math.pi * 440 * i / rate))
+        frames.append(struct.pack('<hh', sample, sample))
+    return b''.join(frames)
+
+
+@pytest.mark.asyncio
+async def test_silent_slices_skip_recognition():
+    calls = []
+    pipeline = SpeechPipeline(lambda audio: calls.append(audio) or 'nothing')
+    assert await pipeline.transcribe(stereo_pcm(1)) is None
+    assert calls == []
+    assert pipeline.stats['silent'] == 1
+
+
+@pytest.mark.asyncio
+async def test_speech_is_trimmed_and_recognized_as_mono_16k():
+    calls = []
+    pipeline = SpeechPipeline(lambda audio: calls.append(audio) or 'start timer')
+    pcm = stereo_pcm(1) + stereo_pcm(0.5, amplitude=8000) + stereo_pcm(1)
+    assert await pipeline.transcribe(pcm) == 'start timer'
+    audio = calls[0]
+    assert audio.sample_rate == RECOGNIZE_RATE and audio.sample_width == 2
+    # 0.5 s of tone plus up to 2 x 150 ms of padding, not the full 2.5 s
+    assert len(audio.frame_data) <= 0.85 * RECOGNIZE_RATE * 2
+
+
+def test_short_noise_burst_is_not_speech():
+    vad = EnergyVAD(threshold=300, min_speech_ms=240)
+    mono = to_mono(stereo_pcm(0.06, amplitude=8000, rate=RECOGNIZE_RATE))
+    assert vad.trim(mono) is None
@@ -0,0 +1,53 @@
+import os
+import sys
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from cogs.activity import week_start_for_ts
+from utils.db import DB
+from utils.voice_sessions import WEEK_SECONDS, VoiceSessionTracker
+
+# far-future Monday 00:00 UTC
+WEEK = week_start_for_ts(4_000_000_000)
+
+
+def test_sessions_split_at_week_boundaries():
+    tracker = VoiceSessionTracker(week_start_for_ts)
+    tracker.update(1, 10, True, now=WEEK - 600)
+    tracker.update(1, 10, True, now=WEEK - 300)  # moved channel: same session
+    tracker.update(1, 10, False, now=WEEK + 900)
+    assert tracker.pending == {(1, 10, WEEK - WEEK_SECONDS): 600, (1, 10, WEEK): 900}
+    assert not tracker.open
+
+
+@pytest.mark.asyncio
+async def test_flush_checkpoints_and_recovery(monkeypatch):
+    writes = []
+
+    async def save(seconds, sessions):
+        writes.append((sorted(seconds), sorted(sessions)))
+
+    monkeypatch.setattr(DB, 'save_voice_checkpoint', save)
+    tracker = VoiceSessionTracker(week_start_for_ts, max_gap=300)
+    tracker.update(1, 10, True, now=WEEK + 100)
+    tracker.update(1, 20, True, now=WEEK + 100)
+    tracker.update(1, 20, False, now=WEEK + 160)
+    assert await tracker.flush(now=WEEK + 200) == 2
+    assert writes[-1] == ([(1, 10, WEEK, 100), (1, 20, WEEK, 60)], [(1, 10, WEEK + 200)])
+
+    # restart: the checkpoint comes back; user 10 is still in voice after a short deploy
+    restarted = VoiceSessionTracker(week_start_for_ts, max_gap=300)
+    restarted._recovered = {(1, 10): WEEK + 200, (1, 30): WEEK + 200}
+    restarted.reconcile(1, [10, 40], now=WEEK + 260)
+    assert restarted.open == {(1, 10): WEEK + 200, (1, 40): WEEK + 260}
+    assert not restarted._recovered  # user 30 left while the bot was down
+    await restarted.flush(now=WEEK + 300)
+    assert writes[-1][0] == [(1, 10, WEEK, 100), (1, 40, WEEK, 40)]
+
+    # a long outage is not credited
+    late = VoiceSessionTracker(week_start_for_ts, max_gap=300)
+    late._recovered = {(1, 10): WEEK + 200}
+    late.reconcile(1, [10], now=WEEK + 5000)
+    assert late.open == {(1, 10): WEEK + 5000}
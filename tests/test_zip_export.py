@@ -0,0 +1,63 @@
+import os
+import sys
+import zipfile
+
+# allow running tests from repo root
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from utils.zip_export import build_volumes, plan_export
+
+
+def make_tree(root):
+    (root / 'cogs').mkdir()
+    (root / '.git').mkdir()
+    (root / '.git' / 'HEAD').write_text('ref')
+    (root / '.env').write_text('TOKEN=x')
+    for i in range(6):
+        # incompressible, so volume boundaries are predictable
+        (root / 'cogs' / f'c{i}.bin').write_bytes(os.urandom(40_000))
+    (root / 'bot.py').write_text('print("hi")\n' * 100)
+
+
+def test_volumes_stay_under_the_limit_and_hold_every_file(tmp_path):
+    make_tree(tmp_path)
+    plan = plan_export(str(tmp_path), {'.git', '.env'})
+    assert sorted(f.arcname for f in plan.files) == ['bot.py'] + [f'cogs/c{i}.bin' for i in range(6)]
+    assert 80_000 < plan.estimated_size < 240_000  # unknown extensions are assumed to compress
+
+    volumes = build_volumes(plan.files, volume_limit=100_000, name='export')
+    try:
+        assert len(volumes) > 2
+        assert volumes[0].filename == f'export.vol1of{len(volumes)}.zip'
+        names = []
+        for volume in volumes:
+            assert volume.size <= 100_000
+            with zipfile.ZipFile(volume.fp) as z:
+                assert z.testzip() is None
+                names += z.namelist()
+        assert sorted(names) == sorted(f.arcname for f in plan.files)
+    finally:
+        for volume in volumes:
+            volume.fp.close()
+
+    with pytest.raises(ValueError, match='c0.bin'):
+        build_volumes(plan.files, volume_limit=30_000, name='export')
+
+
+def test_changed_mode_sends_only_content_changes(tmp_path):
+    make_tree(tmp_path)
+    first = plan_export(str(tmp_path), {'.git'})
+    assert len(first.files) == 8
+
+    # touched but identical, edited, and new
+    os.utime(tmp_path / 'bot.py', (1, 1))
+    (tmp_path / 'cogs' / 'c0.bin').write_bytes(b'edited')
+    (tmp_path / 'notes.txt').write_text('new')
+    second = plan_export(str(tmp_path), {'.git'}, previous=first.manifest)
+    assert sorted(f.arcname for f in second.files) == ['bot.py', 'cogs/c0.bin', 'notes.txt']
+
+    # bot.py was first seen unhashed; now it has a hash, so a bare touch is skipped
+    os.utime(tmp_path / 'bot.py', (2, 2))
+    third = plan_export(str(tmp_path), {'.git'}, previous=second.manifest)
+    assert third.files == [] and third.unchanged == 9
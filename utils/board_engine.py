@@ -0,0 +1,314 @@
+"""Bitboard Connect-4 and Tic-Tac-Toe with a negamax search opponent.
+
+Boards are stored column-major in a single int, one bit per cell plus an
+always-empty sentinel bit on top of every column (so shifted lines never wrap
+from one column into the next):
+
+    Connect4 (7x6, stride 7)        TicTacToe (3x3, stride 4)
+     5 12 19 26 33 40 47             2  6 10
+     ...                             1  5  9
+     0  7 14 21 28 35 42             0  4  8
+
+A position is `(position, mask)`: `mask` has every stone, `position` the stones
+of the side to move. Playing a move is `position ^ mask, mask | bit`, and a
+line of N is found with a couple of shift-ANDs per direction, so win detection
+is O(1) whatever the board holds.
+
+`Engine` searches with negamax and alpha-beta pruning, a transposition table
+keyed on the position, and iterative deepening: it searches depth 1, 2, ...
+until the level's depth or the per-move time budget is reached and plays the
+best move of the deepest finished iteration. Levels map to depth:
+
+    game = Connect4()
+    game.play(3)                                   # True if the mover won
+    result = Engine(Connect4).best_move(game.position, game.mask, level='hard')
+    game.play(result.move)
+
+Run `python scripts/benchmark_games.py` for nodes/second and move latency.
+"""
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+WIN = 1000
+# scores beyond this are forced wins/losses, stored ply-independent in the table
+WIN_BOUND = WIN - 100
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class BoardGame:
+    """Two-player bitboard game; subclasses define geometry, moves and evaluation."""
+    WIDTH = 0
+    HEIGHT = 0
+    LEVELS: Dict[str, int] = {}
+
+    def __init__(self):
+        self.position = 0
+        self.mask = 0
+        self.plies = 0
+
+    # ── rules, on raw (position, mask) ints so the search allocates nothing ──
+    @classmethod
+    def bit(cls, col: int, row: int) -> int:
+        return 1 << (col * (cls.HEIGHT + 1) + row)
+
+    @classmethod
+    def moves(cls, position: int, mask: int) -> List[int]:
+        raise NotImplementedError
+
+    @classmethod
+    def move_bit(cls, mask: int, move: int) -> int:
+        raise NotImplementedError
+
+    @staticmethod
+    def aligned(stones: int) -> bool:
+        raise NotImplementedError
+
+    @staticmethod
+    def key(position: int, mask: int) -> int:
+        """Transposition table key, unique per position."""
+        return (mask << 64) | position
+
+    @classmethod
+    def evaluate(cls, position: int, mask: int) -> int:
+        """Heuristic score for the side to move, well inside (-WIN_BOUND, WIN_BOUND)."""
+        return 0
+
+    # ── game state ──
+    def can_play(self, move: int) -> bool:
+        return move in self.moves(self.position, self.mask)
+
+    def play(self, move: int) -> bool:
+        """Play `move` for the side to move; True if it completes a line."""
+        bit = self.move_bit(self.mask, move)
+        won = self.aligned(self.position | bit)
+        self.position, self.mask = self.position ^ self.mask, self.mask | bit
+        self.plies += 1
+        return won
+
+    def is_full(self) -> bool:
+        return not self.moves(self.position, self.mask)
+
+    def owner(self, col: int, row: int) -> Optional[int]:
+        """0 for the first player's stone, 1 for the second's, None if empty."""
+        bit = self.bit(col, row)
+        if not self.mask & bit:
+            return None
+        to_move = self.plies % 2
+        return to_move if self.position & bit else 1 - to_move
+
+
+class Connect4(BoardGame):
+    WIDTH = 7
+    HEIGHT = 6
+    LEVELS = {'easy': 1, 'medium': 4, 'hard': 42}
+    ORDER = (3, 2, 4, 1, 5, 0, 6)  # centre first: better cutoffs
+
+    BOTTOM = sum(1 << (c * 7) for c in range(7))
+    BOARD = BOTTOM * ((1 << 6) - 1)
+
+    @classmethod
+    def moves(cls, position: int, mask: int) -> List[int]:
+        return [c for c in cls.ORDER if not mask & (1 << (c * 7 + 5))]
+
+    @classmethod
+    def move_bit(cls, mask: int, move: int) -> int:
+        column = 0b111111 << (move * 7)
+        return (mask + (1 << (move * 7))) & column
+
+    @staticmethod
+    def key(position: int, mask: int) -> int:
+        # stones stack from the bottom, so mask + position is already unique
+        return position + mask
+
+    @staticmethod
+    def aligned(stones: int) -> bool:
+        for shift in (1, 7, 6, 8):
+            pairs = stones & (stones >> shift)
+            if pairs & (pairs >> 2 * shift):
+                return True
+        return False
+
+    @classmethod
+    def threats(cls, stones: int, mask: int) -> int:
+        """Empty cells that would complete four for `stones`."""
+        p = stones
+        r = (p << 1) & (p << 2) & (p << 3)
+        for shift in (7, 6, 8):
+            two = (p << shift) & (p << 2 * shift)
+            r |= two & (p << 3 * shift)
+            r |= two & (p >> shift)
+            two = (p >> shift) & (p >> 2 * shift)
+            r |= two & (p << shift)
+            r |= two & (p >> 3 * shift)
+        return r & (cls.BOARD ^ mask)
+
+    @classmethod
+    def evaluate(cls, position: int, mask: int) -> int:
+        mine = cls.threats(position, mask).bit_count()
+        theirs = cls.threats(position ^ mask, mask).bit_count()
+        centre = 0b111111 << 21
+        return 4 * (mine - theirs) + (position & centre).bit_count() - ((position ^ mask) & centre).bit_count()
+
+
+class TicTacToe(BoardGame):
+    WIDTH = 3
+    HEIGHT = 3
+    LEVELS = {'easy': 1, 'medium': 2, 'hard': 9}
+    # moves are cells numbered row * 3 + col from the top-left; centre, corners, edges
+    ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+    @classmethod
+    def cell_bit(cls, cell: int) -> int:
+        row, col = divmod(cell, 3)
+        return 1 << (col * 4 + 2 - row)
+
+    @classmethod
+    def moves(cls, position: int, mask: int) -> List[int]:
+        return [c for c in cls.ORDER if not mask & cls.cell_bit(c)]
+
+    @classmethod
+    def move_bit(cls, mask: int, move: int) -> int:
+        return cls.cell_bit(move)
+
+    @staticmethod
+    def aligned(stones: int) -> bool:
+        for shift in (1, 4, 3, 5):
+            pairs = stones & (stones >> shift)
+            if pairs & (pairs >> shift):
+                return True
+        return False
+
+    def cell_owner(self, cell: int) -> Optional[int]:
+        row, col = divmod(cell, 3)
+        return self.owner(col, 2 - row)
+
+
+class SearchResult(NamedTuple):
+    move: int
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class Engine:
+    """Iterative-deepening negamax for one `BoardGame` subclass.
+
+    Keep one engine per game so the transposition table carries over between
+    moves; it is cleared once it holds `max_entries` positions.
+    """
+
+    def __init__(self, game: type, time_budget: float = 0.08, max_entries: int = 200_000):
+        self.game = game
+        self.time_budget = time_budget
+        self.max_entries = max_entries
+        # position key -> (depth, score, bound, best move)
+        self.table: Dict[int, Tuple[int, int, int, int]] = {}
+        self.nodes = 0
+        self._deadline = 0.0
+
+    def best_move(self, position: int, mask: int, level: str = 'medium') -> SearchResult:
+        """Best move for the side to move, searching up to the level's depth; blocking."""
+        moves = self.game.moves(position, mask)
+        if not moves:
+            raise ValueError('No legal moves')
+        # equally good moves are then chosen at random, so games differ
+        random.shuffle(moves)
+        # never deeper than the stones left to play
+        max_depth = min(self.game.LEVELS[level], self.game.WIDTH * self.game.HEIGHT - mask.bit_count())
+        if len(self.table) > self.max_entries:
+            self.table.clear()
+        start = time.perf_counter()
+        self._deadline = start + self.time_budget
+        self.nodes = 0
+        best = SearchResult(moves[0], 0, 0, 0, 0.0)
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self._root(position, mask, moves, depth)
+            except _OutOfTime:
+                break
+            best = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start)
+            if abs(score) > WIN_BOUND:
+                break  # forced result found; deeper search cannot change it
+        return best._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def _root(self, position: int, mask: int, moves: List[int], depth: int) -> Tuple[int, int]:
+        entry = self.table.get(self.game.key(position, mask))
+        if entry is not None and entry[3] in moves:
+            moves = [entry[3]] + [m for m in moves if m != entry[3]]
+        game = self.game
+        alpha, beta = -WIN - 1, WIN + 1
+        best_move, best_score = moves[0], -WIN - 1
+        for move in moves:
+            bit = game.move_bit(mask, move)
+            if game.aligned(position | bit):
+                score = WIN - 1
+            else:
+                score = -self._negamax(position ^ mask, mask | bit, depth - 1, -beta, -alpha, 1)
+            if score > best_score:
+                best_move, best_score = move, score
+                alpha = max(alpha, score)
+        self.table[game.key(position, mask)] = (depth, best_score, EXACT, best_move)
+        return best_move, best_score
+
+    def _negamax(self, position: int, mask: int, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 255 and time.perf_counter() > self._deadline:
+            raise _OutOfTime
+        game = self.game
+        if depth == 0:
+            return game.evaluate(position, mask)
+        moves = game.moves(position, mask)
+        if not moves:
+            return 0
+        for move in moves:
+            if game.aligned(position | game.move_bit(mask, move)):
+                return WIN - ply - 1
+
+        key = game.key(position, mask)
+        alpha_orig = alpha
+        entry = self.table.get(key)
+        if entry is not None:
+            e_depth, e_score, e_bound, e_move = entry
+            if e_score > WIN_BOUND:
+                e_score -= ply
+            elif e_score < -WIN_BOUND:
+                e_score += ply
+            if e_depth >= depth:
+                if e_bound == EXACT:
+                    return e_score
+                if e_bound == LOWER:
+                    alpha = max(alpha, e_score)
+                else:
+                    beta = min(beta, e_score)
+                if alpha >= beta:
+                    return e_score
+            if e_move in moves:
+                moves.remove(e_move)
+                moves.insert(0, e_move)
+
+        best_score, best_move = -WIN - 1, moves[0]
+        for move in moves:
+            score = -self._negamax(position ^ mask, mask | game.move_bit(mask, move),
+                                   depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        bound = UPPER if best_score <= alpha_orig else LOWER if best_score >= beta else EXACT
+        stored = best_score
+        if stored > WIN_BOUND:
+            stored += ply
+        elif stored < -WIN_BOUND:
+            stored -= ply
+        self.table[key] = (depth, stored, bound, best_move)
+        return best_score
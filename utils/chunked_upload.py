@@ -0,0 +1,177 @@
+"""Streamed, chunked uploads of large files to a Discord channel.
+
+Files bigger than the guild's attachment limit are sent as `<name>.partN`
+attachments followed by a `<name>.manifest.json` that lists every part with
+its offset, size and SHA-256, plus the SHA-256 of the whole file, so recipients
+can reassemble and verify the download (see `reassemble`).
+
+The file is memory-mapped once. Each part is a `FileSlice`, a read-only file
+object over a window of the mapping, which aiohttp streams straight into the
+request body: no part is ever read into a separate `bytes`. Up to `concurrency`
+parts upload at once, paced by a token bucket so the channel's message rate
+limit is not tripped; checksums are computed in a worker thread meanwhile.
+
+    manifest, message = await upload_in_parts(channel, path, chunk_size=10 * 1024 * 1024)
+"""
+import asyncio
+import hashlib
+import io
+import json
+import mmap
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from utils.rate_limit import TokenBucket
+
+
+class FileSlice(io.RawIOBase):
+    """Seekable, read-only file object over a memoryview (e.g. part of an mmap)."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def close(self) -> None:
+        if not self.closed:
+            # the mapping cannot be closed while views of it are alive
+            self._view.release()
+        super().close()
+
+
+def plan_parts(size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """(offset, length) of each part of a `size`-byte file."""
+    return [(offset, min(chunk_size, size - offset)) for offset in range(0, size, chunk_size)]
+
+
+def hash_parts(view: memoryview, parts: List[Tuple[int, int]]) -> Tuple[str, List[str]]:
+    """SHA-256 of the whole buffer and of each part, in one pass; blocking."""
+    whole = hashlib.sha256()
+    digests = []
+    for offset, length in parts:
+        with view[offset:offset + length] as window:
+            whole.update(window)
+            digests.append(hashlib.sha256(window).hexdigest())
+    return whole.hexdigest(), digests
+
+
+def build_manifest(name: str, size: int, parts: List[Tuple[int, int]], whole: str,
+                   digests: List[str]) -> Dict:
+    part_names = [f'{name}.part{i}' for i in range(1, len(parts) + 1)]
+    return {
+        'name': name,
+        'size': size,
+        'sha256': whole,
+        'parts': [
+            {'name': part, 'offset': offset, 'size': length, 'sha256': digest}
+            for part, (offset, length), digest in zip(part_names, parts, digests)
+        ],
+        'reassemble': {
+            'unix': f"cat {' '.join(part_names)} > {name}",
+            'windows': f"copy /b {'+'.join(part_names)} {name}",
+        },
+    }
+
+
+async def upload_in_parts(channel, path: Path, chunk_size: int, concurrency: int = 3,
+                          rate: float = 1.0,
+                          on_progress: Optional[Callable[[int, int], None]] = None) -> Tuple[Dict, object]:
+    """Upload `path` to `channel` as .partN attachments plus a manifest.
+
+    Returns (manifest, the message carrying the manifest).
+    """
+    size = path.stat().st_size
+    if size == 0:
+        raise ValueError('Cannot split an empty file')
+    parts = plan_parts(size, chunk_size)
+    bucket = TokenBucket(rate, capacity=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            hashing = asyncio.ensure_future(asyncio.to_thread(hash_parts, view, parts))
+
+            async def send_part(index: int, offset: int, length: int):
+                nonlocal done
+                async with semaphore:
+                    await bucket.acquire()
+                    part = FileSlice(view[offset:offset + length])
+                    file = discord.File(part, filename=f'{path.name}.part{index}')
+                    try:
+                        await channel.send(file=file)
+                    finally:
+                        # discord.File stubs out close(); restore it before releasing the view
+                        file.close()
+                        part.close()
+                done += 1
+                if on_progress:
+                    on_progress(done, len(parts))
+
+            uploads = [asyncio.ensure_future(send_part(i, offset, length))
+                       for i, (offset, length) in enumerate(parts, start=1)]
+            try:
+                await asyncio.gather(*uploads)
+            except BaseException:
+                for task in uploads:
+                    task.cancel()
+                await asyncio.gather(*uploads, return_exceptions=True)
+                raise
+            finally:
+                # the hashing thread must let go of the mapping before it is closed
+                whole, digests = await hashing
+        finally:
+            view.release()
+
+    manifest = build_manifest(path.name, size, parts, whole, digests)
+    payload = json.dumps(manifest, indent=2).encode('utf-8')
+    message = await channel.send(file=discord.File(io.BytesIO(payload), filename=f'{path.name}.manifest.json'))
+    return manifest, message
+
+
+def reassemble(manifest_path: Path, output: Optional[Path] = None) -> Path:
+    """Join the parts listed in a manifest (found next to it) and verify every checksum.
+
+    Raises ValueError naming the first part or file whose size or hash does not match.
+    """
+    manifest = json.loads(Path(manifest_path).read_text(encoding='utf-8'))
+    folder = Path(manifest_path).parent
+    output = Path(output or folder / manifest['name'])
+    whole = hashlib.sha256()
+    with open(output, 'wb') as out:
+        for part in manifest['parts']:
+            data = (folder / part['name']).read_bytes()
+            if len(data) != part['size'] or hashlib.sha256(data).hexdigest() != part['sha256']:
+                raise ValueError(f"{part['name']} is corrupt or incomplete")
+            whole.update(data)
+            out.write(data)
+    if whole.hexdigest() != manifest['sha256']:
+        raise ValueError(f"{manifest['name']} does not match its checksum")
+    return output
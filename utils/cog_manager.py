@@ -1,5 +1,6 @@
 """Cog loading order and management"""
-from typing import List, Dict
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from pathlib import Path
 
 # Define cog dependencies and loading order
@@ -7,13 +8,13 @@ COG_ORDER = [
     # Core functionality first
     'owner',
     'admin',
-    
+
     # Database dependent cogs
     'study',
     'progress',
     'reminders',
     'todo',
-    
+
     # Feature cogs
     'activity',
     'announcements',
@@ -28,8 +29,92 @@ COG_ORDER = [
     'reactions',
 ]
 
-# Optional cogs that won't stop the bot if they fail to load
+# Optional cogs that won't stop the bot if they fail to load.
+# They are loaded in the background once the gateway is connected.
 OPTIONAL_COGS = {
     'gemini_reply',  # Requires API key
-    'music',         # Requires additional dependencies
-}
\ No newline at end of file
+    'music',         # Requires additional dependencies; fetches the playlist on load
+    'voice',         # Requires speech_recognition
+}
+
+# Cogs that must finish loading before the given cog starts: {cog: {cogs it needs}}.
+# Cogs without an entry can load concurrently with everything else. A required
+# cog never waits for an optional one; it looks the cog up at runtime instead.
+COG_DEPENDENCIES: Dict[str, Set[str]] = {
+    'games': {'gemini_reply'},  # asks GeminiReply to explain wrong quiz answers
+    'website': {'music'},       # /api/music/status reads the Music cog
+}
+
+
+def discover_cogs(cogs_dir: Path) -> List[str]:
+    """Names of every cog module in `cogs_dir` (files starting with '_' are skipped)."""
+    return [f.stem for f in cogs_dir.glob('*.py') if not f.name.startswith('_')]
+
+
+def split_optional(names: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Split cog names into (required, optional)."""
+    names = list(names)
+    return [n for n in names if n not in OPTIONAL_COGS], [n for n in names if n in OPTIONAL_COGS]
+
+
+def _dependencies(name: str, names: Set[str]) -> Set[str]:
+    deps = COG_DEPENDENCIES.get(name, set()) & names
+    if name not in OPTIONAL_COGS:
+        deps = {d for d in deps if d not in OPTIONAL_COGS}
+    return deps
+
+
+def resolve_load_order(names: Iterable[str]) -> List[str]:
+    """Topologically sort `names` by COG_DEPENDENCIES, using COG_ORDER as the tie-break.
+
+    Cogs missing from COG_ORDER come after the listed ones, alphabetically.
+    Raises ValueError on a dependency cycle.
+    """
+    names = set(names)
+    rank = {name: i for i, name in enumerate(COG_ORDER)}
+    priority = lambda n: (rank.get(n, len(COG_ORDER)), n)
+    pending = {n: _dependencies(n, names) for n in names}
+    order: List[str] = []
+    while pending:
+        ready = sorted((n for n, deps in pending.items() if not deps), key=priority)
+        if not ready:
+            raise ValueError(f"Cog dependency cycle between: {', '.join(sorted(pending))}")
+        for n in ready:
+            del pending[n]
+            order.append(n)
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return order
+
+
+async def load_cogs_concurrently(bot, names: Iterable[str], package: str = 'cogs',
+                                 max_concurrency: Optional[int] = None) -> Dict[str, Optional[Exception]]:
+    """Load cogs as soon as their dependencies are loaded, independent ones concurrently.
+
+    Returns {cog name: None on success, or the exception}. A failed dependency
+    does not block its dependents.
+    """
+    order = resolve_load_order(names)
+    names = set(order)
+    finished = {name: asyncio.Event() for name in order}
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    results: Dict[str, Optional[Exception]] = {}
+
+    async def load(name: str):
+        try:
+            for dep in _dependencies(name, names):
+                await finished[dep].wait()
+            if semaphore:
+                async with semaphore:
+                    await bot.load_extension(f'{package}.{name}')
+            else:
+                await bot.load_extension(f'{package}.{name}')
+            results[name] = None
+        except Exception as e:
+            results[name] = e
+        finally:
+            finished[name].set()
+
+    await asyncio.gather(*(load(name) for name in order))
+    # report in load order rather than completion order
+    return {name: results[name] for name in order}
@@ -0,0 +1,121 @@
+"""Hash-diffed application command sync.
+
+Syncing the whole command tree on every boot burns Discord's rate limit and
+adds seconds to each restart. `CommandSyncer` serializes each scope (global,
+or one guild's guild-only commands) to the payload Discord would receive,
+hashes it, and only calls `tree.sync()` for scopes whose hash differs from the
+one stored in the DB `kv` table after the last successful sync.
+
+Guild scopes are synced concurrently, bounded by a small semaphore, and a
+`discord.RateLimited` response is retried after the delay Discord asks for.
+
+    syncer = CommandSyncer(bot.tree)
+    results = await syncer.sync(guilds=bot.guilds)   # {'global': 'unchanged', ...}
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import discord
+
+from utils.db import DB
+
+logger = logging.getLogger('command_sync')
+
+KV_PREFIX = 'command_sync_hash:'
+
+SYNCED = 'synced'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+
+def _command_dict(command, tree) -> Dict[str, Any]:
+    try:
+        return command.to_dict(tree)
+    except TypeError:  # discord.py < 2.4 takes no tree argument
+        return command.to_dict()
+
+
+def serialize_scope(tree, guild: Optional[discord.abc.Snowflake] = None) -> List[Dict[str, Any]]:
+    """The command payload `tree.sync(guild=guild)` would send, in a stable order."""
+    payload = [_command_dict(cmd, tree) for cmd in tree.get_commands(guild=guild)]
+    return sorted(payload, key=lambda c: (c.get('type', 1), c.get('name', '')))
+
+
+def hash_payload(payload: List[Dict[str, Any]]) -> str:
+    blob = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class CommandSyncer:
+    """Sync only the command scopes that changed since the last successful sync."""
+
+    def __init__(self, tree, max_concurrency: int = 2, max_retries: int = 3, key_prefix: str = KV_PREFIX):
+        self.tree = tree
+        self.key_prefix = key_prefix
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+
+    def _scope_key(self, guild) -> str:
+        return self.key_prefix + ('global' if guild is None else f'guild:{guild.id}')
+
+    async def _stored_hash(self, guild) -> Optional[str]:
+        try:
+            return await DB.get_kv(self._scope_key(guild))
+        except Exception:
+            return None
+
+    async def _store_hash(self, guild, digest: str) -> None:
+        try:
+            await DB.set_kv(self._scope_key(guild), digest)
+        except Exception as e:
+            logger.warning('Could not persist command hash for %s: %s', self._scope_key(guild), e)
+
+    async def _push(self, guild):
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    return await self.tree.sync(guild=guild)
+            except discord.RateLimited as e:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def sync_scope(self, guild=None, force: bool = False) -> str:
+        """Sync one scope if its payload changed (or `force`); returns SYNCED/UNCHANGED/FAILED."""
+        digest = hash_payload(serialize_scope(self.tree, guild))
+        if not force and await self._stored_hash(guild) == digest:
+            return UNCHANGED
+        try:
+            await self._push(guild)
+        except Exception as e:
+            scope = 'global' if guild is None else f'guild {guild.id}'
+            logger.error('Command sync failed for %s: %s', scope, e)
+            print(f'Error syncing commands for {scope}: {e}')
+            return FAILED
+        await self._store_hash(guild, digest)
+        return SYNCED
+
+    async def sync(self, guilds: Iterable = (), include_global: bool = True,
+                   force: bool = False) -> Dict[str, str]:
+        """Sync the global scope and the given guilds' scopes; returns {scope: status}."""
+        # one full pass at a time; overlapping passes would race on the stored hashes
+        async with self._lock:
+            results: Dict[str, str] = {}
+            if include_global:
+                results['global'] = await self.sync_scope(None, force=force)
+            guilds = list(guilds)
+            statuses = await asyncio.gather(*(self.sync_scope(g, force=force) for g in guilds))
+            for guild, status in zip(guilds, statuses):
+                results[f'guild:{guild.id}'] = status
+            return results
+
+    @staticmethod
+    def summary(results: Dict[str, str]) -> str:
+        counts = {status: 0 for status in (SYNCED, UNCHANGED, FAILED)}
+        for status in results.values():
+            counts[status] += 1
+        return ', '.join(f'{n} {status}' for status, n in counts.items() if n) or 'nothing to sync'
@@ -5,8 +5,13 @@ and safe for the cogs to use for small persistent settings.
 """
 from pathlib import Path
 from typing import Optional, Any, List, Tuple
+import os
 import time
 
+from utils.streaks import BITMAP_DAYS, Streak
+from utils.timebuckets import DAY, local_time
+from utils.user_stats import RECENT_SESSIONS, WINDOW_DAYS, UserStats, UserStatsCache, normalize_topic
+
 
 def _ensure_aiosqlite():
     try:
@@ -16,6 +21,9 @@ def _ensure_aiosqlite():
         raise ImportError('aiosqlite is required for DB operations. Please install with `pip install aiosqlite`.') from e
 
 DB_PATH = Path(__file__).parent.parent / 'data' / 'studybot.db'
+# kv: the BOT_TIMEZONE the streak rows were built in
+STREAK_TZ_KEY = 'streak_days_tz'
+USER_STATS_CACHE_SIZE = int(os.getenv('USER_STATS_CACHE_SIZE') or 1024)
 
 
 class DB:
@@ -26,6 +34,7 @@ class DB:
     tables for logs, leaderboards, doubts, reminders, progress and users.
     """
     _conn: Optional[Any] = None
+    _user_stats = UserStatsCache(USER_STATS_CACHE_SIZE)
 
     @classmethod
     async def init_db(cls):
@@ -59,7 +68,10 @@ class DB:
             CREATE TABLE IF NOT EXISTS streaks (
                 user_id INTEGER PRIMARY KEY,
                 count INTEGER DEFAULT 0,
-                last_date TEXT
+                last_date TEXT,
+                longest INTEGER DEFAULT 0,
+                last_day INTEGER,
+                days INTEGER DEFAULT 0
             )
         ''')
 
@@ -298,7 +310,92 @@ class DB:
             )
         ''')
 
+        # yt-dlp extraction cache (music): metadata per video, stream URL until it expires
+        await cls._conn.execute('''
+            CREATE TABLE IF NOT EXISTS track_cache (
+                video_id TEXT PRIMARY KEY,
+                webpage_url TEXT,
+                title TEXT,
+                uploader TEXT,
+                duration INTEGER,
+                thumbnail TEXT,
+                formats TEXT,
+                stream_url TEXT,
+                stream_expires INTEGER,
+                updated_ts INTEGER
+            )
+        ''')
+
+        await cls._conn.execute('''
+            CREATE TABLE IF NOT EXISTS playlist_entries (
+                playlist_url TEXT,
+                position INTEGER,
+                video_id TEXT,
+                webpage_url TEXT,
+                PRIMARY KEY (playlist_url, video_id)
+            )
+        ''')
+
+        # weekly coach DMs already sent, so an interrupted run resumes where it stopped
+        await cls._conn.execute('''
+            CREATE TABLE IF NOT EXISTS coach_reports_sent (
+                week_key TEXT,
+                user_id INTEGER,
+                sent_ts INTEGER,
+                PRIMARY KEY (week_key, user_id)
+            )
+        ''')
+
+        # voice sessions still open at the last flush (utils.voice_sessions), for crash recovery
+        await cls._conn.execute('''
+            CREATE TABLE IF NOT EXISTS voice_sessions (
+                guild_id INTEGER,
+                user_id INTEGER,
+                since_ts INTEGER,
+                PRIMARY KEY (guild_id, user_id)
+            )
+        ''')
+
+        # per-user study totals maintained by add_study_log (utils.user_stats)
+        await cls._conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id INTEGER PRIMARY KEY,
+                total_minutes INTEGER DEFAULT 0,
+                sessions INTEGER DEFAULT 0,
+                subjects TEXT,
+                days TEXT,
+                recent TEXT
+            )
+        ''')
+
+        # media/ library catalog, kept in sync by utils.media_catalog
+        await cls._conn.execute('''
+            CREATE TABLE IF NOT EXISTS media_catalog (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                mime TEXT,
+                sha256 TEXT
+            )
+        ''')
+
+        await cls._conn.commit()
+        await cls._migrate_streaks()
+
+    @classmethod
+    async def _migrate_streaks(cls):
+        """Add the day-bitmap columns to older streaks tables and rebuild the rows when the
+        table is new to them or BOT_TIMEZONE (which decides where days start) has changed."""
+        async with cls._conn.execute('PRAGMA table_info(streaks)') as cur:
+            columns = {row['name'] for row in await cur.fetchall()}
+        for name, decl in (('count', 'INTEGER DEFAULT 0'), ('last_date', 'TEXT'), ('longest', 'INTEGER DEFAULT 0'),
+                           ('last_day', 'INTEGER'), ('days', 'INTEGER DEFAULT 0')):
+            if name not in columns:
+                await cls._conn.execute(f'ALTER TABLE streaks ADD COLUMN {name} {decl}')
         await cls._conn.commit()
+        if await cls.get_kv(STREAK_TZ_KEY) != local_time.tz_name:
+            await cls.recompute_streaks()
+            await cls.set_kv(STREAK_TZ_KEY, local_time.tz_name)
 
     @classmethod
     async def execute(cls, query: str, params: Tuple = ()):  # convenience wrapper
@@ -308,6 +405,13 @@ class DB:
         await cls._conn.commit()
         return cur
 
+    @classmethod
+    async def executemany(cls, query: str, seq_of_params):  # one commit for a batch
+        if not cls._conn:
+            await cls.init_db()
+        await cls._conn.executemany(query, seq_of_params)
+        await cls._conn.commit()
+
     @classmethod
     async def fetchone(cls, query: str, params: Tuple = ()):  # returns row or None
         if not cls._conn:
@@ -334,11 +438,73 @@ class DB:
 
     # Study logs
     @classmethod
-    async def add_study_log(cls, user_id: int, minutes: int, ts: int, topic: str = '', guild_id: Optional[int] = None):
-        await cls.execute(
-            'INSERT INTO study_logs(user_id, guild_id, minutes, topic, ts) VALUES(?, ?, ?, ?, ?)',
-            (user_id, guild_id, minutes, topic, ts)
-        )
+    async def add_study_log(cls, user_id: int, minutes: int, ts: int, topic: str = '', guild_id: Optional[int] = None) -> Streak:
+        """Insert a log and advance the user's streak and stats in the same transaction; returns the streak."""
+        if not cls._conn:
+            await cls.init_db()
+        day = local_time.day_number(ts)
+        stats = await cls.get_user_stats(user_id)
+        streak = await cls.get_streak_state(user_id)
+        try:
+            await cls._conn.execute(
+                'INSERT INTO study_logs(user_id, guild_id, minutes, topic, ts) VALUES(?, ?, ?, ?, ?)',
+                (user_id, guild_id, minutes, topic, ts)
+            )
+            updated = streak.record(day)
+            if updated is not streak:
+                await cls._conn.execute(
+                    'REPLACE INTO streaks(user_id, count, last_date, longest, last_day, days) VALUES(?, ?, ?, ?, ?, ?)',
+                    (user_id, updated.count, updated.last_date, updated.longest, updated.last_day, updated.days)
+                )
+            stats.add(minutes, ts, topic, day)
+            await cls._conn.execute(
+                'REPLACE INTO user_stats(user_id, total_minutes, sessions, subjects, days, recent) VALUES(?, ?, ?, ?, ?, ?)',
+                stats.to_row()
+            )
+            await cls._conn.commit()
+        except Exception:
+            # drop the half-written log/streak so a later commit cannot persist them
+            await cls._conn.rollback()
+            cls._user_stats.discard(user_id)  # reloaded from the summary table next time
+            raise
+        return updated
+
+    @classmethod
+    async def get_user_stats(cls, user_id: int) -> UserStats:
+        """The user's study totals (utils.user_stats), from the cache or the summary table."""
+        stats = cls._user_stats.get(user_id)
+        if stats is None:
+            row = await cls.fetchone('SELECT * FROM user_stats WHERE user_id = ?', (user_id,))
+            stats = UserStats.from_row(row) if row else await cls._build_user_stats(user_id)
+            cls._user_stats.put(stats)
+        return stats
+
+    @classmethod
+    async def _build_user_stats(cls, user_id: int) -> UserStats:
+        """Summarise a user's study_logs once, for users logged before the summary table existed."""
+        stats = UserStats(user_id)
+        for row in await cls.fetchall(
+                "SELECT LOWER(COALESCE(NULLIF(topic, ''), 'unknown')) AS subject, SUM(minutes) AS minutes, "
+                'COUNT(*) AS sessions FROM study_logs WHERE user_id = ? GROUP BY 1', (user_id,)):
+            stats.subjects[row['subject']] = int(row['minutes'])
+            stats.total_minutes += int(row['minutes'])
+            stats.sessions += int(row['sessions'])
+        since = local_time.day_start(time.time()) - (WINDOW_DAYS - 1) * DAY
+        for row in await cls.fetchall('SELECT minutes, topic, ts FROM study_logs WHERE user_id = ? AND ts >= ?',
+                                      (user_id, since)):
+            bucket = stats.days.setdefault(local_time.day_number(row['ts']), {}).setdefault(normalize_topic(row['topic']), [0, 0])
+            bucket[0] += int(row['minutes'])
+            bucket[1] += 1
+        rows = await cls.fetchall('SELECT ts, minutes, topic FROM study_logs WHERE user_id = ? ORDER BY ts DESC LIMIT ?',
+                                  (user_id, RECENT_SESSIONS))
+        stats.recent = [(int(r['ts']), int(r['minutes']), r['topic'] or '') for r in rows]
+        return stats
+
+    @classmethod
+    async def forget_user_stats(cls, user_id: int):
+        """Drop a user's summary (e.g. after deleting their logs); it is rebuilt on next use."""
+        cls._user_stats.discard(user_id)
+        await cls.execute('DELETE FROM user_stats WHERE user_id = ?', (user_id,))
 
     @classmethod
     async def get_user_logs(cls, user_id: int, since_ts: Optional[int] = None) -> List[Any]:
@@ -430,15 +596,52 @@ class DB:
         rows = await cls.fetchall('SELECT topic, SUM(minutes) as total FROM study_logs GROUP BY topic ORDER BY total DESC LIMIT ?', (limit,))
         return rows
 
-    # Streak helpers for compatibility with cog logic
+    # Streaks (utils.streaks): one row per user, advanced by add_study_log
+    @classmethod
+    async def get_streak_state(cls, user_id: int) -> Streak:
+        row = await cls.fetchone('SELECT count, longest, last_day, days FROM streaks WHERE user_id = ?', (user_id,))
+        return Streak.from_row(row)
+
     @classmethod
     async def get_streak(cls, user_id: int):
-        row = await cls.fetchone('SELECT count, last_date FROM streaks WHERE user_id = ?', (user_id,))
-        return dict(row) if row else None
+        """{'count': current streak, 'longest': ..., 'last_date': ...}, or None if the user never studied."""
+        streak = await cls.get_streak_state(user_id)
+        if streak.last_day is None:
+            return None
+        return {'count': streak.current(local_time.day_number()), 'longest': streak.longest,
+                'last_date': streak.last_date}
 
     @classmethod
-    async def set_streak(cls, user_id: int, count: int, last_date: str):
-        await cls.execute('REPLACE INTO streaks(user_id, count, last_date) VALUES(?, ?, ?)', (user_id, count, last_date))
+    async def recompute_streaks(cls, user_id: Optional[int] = None):
+        """Rebuild streak rows from study_logs (everyone, or one user) with a gaps-and-islands query.
+
+        Days are counted at the current BOT_TIMEZONE offset; in zones with DST a log
+        within an hour of midnight may land on the neighbouring day.
+        """
+        if not cls._conn:
+            await cls.init_db()
+        params = {'offset': local_time.utc_offset(), 'user_id': user_id, 'bits': BITMAP_DAYS}
+        await cls._conn.execute('DELETE FROM streaks WHERE :user_id IS NULL OR user_id = :user_id', params)
+        await cls._conn.execute('''
+            REPLACE INTO streaks(user_id, count, last_date, longest, last_day, days)
+            WITH days AS (
+                SELECT DISTINCT user_id, CAST((ts + :offset) / 86400 AS INTEGER) AS day
+                FROM study_logs WHERE :user_id IS NULL OR user_id = :user_id
+            ), islands AS (
+                SELECT user_id, day,
+                       day - ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day) AS island,
+                       MAX(day) OVER (PARTITION BY user_id) AS last_day
+                FROM days
+            ), runs AS (
+                SELECT user_id, COUNT(*) AS length, MAX(day) AS run_end, MAX(last_day) AS last_day,
+                       SUM(CASE WHEN last_day - day < :bits THEN 1 << (last_day - day) ELSE 0 END) AS bits
+                FROM islands GROUP BY user_id, island
+            )
+            SELECT user_id, MAX(CASE WHEN run_end = last_day THEN length END),
+                   date(MAX(last_day) * 86400, 'unixepoch'), MAX(length), MAX(last_day), SUM(bits)
+            FROM runs GROUP BY user_id
+        ''', params)
+        await cls._conn.commit()
 
     @classmethod
     async def close_db(cls):
@@ -463,6 +666,25 @@ class DB:
             ON CONFLICT(guild_id, user_id, week_start) DO UPDATE SET seconds = seconds + excluded.seconds
         ''', (guild_id, user_id, week_start, seconds))
 
+    @classmethod
+    async def save_voice_checkpoint(cls, seconds: List[Tuple[int, int, int, int]], sessions: List[Tuple[int, int, int]]):
+        """Add (guild_id, user_id, week_start, seconds) rows and replace the open (guild_id, user_id, since_ts)
+        sessions in one transaction, so a crash can never count the same seconds twice."""
+        if not cls._conn:
+            await cls.init_db()
+        await cls._conn.executemany('''
+            INSERT INTO activity_voice(guild_id, user_id, week_start, seconds)
+            VALUES(?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id, week_start) DO UPDATE SET seconds = seconds + excluded.seconds
+        ''', seconds)
+        await cls._conn.execute('DELETE FROM voice_sessions')
+        await cls._conn.executemany('INSERT INTO voice_sessions(guild_id, user_id, since_ts) VALUES(?, ?, ?)', sessions)
+        await cls._conn.commit()
+
+    @classmethod
+    async def get_voice_sessions(cls):
+        return await cls.fetchall('SELECT guild_id, user_id, since_ts FROM voice_sessions')
+
     @classmethod
     async def get_weekly_activity(cls, guild_id: int, week_start: int, limit: int = 10):
         # Return combined score (simple sum of normalized values) - for now sum messages + seconds/60
@@ -681,3 +903,96 @@ class DB:
     async def archive_event(cls, guild_id: int, event_type: str, payload_json: str):
         await cls.execute('INSERT INTO archives(guild_id, event_type, payload, ts) VALUES(?, ?, ?, ?)', (guild_id, event_type, payload_json, int(time.time())))
 
+
+
+    # yt-dlp track / playlist cache
+    @classmethod
+    async def get_cached_track(cls, video_id: str):
+        return await cls.fetchone('SELECT * FROM track_cache WHERE video_id = ?', (video_id,))
+
+    @classmethod
+    async def save_cached_track(cls, video_id: str, webpage_url: str, title: str, uploader: str, duration: Optional[int],
+                                thumbnail: str, formats_json: str, stream_url: str, stream_expires: int):
+        await cls.execute(
+            'REPLACE INTO track_cache(video_id, webpage_url, title, uploader, duration, thumbnail, formats, stream_url, stream_expires, updated_ts) '
+            'VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (video_id, webpage_url, title, uploader, duration, thumbnail, formats_json, stream_url, stream_expires, int(time.time()))
+        )
+
+    @classmethod
+    async def get_playlist_entries(cls, playlist_url: str):
+        return await cls.fetchall('SELECT video_id, webpage_url FROM playlist_entries WHERE playlist_url = ? ORDER BY position', (playlist_url,))
+
+    @classmethod
+    async def sync_playlist_entries(cls, playlist_url: str, entries: List[Tuple[str, str]]) -> Tuple[int, int]:
+        """Store the playlist as ordered (video_id, webpage_url) pairs in one batch per change type.
+
+        New ids are inserted, ids no longer in the playlist are deleted and positions
+        are refreshed. Returns (added, removed) counts.
+        """
+        rows = await cls.get_playlist_entries(playlist_url)
+        old = {r['video_id'] for r in rows}
+        new_ids = [vid for vid, _ in entries]
+        removed = old - set(new_ids)
+        added = [vid for vid in new_ids if vid not in old]
+        if removed:
+            await cls.executemany('DELETE FROM playlist_entries WHERE playlist_url = ? AND video_id = ?',
+                                  [(playlist_url, vid) for vid in removed])
+        await cls.executemany(
+            'INSERT INTO playlist_entries(playlist_url, position, video_id, webpage_url) VALUES(?, ?, ?, ?) '
+            'ON CONFLICT(playlist_url, video_id) DO UPDATE SET position = excluded.position, webpage_url = excluded.webpage_url',
+            [(playlist_url, pos, vid, url) for pos, (vid, url) in enumerate(entries)]
+        )
+        return len(added), len(removed)
+
+    @classmethod
+    async def get_media_catalog(cls):
+        return await cls.fetchall('SELECT path, size, mtime, mime, sha256 FROM media_catalog')
+
+    @classmethod
+    async def save_media_entries(cls, entries: List[Tuple[str, int, float, str, str]]):
+        """Insert or update (path, size, mtime, mime, sha256) rows in one batch."""
+        await cls.executemany('REPLACE INTO media_catalog(path, size, mtime, mime, sha256) VALUES(?, ?, ?, ?, ?)', entries)
+
+    @classmethod
+    async def delete_media_entries(cls, paths: List[str]):
+        await cls.executemany('DELETE FROM media_catalog WHERE path = ?', [(p,) for p in paths])
+
+    @classmethod
+    async def get_topic_minutes(cls, since_ts: int, split_ts: int):
+        """Per (user, topic) minutes logged from `split_ts` on and in [since_ts, split_ts), in one pass.
+
+        Topics are lower-cased; missing ones are reported as 'unknown'.
+        """
+        return await cls.fetchall(
+            "SELECT user_id, LOWER(COALESCE(NULLIF(topic, ''), 'unknown')) AS topic, "
+            'SUM(CASE WHEN ts >= ? THEN minutes ELSE 0 END) AS current, '
+            'SUM(CASE WHEN ts < ? THEN minutes ELSE 0 END) AS previous '
+            'FROM study_logs WHERE ts >= ? GROUP BY user_id, 2',
+            (split_ts, split_ts, since_ts))
+
+    @classmethod
+    async def get_best_progress(cls, user_id: int):
+        """One user's highest progress per subject across guilds (subjects lower-cased)."""
+        return await cls.fetchall(
+            'SELECT LOWER(subject) AS subject, MAX(percent) AS percent FROM progress '
+            'WHERE user_id = ? GROUP BY 1', (user_id,))
+
+    @classmethod
+    async def get_progress_for_active_users(cls, since_ts: int):
+        """Highest progress per (user, subject) across guilds, for users who logged study since `since_ts`."""
+        return await cls.fetchall(
+            'SELECT user_id, LOWER(subject) AS subject, MAX(percent) AS percent FROM progress '
+            'WHERE user_id IN (SELECT DISTINCT user_id FROM study_logs WHERE ts >= ?) GROUP BY user_id, 2',
+            (since_ts,))
+
+    @classmethod
+    async def get_coach_reports_sent(cls, week_key: str) -> set:
+        rows = await cls.fetchall('SELECT user_id FROM coach_reports_sent WHERE week_key = ?', (week_key,))
+        return {r['user_id'] for r in rows}
+
+    @classmethod
+    async def mark_coach_reports_sent(cls, week_key: str, user_ids: List[int]):
+        now = int(time.time())
+        await cls.executemany('INSERT OR IGNORE INTO coach_reports_sent(week_key, user_id, sent_ts) VALUES(?, ?, ?)',
+                              [(week_key, uid, now) for uid in user_ids])
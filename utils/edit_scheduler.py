@@ -0,0 +1,102 @@
+"""Coalescing, rate-limited message edit scheduler.
+
+Periodic status messages (e.g. the music now-playing embeds) are edited through
+one shared worker instead of one loop per guild. Edits are keyed by message:
+if a message already has an edit waiting, the newer content replaces it, so a
+message is never edited twice for the same tick. The worker sends at most
+`rate` edits per second overall and waits `per_channel_interval` seconds between
+edits in the same channel, staying inside Discord's edit rate limits no matter
+how many messages are registered.
+
+    scheduler = EditScheduler(rate=2)
+    scheduler.schedule(message, embed=embed)
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+import discord
+
+
+class EditScheduler:
+    def __init__(self, rate: float = 2.0, per_channel_interval: float = 1.5):
+        self.rate = rate
+        self.per_channel_interval = per_channel_interval
+        # message id -> (message, edit kwargs); insertion order is the send order
+        self._pending: 'OrderedDict[int, Tuple[Any, Dict[str, Any]]]' = OrderedDict()
+        self._last_channel_edit: Dict[int, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # messages that no longer exist; further edits to them are dropped
+        self.gone: Set[int] = set()
+        self.stats = {'scheduled': 0, 'coalesced': 0, 'sent': 0, 'failed': 0}
+
+    def schedule(self, message, **kwargs) -> None:
+        """Queue an edit; replaces any edit still waiting for the same message."""
+        if message.id in self.gone:
+            return
+        self.stats['scheduled'] += 1
+        if message.id in self._pending:
+            self.stats['coalesced'] += 1
+        # an existing entry keeps its place in line but sends the newest content
+        self._pending[message.id] = (message, kwargs)
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._worker())
+
+    def _next_ready(self) -> Tuple[Optional[int], float]:
+        """First pending message whose channel may be edited now, else the shortest wait."""
+        now = time.monotonic()
+        wait = self.per_channel_interval
+        for message_id, (message, _) in self._pending.items():
+            last = self._last_channel_edit.get(message.channel.id, 0.0)
+            remaining = last + self.per_channel_interval - now
+            if remaining <= 0:
+                return message_id, 0.0
+            wait = min(wait, remaining)
+        return None, wait
+
+    async def _worker(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                try:
+                    # exit when idle; schedule() starts a new worker
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=60)
+                except asyncio.TimeoutError:
+                    if not self._pending:
+                        return
+                continue
+            message_id, wait = self._next_ready()
+            if message_id is None:
+                await asyncio.sleep(wait)
+                continue
+            message, kwargs = self._pending.pop(message_id)
+            now = time.monotonic()
+            if len(self._last_channel_edit) > 1024:
+                self._last_channel_edit = {cid: ts for cid, ts in self._last_channel_edit.items()
+                                           if now - ts < self.per_channel_interval}
+            self._last_channel_edit[message.channel.id] = now
+            try:
+                await message.edit(**kwargs)
+                self.stats['sent'] += 1
+            except discord.NotFound:
+                self.gone.add(message_id)
+                self.stats['failed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f'[EDITS] Failed to edit message {message_id}: {e}')
+            await asyncio.sleep(1 / self.rate)
+
+    def cancel(self, message) -> None:
+        """Drop a pending edit for `message`, if any."""
+        self._pending.pop(message.id, None)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._pending.clear()
@@ -0,0 +1,144 @@
+"""Bot-wide pooled HTTP client.
+
+One `aiohttp.ClientSession` is shared by every cog instead of opening a new
+session (and a new TCP/TLS handshake) per command. The session is created
+lazily inside the running event loop and closed from `StudyBot.close`.
+
+Features:
+ - connection pooling with keep-alive and a per-host connection limit
+ - DNS cache on the connector
+ - configurable default timeouts
+ - retry with exponential backoff and full jitter for transient failures
+   (connection errors, timeouts, 429 and 5xx responses)
+
+Usage:
+    from utils.http_client import http_client
+
+    resp = await http_client.request('GET', url)
+    text = await resp.text()
+
+`request` reads the body before returning, so the connection goes straight
+back to the pool and `resp.json()` / `resp.text()` / `resp.read()` can be
+awaited afterwards without an `async with` block.
+
+Tuning via environment variables: HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST,
+HTTP_DNS_TTL, HTTP_KEEPALIVE, HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT,
+HTTP_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX.
+"""
+import asyncio
+import os
+import random
+from typing import Optional
+
+import aiohttp
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class HTTPClient:
+    """Lazily created, shared aiohttp session with retry helpers."""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, dns_ttl: int = 300, keepalive: float = 30.0,
+                 timeout: float = 30.0, connect_timeout: float = 10.0, retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use."""
+        if self._session is not None and not self._session.closed:
+            return self._session
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=self.dns_ttl,
+                    use_dns_cache=True,
+                    keepalive_timeout=self.keepalive,
+                )
+                self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        # full jitter: uniform(0, min(cap, base * 2^attempt))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def request(self, method: str, url: str, *, retries: Optional[int] = None, **kwargs) -> aiohttp.ClientResponse:
+        """Perform a request, retrying transient failures, and return the fully read response.
+
+        `retries` defaults to HTTP_RETRIES for idempotent methods and 0 otherwise; pass it
+        explicitly for POSTs that are safe to repeat. Request bodies that can only be sent
+        once (e.g. `aiohttp.FormData` with open files) must use `retries=0`.
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        timeout = kwargs.pop('timeout', None)
+        if isinstance(timeout, (int, float)):
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        elif timeout is not None:
+            kwargs['timeout'] = timeout
+
+        session = await self.get_session()
+        attempt = 0
+        while True:
+            try:
+                resp = await session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if resp.status in RETRY_STATUSES and attempt < retries:
+                retry_after = resp.headers.get('Retry-After')
+                resp.release()
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+                attempt += 1
+                continue
+
+            try:
+                await resp.read()
+            finally:
+                resp.release()
+            return resp
+
+    async def get(self, url: str, **kwargs) -> aiohttp.ClientResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> aiohttp.ClientResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http_client = HTTPClient(
+    limit=int(os.getenv('HTTP_POOL_LIMIT', '100')),
+    limit_per_host=int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '10')),
+    dns_ttl=int(os.getenv('HTTP_DNS_TTL', '300')),
+    keepalive=float(os.getenv('HTTP_KEEPALIVE', '30')),
+    timeout=float(os.getenv('HTTP_TIMEOUT', '30')),
+    connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '10')),
+    retries=int(os.getenv('HTTP_RETRIES', '2')),
+    backoff_base=float(os.getenv('HTTP_BACKOFF_BASE', '0.5')),
+    backoff_max=float(os.getenv('HTTP_BACKOFF_MAX', '8')),
+)
@@ -0,0 +1,87 @@
+"""Channel-keyed delivery of chat replies to waiting game sessions.
+
+`bot.wait_for('message', check=...)` registers a listener that is called for
+every message the bot sees, in every guild, and runs its check on each one:
+with N games waiting for answers every message costs N checks. `InputRouter`
+indexes waiting sessions by `(channel_id, author_id)` instead, so one dict
+lookup per message finds the only sessions that can want it and nothing else
+is woken.
+
+Forward messages from a single `on_message` listener:
+
+    router = InputRouter()
+    router.dispatch(message)                                   # in on_message
+    reply = await router.wait(ctx.channel.id, ctx.author.id, timeout=30)
+
+`wait` raises asyncio.TimeoutError like `wait_for`, so existing handlers keep
+working. Messages are still processed as commands; the router only observes.
+"""
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+Key = Tuple[int, int]
+Waiter = Tuple[asyncio.Future, Optional[Callable[[object], bool]]]
+
+
+class InputRouter:
+    def __init__(self):
+        self._waiting: Dict[Key, List[Waiter]] = {}
+        self.stats = {'waiting': 0, 'peak': 0, 'delivered': 0, 'timeouts': 0, 'ignored': 0}
+
+    def __len__(self) -> int:
+        """Number of sessions currently waiting for input."""
+        return self.stats['waiting']
+
+    def dispatch(self, message) -> bool:
+        """Resolve the sessions waiting on this message's channel and author; True if any took it."""
+        if message.channel is None or message.author is None:
+            return False
+        waiters = self._waiting.get((message.channel.id, message.author.id))
+        if not waiters:
+            return False
+        taken = False
+        for future, check in list(waiters):
+            if future.done():
+                continue
+            try:
+                if check is not None and not check(message):
+                    self.stats['ignored'] += 1
+                    continue
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            future.set_result(message)
+            self.stats['delivered'] += 1
+            taken = True
+        return taken
+
+    async def wait(self, channel_id: int, author_id: int, timeout: Optional[float] = None,
+                   check: Optional[Callable[[object], bool]] = None):
+        """Next message from `author_id` in `channel_id` that passes `check`.
+
+        Raises asyncio.TimeoutError after `timeout` seconds.
+        """
+        key = (channel_id, author_id)
+        future = asyncio.get_running_loop().create_future()
+        waiter = (future, check)
+        self._waiting.setdefault(key, []).append(waiter)
+        self.stats['waiting'] += 1
+        self.stats['peak'] = max(self.stats['peak'], self.stats['waiting'])
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise
+        finally:
+            self.stats['waiting'] -= 1
+            waiters = self._waiting.get(key)
+            if waiters is not None:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiting[key]
+
+    def cancel_all(self) -> None:
+        """Cancel every waiting session, e.g. when the cog unloads."""
+        for waiters in self._waiting.values():
+            for future, _ in waiters:
+                future.cancel()
@@ -0,0 +1,104 @@
+"""Lazy imports for heavy optional libraries.
+
+Cogs declare heavy dependencies at module level without paying for them at
+startup:
+
+    from utils.lazy_import import lazy_import
+    yt_dlp = lazy_import('yt_dlp')
+
+The real module is imported on first attribute access. Commands should call
+`await ensure_loaded(yt_dlp)` (or touch the proxy inside `asyncio.to_thread`)
+so that first import happens in a worker thread instead of stalling the event
+loop. Cogs whose feature is enabled call `register_warm_up('yt_dlp')` from
+`cog_load`; after `on_ready` the bot calls `warm_up()`, which imports just
+those modules in the background. Set LAZY_WARMUP=0 to skip the warm-up and
+import only on first use.
+"""
+import asyncio
+import importlib
+import importlib.util
+import logging
+import types
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger('lazy_import')
+
+_registry: Dict[str, 'LazyModule'] = {}
+_warm_up_names: List[str] = []
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_target']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_target'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_lazy_target'] is not None
+
+    def __getattr__(self, attr: str):
+        # only reached for names not found on the proxy itself
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a (shared) lazy proxy for module `name`, e.g. 'PIL.Image'."""
+    proxy = _registry.get(name)
+    if proxy is None:
+        proxy = LazyModule(name)
+        _registry[name] = proxy
+    return proxy
+
+
+def is_available(name: str) -> bool:
+    """True if `name` can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def register_warm_up(*names: str) -> None:
+    """Ask the post-ready warm-up to import `names`; called by cogs that will need them."""
+    for name in names:
+        if name not in _warm_up_names:
+            _warm_up_names.append(name)
+
+
+async def ensure_loaded(*modules: LazyModule) -> None:
+    """Import any of `modules` that are not loaded yet in a worker thread."""
+    for module in modules:
+        if not module.loaded:
+            await asyncio.to_thread(module._load)
+
+
+async def warm_up(names: Optional[Iterable[str]] = None, delay: float = 0.0) -> None:
+    """Import the registered (or the given) modules in a worker thread, one at a time."""
+    if delay:
+        await asyncio.sleep(delay)
+    for name in list(_warm_up_names if names is None else names):
+        proxy = lazy_import(name)
+        if proxy.loaded:
+            continue
+        try:
+            await asyncio.to_thread(proxy._load)
+            logger.info('Warmed up %s', name)
+        except Exception as e:
+            # missing optional dependency; the command using it reports the error
+            logger.info('Skipped warm-up of %s: %s', name, e)
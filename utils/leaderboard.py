@@ -0,0 +1,93 @@
+"""Incrementally maintained top-K leaderboards.
+
+Sorting every player's score on each `!leaderboard` call is O(n log n) in the
+number of players. `TopK` keeps every score in a dict plus the current top `k`
+in a small min-heap, so a score update is O(log k) and reading the board is
+O(k log k) whatever the player count. `version` changes only when the top `k`
+changes, so callers can cache rendered text against it:
+
+    board = TopK(10)
+    board.add('123', 50)                # += 50, returns the new score
+    board.top()                         # [('123', 50), ...] best first
+    if board.version != cached_version: re-render
+
+Scores that go down are supported; if a top member drops, the top is rebuilt
+from all scores on the next read (O(n log k), once).
+"""
+import heapq
+from typing import Dict, Hashable, List, Tuple
+
+
+class TopK:
+    def __init__(self, k: int = 10):
+        self.k = k
+        self.scores: Dict[Hashable, float] = {}
+        self._top: Dict[Hashable, float] = {}
+        # min-heap of (score, key); entries whose score no longer matches _top are stale
+        self._heap: List[Tuple[float, Hashable]] = []
+        self._stale = False
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __contains__(self, key) -> bool:
+        return key in self.scores
+
+    def get(self, key, default=0):
+        return self.scores.get(key, default)
+
+    def add(self, key, delta: float) -> float:
+        score = self.scores.get(key, 0) + delta
+        self.set(key, score)
+        return score
+
+    def set(self, key, score: float) -> None:
+        old = self.scores.get(key)
+        self.scores[key] = score
+        if key in self._top:
+            if score == old:
+                return
+            self._top[key] = score
+            self._push(score, key)
+            if old is not None and score < old and len(self.scores) > self.k:
+                self._stale = True  # someone outside the top may now outrank it
+        elif len(self._top) < self.k:
+            self._top[key] = score
+            self._push(score, key)
+        else:
+            floor_score, floor_key = self._floor()
+            if score <= floor_score:
+                return
+            del self._top[floor_key]
+            heapq.heappop(self._heap)
+            self._top[key] = score
+            self._push(score, key)
+        self.version += 1
+
+    def top(self, n: int = None) -> List[Tuple[Hashable, float]]:
+        """The best `n` (default k) entries, highest score first."""
+        if self._stale:
+            self._rebuild()
+        ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:n] if n is not None else ranked
+
+    def _push(self, score: float, key) -> None:
+        heapq.heappush(self._heap, (score, key))
+        if len(self._heap) > 4 * self.k + 16:
+            # drop stale entries so the heap stays O(k)
+            self._heap = [(s, k) for k, s in self._top.items()]
+            heapq.heapify(self._heap)
+
+    def _floor(self) -> Tuple[float, Hashable]:
+        while self._top.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0]
+
+    def _rebuild(self) -> None:
+        best = heapq.nlargest(self.k, self.scores.items(), key=lambda item: item[1])
+        self._top = dict(best)
+        self._heap = [(s, k) for k, s in best]
+        heapq.heapify(self._heap)
+        self._stale = False
+        self.version += 1
@@ -0,0 +1,260 @@
+"""Shared LLM client layer for every cog that talks to Gemini.
+
+Features:
+ - in-flight coalescing: identical concurrent prompts share a single API call; a waiter
+   whose shared call was refused by another bucket retries through its own
+ - LRU/TTL response cache keyed by normalized prompt and model
+ - token-bucket rate limiting per (scope, guild, channel); callers queue for a token
+ - a global cap on concurrently outstanding API calls
+
+Cogs use the module-level `llm` instance:
+
+    reply = await llm.generate(prompt, fetch, model=GEMINI_MODEL, scope='gemini_reply',
+                               guild_id=guild_id, channel_id=channel_id)
+
+where `fetch` is a zero-argument coroutine function performing the real request
+and returning the reply text. `fetch` should raise on API errors so failures are
+never cached. Cogs using the `google-generativeai` SDK can call
+`llm.generate_content(model, prompt, ...)` with the model from `load_genai_model()`.
+
+Tuning via environment variables: LLM_CACHE_SIZE, LLM_CACHE_TTL (seconds),
+LLM_RATE_PER_MINUTE and LLM_BURST (per scope/guild/channel bucket),
+LLM_MAX_CONCURRENCY and LLM_MAX_WAIT (seconds a caller may queue for a token),
+LLM_PASSIVE_MAX_WAIT (the same for on_message listeners).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.lazy_import import lazy_import
+from utils.rate_limit import RateLimited, TokenBucket
+
+genai = lazy_import('google.generativeai')
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config.json'
+
+
+# max seconds a passive listener (on_message auto-replies) waits for a token
+PASSIVE_MAX_WAIT = float(os.getenv('LLM_PASSIVE_MAX_WAIT', '2'))
+
+
+# raised when a request would have to queue longer than `max_wait` for a token
+LLMRateLimited = RateLimited
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and casefold so trivially different prompts share a cache entry."""
+    return ' '.join(prompt.split()).casefold()
+
+
+class TTLCache:
+    """Small LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LLMClient:
+    """Coalescing, caching, rate-limited front for LLM calls."""
+
+    MAX_BUCKETS = 4096
+
+    def __init__(self, cache_size: int = 512, cache_ttl: float = 600.0, rate_per_minute: float = 6.0,
+                 burst: int = 3, max_concurrency: int = 4, max_wait: Optional[float] = 30.0):
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._buckets: 'OrderedDict[Tuple[str, Optional[int], Optional[int]], TokenBucket]' = OrderedDict()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'api_calls': 0, 'rate_limited': 0}
+
+    @staticmethod
+    def cache_key(prompt: str, model: str = '') -> Tuple[str, str]:
+        digest = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+        return (model or '', digest)
+
+    def _bucket(self, scope: str, guild_id: Optional[int], channel_id: Optional[int]) -> TokenBucket:
+        key = (scope, guild_id, channel_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.MAX_BUCKETS:
+                # drop the least recently used bucket that has fully refilled
+                for old_key, old in list(self._buckets.items())[:64]:
+                    if old.is_full():
+                        del self._buckets[old_key]
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def generate(self, prompt: str, fetch: Callable[[], Awaitable[Optional[str]]], *, model: str = '',
+                       guild_id: Optional[int] = None, channel_id: Optional[int] = None, scope: str = '',
+                       use_cache: bool = True, rate_limit: bool = True,
+                       max_wait: Optional[float] = None) -> Optional[str]:
+        """Return the reply for `prompt`, calling `fetch()` only when no cached or in-flight result exists.
+
+        Each `scope` (usually the calling cog) has its own (guild, channel) buckets, so one
+        cog cannot starve another. Batch jobs pass `rate_limit=False` to skip the buckets
+        while still sharing the global concurrency cap. `max_wait` overrides the client
+        default for this call; passive listeners should pass a short one.
+
+        A caller that joins another caller's in-flight fetch shares its result; if that
+        fetch was refused by the other caller's bucket, it retries through its own.
+        Raises LLMRateLimited when the bucket is saturated beyond `max_wait`, and re-raises
+        anything `fetch()` raises.
+        """
+        self.stats['requests'] += 1
+        key = self.cache_key(prompt, model)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            try:
+                return await asyncio.shield(task)
+            except LLMRateLimited:
+                # the caller that started the fetch ran out of tokens in its own
+                # bucket; that says nothing about ours, so try again through it
+                pass
+
+        bucket = self._bucket(scope, guild_id, channel_id) if rate_limit else None
+        wait = self.max_wait if max_wait is None else max_wait
+        # The fetch runs in its own task so a cancelled caller does not cancel
+        # the request for everyone else waiting on it
+        task = asyncio.ensure_future(self._fetch(key, fetch, bucket, wait, use_cache))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Optional[str]]],
+                     bucket: Optional[TokenBucket], max_wait: Optional[float], use_cache: bool) -> Optional[str]:
+        if bucket is not None:
+            try:
+                await bucket.acquire(max_wait)
+            except LLMRateLimited:
+                self.stats['rate_limited'] += 1
+                raise
+        async with self._semaphore:
+            self.stats['api_calls'] += 1
+            result = await fetch()
+        if use_cache and result:
+            self.cache.set(key, result)
+        return result
+
+    def _fetch_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller has gone away
+
+    async def generate_content(self, model: Any, prompt: str, **kwargs) -> Optional[str]:
+        """`generate` wrapper for a `google.generativeai.GenerativeModel`."""
+        async def fetch():
+            response = await model.generate_content_async(prompt)
+            return response.text if response else None
+        model_name = getattr(model, 'model_name', '') or ''
+        return await self.generate(prompt, fetch, model=model_name, **kwargs)
+
+
+llm = LLMClient(
+    cache_size=int(os.getenv('LLM_CACHE_SIZE', '512')),
+    cache_ttl=float(os.getenv('LLM_CACHE_TTL', '600')),
+    rate_per_minute=float(os.getenv('LLM_RATE_PER_MINUTE', '6')),
+    burst=int(os.getenv('LLM_BURST', '3')),
+    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '4')),
+    max_wait=float(os.getenv('LLM_MAX_WAIT', '30')),
+)
+
+_genai_model = None
+_genai_loaded = False
+_genai_api_key: Optional[str] = None
+_config_read = False
+
+
+def _gemini_api_key() -> Optional[str]:
+    global _genai_api_key, _config_read
+    if not _config_read:
+        _config_read = True
+        try:
+            _genai_api_key = json.loads(CONFIG_PATH.read_text()).get('gemini_api_key')
+        except Exception:
+            _genai_api_key = None
+    return _genai_api_key
+
+
+def genai_configured() -> bool:
+    """True if config.json has a Gemini API key. Does not import the SDK."""
+    return bool(_gemini_api_key())
+
+
+def load_genai_model(model_name: str = 'gemini-pro'):
+    """Return the shared `google.generativeai` model configured from config.json, or None.
+
+    The config is read and the SDK configured once per process instead of once per cog.
+    The SDK itself is imported on the first call (or by the post-ready warm-up).
+    """
+    global _genai_model, _genai_loaded
+    if _genai_loaded:
+        return _genai_model
+    _genai_loaded = True
+    try:
+        api_key = _gemini_api_key()
+        if api_key:
+            genai.configure(api_key=api_key)
+            _genai_model = genai.GenerativeModel(model_name)
+    except Exception:
+        _genai_model = None
+    return _genai_model
+
+
+_genai_lock: Optional[asyncio.Lock] = None
+
+
+async def get_genai_model(model_name: str = 'gemini-pro'):
+    """Async `load_genai_model`: the first call imports the SDK in a worker thread."""
+    global _genai_lock
+    if _genai_loaded:
+        return _genai_model
+    if _genai_lock is None:
+        _genai_lock = asyncio.Lock()
+    async with _genai_lock:
+        if _genai_loaded:
+            return _genai_model
+        return await asyncio.to_thread(load_genai_model, model_name)
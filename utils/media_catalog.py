@@ -0,0 +1,237 @@
+"""Indexed catalog of the media/ library.
+
+Walking `media/` on every autocomplete keystroke does not scale past a few
+hundred files. `MediaCatalog` keeps one entry per file (path, size, mtime, MIME
+type, SHA-256) in memory and in the `media_catalog` table, and answers queries
+from two indexes:
+
+- a sorted list of lower-cased paths, for prefix matches via bisect;
+- a trigram -> paths map, for substring matches: candidates are the
+  intersection of the query's trigram sets, verified with `in`.
+
+A slot list gives `random_path()` in O(1). The library is kept in sync by a
+polling watcher that re-stats the tree every `scan_interval` seconds in a worker
+thread and only re-hashes files whose size or mtime changed (inotify is not
+available on every host the bot runs on, and a stat pass is cheap).
+
+    catalog = MediaCatalog(MEDIA_ROOT)
+    await catalog.load()          # last known state from the DB
+    catalog.start_watching()      # scan now, then every scan_interval seconds
+    catalog.search('notes')       # ['pdf/notes.pdf', ...]
+"""
+import asyncio
+import bisect
+import hashlib
+import logging
+import mimetypes
+import os
+import random
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.db import DB
+
+logger = logging.getLogger('media_catalog')
+
+HASH_BLOCK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(HASH_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def scan_tree(root: Path) -> Dict[str, Tuple[int, float]]:
+    """{relative posix path: (size, mtime)} for every file under `root`; blocking."""
+    found = {}
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if name.startswith('.'):
+                continue
+            full = os.path.join(folder, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue  # removed between listing and stat
+            found[Path(full).relative_to(root).as_posix()] = (st.st_size, st.st_mtime)
+    return found
+
+
+class MediaCatalog:
+    def __init__(self, root: Path, scan_interval: float = 60.0,
+                 after_refresh: Optional[Callable[[], Awaitable[None]]] = None):
+        self.root = Path(root)
+        self.scan_interval = scan_interval
+        # awaited after a watcher scan that found changes
+        self.after_refresh = after_refresh
+        self.entries: Dict[str, Dict] = {}
+        self._keys: List[str] = []          # sorted lower-cased paths
+        self._by_key: Dict[str, str] = {}   # lower-cased path -> path
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._slots: List[str] = []
+        self._slot_of: Dict[str, int] = {}
+        self._scan_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ── index maintenance ──
+    def _index(self, entry: Dict, keep_sorted: bool = True) -> None:
+        path = entry['path']
+        if path in self.entries:
+            self.entries[path] = entry  # metadata changed; the name indexes stay valid
+            return
+        self.entries[path] = entry
+        key = path.lower()
+        if keep_sorted:
+            bisect.insort(self._keys, key)
+        else:
+            self._keys.append(key)
+        self._by_key[key] = path
+        for gram in trigrams(key):
+            self._trigrams.setdefault(gram, set()).add(path)
+        self._slot_of[path] = len(self._slots)
+        self._slots.append(path)
+
+    def _index_many(self, entries: List[Dict]) -> None:
+        # one sort for the batch instead of an O(n) insort per entry
+        for entry in entries:
+            self._index(entry, keep_sorted=False)
+        self._keys.sort()
+
+    def _unindex(self, path: str) -> None:
+        if self.entries.pop(path, None) is None:
+            return
+        key = path.lower()
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+        self._by_key.pop(key, None)
+        for gram in trigrams(key):
+            paths = self._trigrams.get(gram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._trigrams[gram]
+        # swap-remove keeps the slot list dense for O(1) random choice
+        slot = self._slot_of.pop(path)
+        last = self._slots.pop()
+        if last != path:
+            self._slots[slot] = last
+            self._slot_of[last] = slot
+
+    # ── queries ──
+    def paths(self) -> List[str]:
+        return [self._by_key[k] for k in self._keys]
+
+    def random_path(self) -> Optional[str]:
+        return random.choice(self._slots) if self._slots else None
+
+    def search(self, query: str, limit: int = 25) -> List[str]:
+        """Paths matching `query` case-insensitively: prefix matches first, then substrings."""
+        query = query.lower()
+        results: List[str] = []
+        i = bisect.bisect_left(self._keys, query)
+        while i < len(self._keys) and len(results) < limit and self._keys[i].startswith(query):
+            results.append(self._by_key[self._keys[i]])
+            i += 1
+        if len(results) >= limit or not query:
+            return results
+        seen = set(results)
+        grams = trigrams(query)
+        if grams:
+            sets = sorted((self._trigrams.get(g, set()) for g in grams), key=len)
+            candidates = set.intersection(*sets) if sets[0] else set()
+            keys = sorted(p.lower() for p in candidates)
+        else:
+            keys = self._keys  # 1-2 character queries: no trigram to narrow by
+        for key in keys:
+            if len(results) >= limit:
+                break
+            path = self._by_key[key]
+            if path not in seen and query in key:
+                results.append(path)
+        return results
+
+    # ── sync ──
+    async def load(self) -> None:
+        """Fill the indexes from the DB; the watcher reconciles them with the filesystem."""
+        try:
+            self._index_many([dict(row) for row in await DB.get_media_catalog()])
+        except Exception as e:
+            logger.warning('Could not read the media catalog: %s', e)
+
+    def _describe(self, path: str, size: int, mtime: float) -> Dict:
+        mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        return {'path': path, 'size': size, 'mtime': mtime, 'mime': mime,
+                'sha256': file_sha256(self.root / path)}
+
+    def _describe_all(self, changed: Dict[str, Tuple[int, float]]) -> List[Dict]:
+        described = []
+        for path, (size, mtime) in changed.items():
+            try:
+                described.append(self._describe(path, size, mtime))
+            except OSError:
+                continue  # vanished while hashing; the next scan drops it
+        return described
+
+    async def refresh(self) -> Tuple[int, int]:
+        """Re-scan the library; returns (added or changed, removed) counts."""
+        async with self._scan_lock:
+            found = await asyncio.to_thread(scan_tree, self.root)
+            changed = {p: st for p, st in found.items()
+                       if p not in self.entries
+                       or (self.entries[p]['size'], self.entries[p]['mtime']) != st}
+            removed = [p for p in self.entries if p not in found]
+            described = await asyncio.to_thread(self._describe_all, changed) if changed else []
+            for path in removed:
+                self._unindex(path)
+            self._index_many(described)
+            try:
+                if described:
+                    await DB.save_media_entries([(e['path'], e['size'], e['mtime'], e['mime'], e['sha256'])
+                                                 for e in described])
+                if removed:
+                    await DB.delete_media_entries(removed)
+            except Exception as e:
+                logger.warning('Could not persist the media catalog: %s', e)
+            return len(described), len(removed)
+
+    async def add_file(self, path: Path) -> Optional[Dict]:
+        """Catalog one file right away (e.g. after an upload) instead of waiting for a scan."""
+        relative = Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+        st = os.stat(path)
+        entry = await asyncio.to_thread(self._describe, relative, st.st_size, st.st_mtime)
+        self._index(entry)
+        await DB.save_media_entries([(entry['path'], entry['size'], entry['mtime'], entry['mime'], entry['sha256'])])
+        return entry
+
+    async def _watch(self):
+        while True:
+            try:
+                added, removed = await self.refresh()
+                if added or removed:
+                    logger.info('Media catalog: %d added/changed, %d removed', added, removed)
+                    if self.after_refresh:
+                        await self.after_refresh()
+            except Exception as e:
+                logger.warning('Media catalog scan failed: %s', e)
+            await asyncio.sleep(self.scan_interval)
+
+    def start_watching(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    def stop_watching(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
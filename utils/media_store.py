@@ -0,0 +1,190 @@
+"""Content-addressed storage for media/ uploads.
+
+Every uploaded file is stored once as a blob named after its SHA-256 under
+`media/.blobs/ab/abcdef…`, and the visible name in `media/` is a hardlink to
+that blob. Uploading the same PDF again under another name costs a directory
+entry instead of another copy. Where hardlinks are not supported (some Windows
+or network filesystems) the name falls back to a plain copy, so nothing breaks,
+it just isn't deduplicated. Because names share an inode, media files should
+be replaced rather than edited in place; a blob whose content no longer matches
+its hash is rewritten on the next ingest of that content.
+
+With `recompress=True`, PNGs are re-encoded losslessly (zlib level 9 with
+Pillow's optimizer) in a worker pool on ingest and the smaller encoding is
+kept. Pixel data is unchanged; ancillary PNG text chunks are dropped.
+
+    store = MediaStore(MEDIA_ROOT, recompress=True)
+    result = await store.ingest(data, 'pdf/notes.pdf')
+    result['deduplicated']  # True if that content was already stored
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from utils.lazy_import import lazy_import
+from utils.media_catalog import file_sha256
+
+Image = lazy_import('PIL.Image')
+
+logger = logging.getLogger('media_store')
+
+BLOB_DIR = '.blobs'
+# blobs younger than this are never pruned, so an ingest racing a scan is safe
+PRUNE_GRACE = 3600
+
+
+def optimize_png(data: bytes) -> bytes:
+    """Lossless re-encode of a PNG; returns the input if that is not smaller; blocking."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.format != 'PNG':
+                return data
+            out = io.BytesIO()
+            image.save(out, format='PNG', optimize=True, compress_level=9)
+    except Exception as e:
+        logger.debug('PNG optimisation skipped: %s', e)
+        return data
+    smaller = out.getvalue()
+    return smaller if len(smaller) < len(data) else data
+
+
+class MediaStore:
+    def __init__(self, root: Path, recompress: bool = False, workers: int = 2):
+        self.root = Path(root)
+        self.blobs = self.root / BLOB_DIR
+        self.recompress = recompress
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='media-ingest')
+        self.stats = {'ingested': 0, 'deduplicated': 0, 'recompressed_bytes_saved': 0}
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs / sha256[:2] / sha256
+
+    @staticmethod
+    def _tmp_path(path: Path) -> Path:
+        """A fresh temporary name next to `path`, unique per call."""
+        return path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+
+    def _link(self, blob: Path, target: Path) -> bool:
+        """Point `target` at `blob`, replacing any existing file; True if hardlinked."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp_path(target)
+        try:
+            try:
+                os.link(blob, tmp)
+                linked = True
+            except OSError:
+                shutil.copyfile(blob, tmp)
+                linked = False
+            os.replace(tmp, target)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return linked
+
+    def _ingest(self, data: bytes, relative_name: str) -> Dict:
+        original_size = len(data)
+        if self.recompress and relative_name.lower().endswith('.png'):
+            data = optimize_png(data)
+        sha256 = hashlib.sha256(data).hexdigest()
+        blob = self.blob_path(sha256)
+        # a blob edited in place through one of its names must not be handed out again
+        deduplicated = blob.exists() and file_sha256(blob) == sha256
+        if not deduplicated:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._tmp_path(blob)
+            try:
+                tmp.write_bytes(data)
+                os.replace(tmp, blob)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+        else:
+            os.utime(blob)  # keeps a re-used blob out of prune()'s grace window
+        target = self.root / relative_name
+        hardlinked = self._link(blob, target)
+        return {'path': target, 'sha256': sha256, 'size': len(data), 'deduplicated': deduplicated,
+                'hardlinked': hardlinked, 'saved': original_size - len(data)}
+
+    async def ingest(self, data: bytes, relative_name: str) -> Dict:
+        """Store `data` under `relative_name` (relative to the media root) in the worker pool."""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._pool, self._ingest, data, relative_name)
+        self.stats['ingested'] += 1
+        self.stats['deduplicated'] += result['deduplicated']
+        self.stats['recompressed_bytes_saved'] += result['saved']
+        return result
+
+    def _adopt(self, relative_name: str, sha256: str) -> bool:
+        """Move an existing (pre-store) file into the blob store; True if it now shares a blob."""
+        target = self.root / relative_name
+        blob = self.blob_path(sha256)
+        if blob.exists():
+            if os.path.samefile(blob, target):
+                return False
+            return self._link(blob, target)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(target, blob)  # the existing file becomes the blob; no copy
+        except OSError:
+            shutil.copyfile(target, blob)
+        return False
+
+    async def adopt(self, entries: Iterable[Dict]) -> int:
+        """Fold cataloged files into the store; returns how many were deduplicated."""
+        loop = asyncio.get_running_loop()
+        merged = 0
+        for entry in entries:
+            try:
+                merged += await loop.run_in_executor(self._pool, self._adopt, entry['path'], entry['sha256'])
+            except OSError as e:
+                logger.warning('Could not adopt %s: %s', entry['path'], e)
+        return merged
+
+    def prune(self, live_hashes: Iterable[str]) -> int:
+        """Delete blobs no cataloged file refers to any more; returns how many; blocking."""
+        if not self.blobs.is_dir():
+            return 0
+        live = set(live_hashes)
+        cutoff = time.time() - PRUNE_GRACE
+        removed = 0
+        for blob in self.blobs.glob('*/*'):
+            if blob.name in live or blob.suffix == '.tmp':
+                continue
+            try:
+                if blob.stat().st_mtime < cutoff:
+                    blob.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+def dedup_report(entries: Iterable[Dict]) -> Dict:
+    """Logical vs unique bytes for catalog entries (dicts with 'size' and 'sha256')."""
+    logical = 0
+    unique: Dict[str, int] = {}
+    files = 0
+    for entry in entries:
+        files += 1
+        logical += entry['size']
+        if entry.get('sha256'):
+            unique[entry['sha256']] = entry['size']
+    physical = sum(unique.values())
+    return {
+        'files': files,
+        'unique': len(unique),
+        'logical_bytes': logical,
+        'unique_bytes': physical,
+        'ratio': logical / physical if physical else 1.0,
+    }
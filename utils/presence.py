@@ -0,0 +1,157 @@
+"""Central, rate-limited bot presence.
+
+Every presence change is a gateway command on the shard's websocket, so the
+bot has one `PresenceManager` instead of cogs calling `change_presence`
+themselves. Sources are registered with a priority; each returns the
+activity it wants to show on a shard, or None when it has nothing to say:
+
+- the highest-priority active source wins if it is pinned (`rotate=False`,
+  e.g. music now playing), for as long as it stays active;
+- otherwise the active rotating sources (ping/uptime, credit) take turns in
+  priority order, one step every `rotate_seconds`.
+
+A shard is only sent a presence that differs from the last one it was sent,
+and never more often than once per `min_interval` seconds; a change that
+arrives sooner is applied when the shard's interval is up. Call `refresh()`
+when a source's answer changes (a track starts or stops).
+
+    presence = PresenceManager(bot, rotate_seconds=60)
+    presence.register('music', music_activity, priority=PRIORITY_MUSIC, rotate=False)
+    presence.start()
+    presence.refresh()
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('presence')
+
+PRIORITY_MUSIC = 30
+PRIORITY_STATUS = 20
+PRIORITY_CREDIT = 10
+
+ActivitySource = Callable[[Optional[int]], Optional[discord.BaseActivity]]
+
+
+def activity_key(activity: Optional[discord.BaseActivity]) -> Optional[Tuple]:
+    """What a presence looks like to users; equal keys need no update."""
+    if activity is None:
+        return None
+    return (type(activity).__name__, getattr(activity, 'type', None), activity.name, getattr(activity, 'url', None))
+
+
+class PresenceManager:
+    def __init__(self, bot, rotate_seconds: float = 60.0, min_interval: float = 15.0):
+        self.bot = bot
+        self.rotate_seconds = rotate_seconds
+        self.min_interval = min_interval
+        # name -> (priority, rotate, source)
+        self._sources: Dict[str, Tuple[int, bool, ActivitySource]] = {}
+        self._step = 0
+        # shard id (None when unsharded) -> key last sent / monotonic time it was sent
+        self._sent: Dict[Optional[int], Optional[Tuple]] = {}
+        self._sent_at: Dict[Optional[int], float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'sent': 0, 'unchanged': 0, 'deferred': 0, 'failed': 0}
+
+    # ── sources ──
+    def register(self, name: str, source: ActivitySource, priority: int, rotate: bool = True) -> None:
+        self._sources[name] = (priority, rotate, source)
+        self.refresh()
+
+    def unregister(self, name: str) -> None:
+        if self._sources.pop(name, None) is not None:
+            self.refresh()
+
+    def select(self, shard_id: Optional[int] = None) -> Optional[discord.BaseActivity]:
+        """The activity to show on a shard right now."""
+        active: List[Tuple[int, bool, discord.BaseActivity]] = []
+        for name, (priority, rotate, source) in self._sources.items():
+            try:
+                activity = source(shard_id)
+            except Exception as e:
+                logger.warning('Presence source %s failed: %s', name, e)
+                continue
+            if activity is not None:
+                active.append((priority, rotate, activity))
+        if not active:
+            return None
+        active.sort(key=lambda a: a[0], reverse=True)
+        if not active[0][1]:
+            return active[0][2]
+        rotating = [activity for _, rotate, activity in active if rotate]
+        return rotating[self._step % len(rotating)]
+
+    # ── sending ──
+    def _shard_ids(self) -> List[Optional[int]]:
+        shards = getattr(self.bot, 'shards', None)  # AutoShardedBot only
+        return list(shards) if shards else [None]
+
+    async def push(self, now: Optional[float] = None) -> Optional[float]:
+        """Send each shard its selected presence if it changed; returns when a deferred change is due."""
+        now = time.monotonic() if now is None else now
+        retry_at = None
+        for shard_id in self._shard_ids():
+            activity = self.select(shard_id)
+            key = activity_key(activity)
+            if shard_id in self._sent and self._sent[shard_id] == key:
+                self.stats['unchanged'] += 1
+                continue
+            due = self._sent_at.get(shard_id, float('-inf')) + self.min_interval
+            if now < due:
+                self.stats['deferred'] += 1
+                retry_at = due if retry_at is None else min(retry_at, due)
+                continue
+            try:
+                if shard_id is None:
+                    await self.bot.change_presence(activity=activity)
+                else:
+                    await self.bot.change_presence(activity=activity, shard_id=shard_id)
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.warning('Presence update failed on shard %s: %s', shard_id, e)
+                continue
+            self._sent[shard_id] = key
+            self._sent_at[shard_id] = now
+            self.stats['sent'] += 1
+        return retry_at
+
+    # ── schedule ──
+    def refresh(self) -> None:
+        """A source changed; re-evaluate soon (still within the shard's rate limit)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        next_rotation = time.monotonic() + self.rotate_seconds
+        while not self.bot.is_closed():
+            self._wakeup.clear()
+            now = time.monotonic()
+            if now >= next_rotation:
+                self._step += 1
+                next_rotation = now + self.rotate_seconds
+            try:
+                retry_at = await self.push(now)
+            except Exception as e:
+                logger.warning('Presence update loop error: %s', e)
+                retry_at = None
+            wake_at = next_rotation if retry_at is None else min(next_rotation, retry_at)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, wake_at - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
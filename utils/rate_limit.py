@@ -0,0 +1,53 @@
+"""Token-bucket rate limiting shared by LLM calls, uploads, DMs and role changes.
+
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    await bucket.acquire()              # waits for a token
+    await bucket.acquire(max_wait=2)    # or raises RateLimited
+"""
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimited(Exception):
+    """Raised when a caller would have to queue longer than `max_wait` for a token."""
+
+
+class TokenBucket:
+    """Reservation-based token bucket.
+
+    Each `acquire` takes a token immediately; when the bucket is empty the token
+    count goes negative and the caller sleeps until its reservation matures, so
+    waiters are served in arrival order without an explicit queue.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return
+        wait = -self.tokens / self.rate
+        if max_wait is not None and wait > max_wait:
+            self.tokens += 1
+            raise RateLimited(f'rate limited: next slot in {wait:.1f}s')
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # give the reservation back so later callers are not delayed
+            self.tokens += 1
+            raise
@@ -0,0 +1,79 @@
+"""Rate-limit-aware bulk role changes.
+
+Adding or removing one member's role is a `PUT`/`DELETE` on
+`/guilds/{guild_id}/members/{user_id}/roles/{role_id}`, and Discord rate
+limits that route per guild (its major parameter). `RoleChangeExecutor` keeps
+one token bucket and one concurrency limit per guild, so one server's bulk
+reassignment paces itself against its own bucket while others run alongside,
+and a global semaphore caps the total number of requests in flight. Any 429
+that still happens is retried by discord.py's HTTP client.
+
+    executor = RoleChangeExecutor(per_guild_rate=1.0)
+    done, failed = await executor.apply(guild, role, add={1, 2}, remove={3},
+                                        on_change=checkpoint)
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from utils.rate_limit import TokenBucket
+
+logger = logging.getLogger('role_executor')
+
+
+class RoleChangeExecutor:
+    def __init__(self, per_guild_rate: float = 1.0, per_guild_concurrency: int = 2,
+                 max_concurrency: int = 8):
+        self.per_guild_rate = per_guild_rate
+        self.per_guild_concurrency = per_guild_concurrency
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._routes: Dict[int, Tuple[TokenBucket, asyncio.Semaphore]] = {}
+        self.stats = {'added': 0, 'removed': 0, 'failed': 0, 'skipped': 0}
+
+    def _route(self, guild_id: int) -> Tuple[TokenBucket, asyncio.Semaphore]:
+        route = self._routes.get(guild_id)
+        if route is None:
+            route = (TokenBucket(self.per_guild_rate, capacity=self.per_guild_concurrency),
+                     asyncio.Semaphore(self.per_guild_concurrency))
+            self._routes[guild_id] = route
+        return route
+
+    async def _change(self, guild, role, user_id: int, add: bool, reason: Optional[str]) -> bool:
+        member = guild.get_member(user_id)
+        if member is None:
+            self.stats['skipped'] += 1
+            return True  # left the server; nothing to change
+        bucket, semaphore = self._route(guild.id)
+        async with semaphore, self._global:
+            await bucket.acquire()
+            try:
+                if add:
+                    await member.add_roles(role, reason=reason)
+                else:
+                    await member.remove_roles(role, reason=reason)
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.warning('Could not %s role %s for %s in guild %s: %s',
+                               'add' if add else 'remove', role.id, user_id, guild.id, e)
+                return False
+        self.stats['added' if add else 'removed'] += 1
+        return True
+
+    async def apply(self, guild, role, add: Iterable[int] = (), remove: Iterable[int] = (),
+                    reason: Optional[str] = None,
+                    on_change: Optional[Callable[[int], Awaitable[None]]] = None) -> Tuple[int, int]:
+        """Add `role` to the `add` ids and remove it from the `remove` ids.
+
+        `on_change(user_id)` is awaited after each member is handled (e.g. to
+        checkpoint progress). Returns (succeeded, failed) counts.
+        """
+        async def run(user_id: int, adding: bool) -> bool:
+            ok = await self._change(guild, role, user_id, adding, reason)
+            if ok and on_change:
+                await on_change(user_id)
+            return ok
+
+        results = await asyncio.gather(*(run(uid, True) for uid in add),
+                                       *(run(uid, False) for uid in remove))
+        succeeded = sum(results)
+        return succeeded, len(results) - succeeded
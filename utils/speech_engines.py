@@ -0,0 +1,191 @@
+"""Pluggable speech-to-text engines for voice commands.
+
+Every engine takes a `speech_recognition.AudioData` (mono 16 kHz 16-bit, as
+produced by `utils.voice_pipeline`) and returns the recognized text, or None
+when nothing intelligible was said. Backend failures raise `TranscriptionError`.
+`transcribe()` is blocking and is called from a worker thread.
+
+- `google`  — the free Google Web Speech API (network round trip per slice).
+- `vosk`    — offline Kaldi models. Given `phrases` it runs in keyword-spotting
+              mode: the decoder grammar only contains those phrases, which is
+              both faster and far more accurate for a fixed command set.
+- `whisper` — offline faster-whisper models, primed with the phrases.
+
+    engine = create_engine('auto', phrases=VOICE_COMMANDS)
+    text = engine.transcribe(audio)
+"""
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, Iterable, Optional
+
+from utils.lazy_import import is_available, lazy_import
+
+sr = lazy_import('speech_recognition')
+vosk = lazy_import('vosk')
+faster_whisper = lazy_import('faster_whisper')
+
+logger = logging.getLogger('speech_engines')
+
+VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', 'models/vosk')
+WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'tiny.en')
+
+
+class TranscriptionError(Exception):
+    """The engine could not be reached or failed to run."""
+
+
+def normalize(text: str) -> str:
+    """Lower-case, strip punctuation and collapse whitespace."""
+    return ' '.join(re.sub(r"[^\w\s']", ' ', text.lower()).split())
+
+
+def match_command(text: Optional[str], commands: Dict[str, str]) -> Optional[str]:
+    """The command for the first trigger phrase contained in `text`, if any."""
+    if not text:
+        return None
+    padded = f' {normalize(text)} '
+    for trigger, command in commands.items():
+        if f' {normalize(trigger)} ' in padded:
+            return command
+    return None
+
+
+class TranscriptionEngine:
+    name = 'base'
+    offline = False
+
+    def __init__(self, phrases: Iterable[str] = ()):
+        self.phrases = [normalize(p) for p in phrases]
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def load(self):
+        """Load models ahead of the first transcription; blocking."""
+
+    def transcribe(self, audio) -> Optional[str]:
+        raise NotImplementedError
+
+
+class GoogleEngine(TranscriptionEngine):
+    name = 'google'
+
+    def __init__(self, phrases: Iterable[str] = ()):
+        super().__init__(phrases)
+        self._recognizer = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return is_available('speech_recognition')
+
+    def transcribe(self, audio) -> Optional[str]:
+        if self._recognizer is None:
+            self._recognizer = sr.Recognizer()
+        try:
+            return self._recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise TranscriptionError(str(e)) from e
+
+
+class VoskEngine(TranscriptionEngine):
+    name = 'vosk'
+    offline = True
+
+    def __init__(self, phrases: Iterable[str] = (), model_path: str = VOSK_MODEL_PATH):
+        super().__init__(phrases)
+        self.model_path = model_path
+        self._model = None
+        self._lock = threading.Lock()
+        # restricting the grammar to the commands is what makes keyword spotting cheap;
+        # [unk] absorbs everything else
+        self._grammar = json.dumps(self.phrases + ['[unk]']) if self.phrases else None
+
+    @classmethod
+    def available(cls, model_path: str = VOSK_MODEL_PATH) -> bool:
+        return is_available('vosk') and os.path.isdir(model_path)
+
+    def load(self):
+        # the model takes seconds to load; do it once, from whichever worker gets here first
+        with self._lock:
+            if self._model is None:
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_path)
+            return self._model
+
+    def transcribe(self, audio) -> Optional[str]:
+        try:
+            model = self.load()
+            if self._grammar:
+                recognizer = vosk.KaldiRecognizer(model, audio.sample_rate, self._grammar)
+            else:
+                recognizer = vosk.KaldiRecognizer(model, audio.sample_rate)
+            recognizer.AcceptWaveform(audio.get_raw_data(convert_width=2))
+            result = json.loads(recognizer.FinalResult())
+        except Exception as e:
+            raise TranscriptionError(f'vosk: {e}') from e
+        text = ' '.join(w for w in result.get('text', '').split() if w != '[unk]')
+        return text or None
+
+
+class WhisperEngine(TranscriptionEngine):
+    name = 'whisper'
+    offline = True
+
+    def __init__(self, phrases: Iterable[str] = (), model: str = WHISPER_MODEL):
+        super().__init__(phrases)
+        self.model_name = model
+        self._model = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def available(cls) -> bool:
+        return is_available('faster_whisper')
+
+    def load(self):
+        with self._lock:
+            if self._model is None:
+                self._model = faster_whisper.WhisperModel(self.model_name, device='cpu', compute_type='int8')
+            return self._model
+
+    def transcribe(self, audio) -> Optional[str]:
+        import numpy  # a faster_whisper dependency
+        try:
+            samples = numpy.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), numpy.int16)
+            segments, _ = self.load().transcribe(
+                samples.astype(numpy.float32) / 32768.0,
+                language='en',
+                beam_size=1,
+                # biases decoding towards the command phrases
+                initial_prompt=', '.join(self.phrases) or None,
+                vad_filter=False,
+            )
+            text = ' '.join(segment.text.strip() for segment in segments)
+        except Exception as e:
+            raise TranscriptionError(f'whisper: {e}') from e
+        return text.strip() or None
+
+
+ENGINES = {engine.name: engine for engine in (VoskEngine, WhisperEngine, GoogleEngine)}
+
+
+def create_engine(name: str = 'auto', phrases: Iterable[str] = ()) -> TranscriptionEngine:
+    """Build the named engine; 'auto' prefers an installed offline engine over Google."""
+    phrases = list(phrases)
+    name = (name or 'auto').lower()
+    if name == 'auto':
+        for engine in ENGINES.values():
+            if engine.available():
+                return engine(phrases)
+        raise TranscriptionError('No speech recognition engine is installed')
+    if name not in ENGINES:
+        raise TranscriptionError(f"Unknown speech engine '{name}' (choose from {', '.join(ENGINES)})")
+    if not ENGINES[name].available():
+        logger.warning('Speech engine %s is not available; falling back to auto', name)
+        return create_engine('auto', phrases)
+    return ENGINES[name](phrases)
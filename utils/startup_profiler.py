@@ -0,0 +1,126 @@
+"""Startup profiler for cog loading.
+
+`bot.load_extension` imports a cog module and then awaits its `setup()` in one
+call. While the profiler is installed it sits on `sys.meta_path` for the
+`cogs.` package, timing the module import and wrapping `setup()` so both phases
+are reported separately, along with how many new modules each cog pulled in.
+
+    profiler = StartupProfiler()
+    with profiler:
+        await bot.load_extension('cogs.music')
+    print(profiler.report())
+"""
+import functools
+import importlib.abc
+import importlib.util
+import sys
+import time
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, stats: Dict[str, float]):
+        self._loader = loader
+        self._stats = stats
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._stats['import'] = time.perf_counter() - start
+            self._stats['modules'] = len(sys.modules) - before
+        setup = getattr(module, 'setup', None)
+        if setup is not None:
+            stats = self._stats
+
+            @functools.wraps(setup)
+            async def timed_setup(bot):
+                start = time.perf_counter()
+                try:
+                    return await setup(bot)
+                finally:
+                    stats['setup'] = time.perf_counter() - start
+            module.setup = timed_setup
+
+    def __getattr__(self, name):
+        # get_source/get_code etc. are used by inspect and tracebacks
+        return getattr(self._loader, name)
+
+
+class StartupProfiler(importlib.abc.MetaPathFinder):
+    """Collects per-cog import and setup() timings while installed."""
+
+    def __init__(self, package: str = 'cogs'):
+        self.prefix = package + '.'
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.errors: Dict[str, str] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def find_spec(self, fullname, path=None, target=None):
+        if not fullname.startswith(self.prefix):
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None:
+            spec.loader = _TimedLoader(spec.loader, self.stats.setdefault(fullname, {}))
+        return spec
+
+    def record_error(self, name: str, error: Exception) -> None:
+        self.errors[name] = str(error)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc):
+        self.finished = time.perf_counter()
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            pass
+        return False
+
+    def report(self) -> str:
+        total = (self.finished or time.perf_counter()) - self.started
+        rows: List[str] = [f"{'cog':<24}{'import':>10}{'setup':>10}{'modules':>9}"]
+        ordered = sorted(self.stats.items(), key=lambda kv: -(kv[1].get('import', 0) + kv[1].get('setup', 0)))
+        for name, s in ordered:
+            short = name[len(self.prefix):]
+            status = '  FAILED' if name in self.errors else ''
+            rows.append(f"{short:<24}{s.get('import', 0) * 1000:>8.0f}ms{s.get('setup', 0) * 1000:>8.0f}ms"
+                        f"{int(s.get('modules', 0)):>9}{status}")
+        rss = peak_rss_mb()
+        busy = sum(s.get('import', 0) + s.get('setup', 0) for s in self.stats.values())
+        footer = (f"Loaded {len(self.stats) - len(self.errors)}/{len(self.stats)} cogs in {total * 1000:.0f}ms"
+                  f" (sum of per-cog time {busy * 1000:.0f}ms)")
+        if rss is not None:
+            footer += f", peak RSS {rss:.1f} MiB"
+        rows.append(footer)
+        return '\n'.join(rows)
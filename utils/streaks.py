@@ -0,0 +1,81 @@
+"""Study streaks kept as a per-user day bitmap.
+
+Each user has one `streaks` row: the current run (`count`), the longest run
+(`longest`), the last local day they studied (`last_day`, a
+`TimeBuckets.day_number`) and `days`, a bitmap of the days studied in the 63
+days up to `last_day` (bit 0 = `last_day`). Logging study time advances the
+row in O(1) with `Streak.record()` and writes it only when the day changes,
+so `/streak` and `/rank` read one row instead of scanning `study_logs`.
+`DB.recompute_streaks()` rebuilds the rows from the log history in SQL.
+
+    streak = Streak.from_row(row).record(local_time.day_number(ts))
+    streak.current(local_time.day_number())   # 0 once a day has been missed
+"""
+import datetime
+from typing import NamedTuple, Optional
+
+# days kept in the bitmap; bit 63 would make the SQLite integer negative
+BITMAP_DAYS = 63
+BITMAP_MASK = (1 << BITMAP_DAYS) - 1
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def _longest_run(bits: int) -> int:
+    run = 0
+    while bits:
+        bits &= bits << 1
+        run += 1
+    return run
+
+
+class Streak(NamedTuple):
+    count: int = 0
+    longest: int = 0
+    last_day: Optional[int] = None
+    days: int = 0
+
+    @classmethod
+    def from_row(cls, row) -> 'Streak':
+        if not row or row['last_day'] is None:
+            return cls()
+        return cls(int(row['count'] or 0), int(row['longest'] or 0), int(row['last_day']), int(row['days'] or 0))
+
+    def record(self, day: int) -> 'Streak':
+        """The streak after studying on `day`; returns self when nothing changes."""
+        if self.last_day is None:
+            return Streak(1, max(self.longest, 1), day, 1)
+        gap = day - self.last_day
+        if gap == 0:
+            return self
+        if gap > 0:
+            count = self.count + 1 if gap == 1 else 1
+            days = ((self.days << gap) | 1) & BITMAP_MASK
+            return Streak(count, max(self.longest, count), day, days)
+        # a late log for an earlier day may join up runs inside the bitmap
+        back = -gap
+        if back >= BITMAP_DAYS or (self.days >> back) & 1:
+            return self
+        days = self.days | (1 << back)
+        run = ((days + 1) & ~days).bit_length() - 1
+        count = run if run < BITMAP_DAYS else max(self.count, run)
+        return Streak(count, max(self.longest, count, _longest_run(days)), self.last_day, days)
+
+    @property
+    def last_date(self) -> Optional[str]:
+        """'YYYY-MM-DD' of `last_day`."""
+        if self.last_day is None:
+            return None
+        return datetime.date.fromordinal(self.last_day + _EPOCH_ORDINAL).isoformat()
+
+    def current(self, today: int) -> int:
+        """Current streak as of `today`: it survives until a whole day is missed."""
+        if self.last_day is None or today - self.last_day > 1:
+            return 0
+        return self.count
+
+    def studied(self, today: int, window: int = 7) -> list:
+        """Whether each of the last `window` days up to `today` was studied, oldest first."""
+        if self.last_day is None:
+            return [False] * window
+        return [0 <= self.last_day - day < BITMAP_DAYS and bool((self.days >> (self.last_day - day)) & 1)
+                for day in range(today - window + 1, today + 1)]
@@ -0,0 +1,133 @@
+"""Day and week bucketing in a fixed timezone, without a datetime per call.
+
+Activity weeks, study streaks, the daily quote and the weekly reports all need
+"which day / week does this timestamp fall in". `TimeBuckets` answers that for
+one timezone:
+
+- the tz object is built once (`get_tz` is cached);
+- if the zone's UTC offset is constant around now (UTC, Asia/Kolkata, ...),
+  day and week starts are integer arithmetic on the timestamp;
+- otherwise (zones with DST) the last day and week computed are memoized as
+  [start, end) ranges, so repeated calls within the same bucket are two
+  comparisons instead of a datetime construction.
+
+Weeks start on Monday 00:00 local time.
+
+    from utils.timebuckets import local_time, utc_time
+    utc_time.week_start(ts)       # activity weeks (UTC)
+    local_time.day_key()          # '2025-01-31' in BOT_TIMEZONE
+    local_time.day_number(ts)     # consecutive integers for consecutive local days
+"""
+import datetime
+import functools
+import os
+import time
+from typing import Optional, Tuple
+
+import pytz
+
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+# 1970-01-01 was a Thursday: weekday 3 with Monday = 0
+_EPOCH_WEEKDAY = 3
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# how far around the current time an offset must hold to take the integer path
+_FIXED_CHECK_DAYS = 2 * 366
+
+BOT_TIMEZONE = os.getenv('BOT_TIMEZONE') or 'Asia/Kolkata'
+
+
+@functools.lru_cache(maxsize=None)
+def get_tz(name: str) -> datetime.tzinfo:
+    return pytz.timezone(name)
+
+
+class TimeBuckets:
+    def __init__(self, tz_name: str = 'UTC'):
+        self.tz_name = tz_name
+        self.tz = get_tz(tz_name)
+        self._offset, self._fixed_from, self._fixed_until = self._find_fixed_offset()
+        # memo of the last bucket computed the slow way: (start, end, local date)
+        self._day: Tuple[int, int, Optional[datetime.date]] = (0, 0, None)
+        self._week: Tuple[int, int] = (0, 0)
+
+    def _find_fixed_offset(self) -> Tuple[Optional[int], int, int]:
+        """(offset seconds, from ts, until ts) if the UTC offset is constant around now."""
+        now = int(time.time())
+        start, end = now - _FIXED_CHECK_DAYS * DAY, now + _FIXED_CHECK_DAYS * DAY
+        offsets = {
+            int(datetime.datetime.fromtimestamp(ts, self.tz).utcoffset().total_seconds())
+            for ts in range(start, end + 1, 14 * DAY)
+        }
+        if len(offsets) != 1:
+            return None, 0, 0
+        return offsets.pop(), start, end
+
+    def _fixed(self, ts: int) -> bool:
+        return self._offset is not None and self._fixed_from <= ts < self._fixed_until
+
+    def _local_midnight(self, day: datetime.date) -> int:
+        return int(self.tz.localize(datetime.datetime(day.year, day.month, day.day)).timestamp())
+
+    def _day_bucket(self, ts: int) -> Tuple[int, int, datetime.date]:
+        start, end, day = self._day
+        if start <= ts < end:
+            return self._day
+        day = datetime.datetime.fromtimestamp(ts, self.tz).date()
+        self._day = (self._local_midnight(day), self._local_midnight(day + datetime.timedelta(days=1)), day)
+        return self._day
+
+    # ── buckets ──
+    def day_start(self, ts: int) -> int:
+        """Unix time of local midnight starting the day `ts` falls in."""
+        ts = int(ts)
+        if self._fixed(ts):
+            return ts - (ts + self._offset) % DAY
+        return self._day_bucket(ts)[0]
+
+    def week_start(self, ts: int) -> int:
+        """Unix time of local Monday 00:00 starting the week `ts` falls in."""
+        ts = int(ts)
+        if self._fixed(ts):
+            days = (ts + self._offset) // DAY
+            return (days - (days + _EPOCH_WEEKDAY) % 7) * DAY - self._offset
+        start, end = self._week
+        if start <= ts < end:
+            return start
+        day = self._day_bucket(ts)[2]
+        monday = day - datetime.timedelta(days=day.weekday())
+        self._week = (self._local_midnight(monday), self._local_midnight(monday + datetime.timedelta(days=7)))
+        return self._week[0]
+
+    def day_number(self, ts: Optional[int] = None) -> int:
+        """Local days since 1970-01-01: consecutive days give consecutive numbers."""
+        ts = int(time.time()) if ts is None else int(ts)
+        if self._fixed(ts):
+            return (ts + self._offset) // DAY
+        return self._day_bucket(ts)[2].toordinal() - _EPOCH_ORDINAL
+
+    def date(self, ts: Optional[int] = None) -> datetime.date:
+        return datetime.date.fromordinal(self.day_number(ts) + _EPOCH_ORDINAL)
+
+    def day_key(self, ts: Optional[int] = None) -> str:
+        """'YYYY-MM-DD' of the local day."""
+        return self.date(ts).isoformat()
+
+    def utc_offset(self, ts: Optional[int] = None) -> int:
+        """Seconds east of UTC at `ts` (now by default)."""
+        ts = int(time.time()) if ts is None else int(ts)
+        if self._fixed(ts):
+            return self._offset
+        return int(datetime.datetime.fromtimestamp(ts, self.tz).utcoffset().total_seconds())
+
+    # ── current time ──
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now(self.tz)
+
+    def today(self) -> datetime.date:
+        return self.date()
+
+
+utc_time = TimeBuckets('UTC')
+# day boundaries for streaks, the daily quote and weekly reports
+local_time = TimeBuckets(BOT_TIMEZONE)
@@ -1,11 +1,10 @@
 """Time utilities with Asia/Kolkata timezone support"""
 import datetime
-import pytz
+from utils.timebuckets import get_tz
 
 def get_kolkata_time():
     """Get current time in Asia/Kolkata timezone"""
-    tz = pytz.timezone('Asia/Kolkata')
-    return datetime.datetime.now(tz)
+    return datetime.datetime.now(get_tz('Asia/Kolkata'))
 
 def format_time(dt):
     """Format datetime object for display"""
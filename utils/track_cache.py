@@ -0,0 +1,123 @@
+"""Persistent yt-dlp extraction cache for the music cog.
+
+Track metadata (title, uploader, duration, thumbnail, format list) is stored
+per video id in the `track_cache` table. The signed stream URL is stored next
+to it together with its `expire` timestamp, so a track is only re-extracted
+when its stream URL is about to lapse. Playlists are stored as ordered video
+ids in `playlist_entries` and synced by diffing ids.
+"""
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from utils.db import DB
+
+# Stream URLs without an `expire` parameter are trusted for this long
+DEFAULT_STREAM_TTL = 3600
+# Keep this much validity beyond the track's duration before reusing a URL
+REFRESH_MARGIN = 300
+
+FORMAT_FIELDS = ('format_id', 'ext', 'acodec', 'vcodec', 'abr', 'asr', 'filesize')
+
+
+def video_id_from_url(url: str) -> Optional[str]:
+    """YouTube video id from a watch/youtu.be/music URL, or None."""
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
+    host = (parsed.hostname or '').lower()
+    if host.endswith('youtu.be'):
+        return parsed.path.lstrip('/').split('/')[0] or None
+    if 'youtube' in host:
+        if parsed.path.startswith('/shorts/'):
+            return parsed.path.split('/')[2] or None
+        return parse_qs(parsed.query).get('v', [None])[0]
+    return None
+
+
+def stream_expiry(stream_url: str, now: Optional[float] = None) -> int:
+    """Unix time at which a signed stream URL stops working."""
+    now = int(now if now is not None else time.time())
+    try:
+        query = parse_qs(urlparse(stream_url).query)
+        if 'expire' in query:
+            return int(query['expire'][0])
+        # some CDNs put the parameters in the path: /expire/<ts>/...
+        parts = urlparse(stream_url).path.split('/')
+        if 'expire' in parts:
+            return int(parts[parts.index('expire') + 1])
+    except (ValueError, IndexError):
+        pass
+    return now + DEFAULT_STREAM_TTL
+
+
+def _row_to_info(row) -> Dict[str, Any]:
+    return {
+        'id': row['video_id'],
+        'webpage_url': row['webpage_url'],
+        'title': row['title'],
+        'uploader': row['uploader'],
+        'duration': row['duration'],
+        'thumbnail': row['thumbnail'],
+        'formats': json.loads(row['formats'] or '[]'),
+        'url': row['stream_url'],
+    }
+
+
+class TrackCache:
+    """Lookup/store helpers on top of the DB tables."""
+
+    def __init__(self, refresh_margin: int = REFRESH_MARGIN):
+        self.refresh_margin = refresh_margin
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0}
+
+    async def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Cached info whose stream URL stays valid for the whole track, else None."""
+        row = await DB.get_cached_track(video_id)
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        needed = int(time.time()) + (row['duration'] or 0) + self.refresh_margin
+        if not row['stream_url'] or (row['stream_expires'] or 0) < needed:
+            self.stats['refreshes'] += 1
+            return None
+        self.stats['hits'] += 1
+        return _row_to_info(row)
+
+    async def put(self, info: Dict[str, Any], video_id: Optional[str] = None) -> None:
+        video_id = video_id or info.get('id')
+        stream_url = info.get('url')
+        if not video_id or not stream_url:
+            return
+        formats = [{k: f.get(k) for k in FORMAT_FIELDS if f.get(k) is not None} for f in info.get('formats') or []]
+        await DB.save_cached_track(
+            video_id, info.get('webpage_url'), info.get('title'), info.get('uploader'),
+            int(info['duration']) if info.get('duration') else None, info.get('thumbnail'),
+            json.dumps(formats), stream_url, stream_expiry(stream_url),
+        )
+
+    async def playlist(self, playlist_url: str) -> List[str]:
+        """Stored playlist as ordered webpage URLs."""
+        return [r['webpage_url'] for r in await DB.get_playlist_entries(playlist_url)]
+
+    async def sync_playlist(self, playlist_url: str, entries: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Diff flat playlist entries against the stored ids; returns (added, removed)."""
+        pairs = []
+        seen = set()
+        for e in entries:
+            if not e:
+                continue
+            vid = e.get('id') or video_id_from_url(e.get('url') or e.get('webpage_url') or '')
+            if not vid or vid in seen:
+                continue
+            seen.add(vid)
+            pairs.append((vid, e.get('webpage_url') or f'https://www.youtube.com/watch?v={vid}'))
+        result = await DB.sync_playlist_entries(playlist_url, pairs)
+        await DB.set_kv(f'playlist_synced:{playlist_url}', str(int(time.time())))
+        return result
+
+    async def playlist_synced_at(self, playlist_url: str) -> int:
+        value = await DB.get_kv(f'playlist_synced:{playlist_url}')
+        return int(value) if value else 0
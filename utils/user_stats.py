@@ -0,0 +1,120 @@
+"""Per-user study statistics maintained on every log.
+
+`/rank`, `/logs view`, `/report`, `/mentor plan` and `/suggest` used to read a
+user's whole `study_logs` history and add it up in Python. `UserStats` keeps
+those answers instead: total minutes and sessions, all-time minutes per
+subject, per-subject minutes and sessions for the last `WINDOW_DAYS` local days
+(enough for this week vs. last week), and the last `RECENT_SESSIONS` sessions.
+
+`DB.add_study_log` advances the user's stats with `add()` and writes them to
+the `user_stats` summary table in the same transaction; `DB.get_user_stats`
+serves them from a `UserStatsCache` (LRU) in front of that table, and only
+rebuilds them from `study_logs` for a user who has no summary row yet.
+
+    stats = await DB.get_user_stats(user_id)
+    current, previous = stats.week_minutes(local_time.day_number())
+"""
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+RECENT_SESSIONS = 10
+# days of per-subject history kept for weekly comparisons
+WINDOW_DAYS = 14
+
+
+def normalize_topic(topic: Optional[str]) -> str:
+    """Subjects are compared case-insensitively; missing ones are 'unknown'."""
+    return topic.lower() if topic else 'unknown'
+
+
+class UserStats:
+    def __init__(self, user_id: int, total_minutes: int = 0, sessions: int = 0,
+                 subjects: Optional[Dict[str, int]] = None,
+                 days: Optional[Dict[int, Dict[str, List[int]]]] = None,
+                 recent: Optional[List[Tuple[int, int, str]]] = None):
+        self.user_id = user_id
+        self.total_minutes = total_minutes
+        self.sessions = sessions
+        # subject -> all-time minutes
+        self.subjects = subjects or {}
+        # local day number -> subject -> [minutes, sessions], last WINDOW_DAYS days only
+        self.days = days or {}
+        # (ts, minutes, topic as logged), newest first
+        self.recent = recent or []
+
+    def add(self, minutes: int, ts: int, topic: Optional[str], day: int) -> None:
+        subject = normalize_topic(topic)
+        self.total_minutes += minutes
+        self.sessions += 1
+        self.subjects[subject] = self.subjects.get(subject, 0) + minutes
+        bucket = self.days.setdefault(day, {}).setdefault(subject, [0, 0])
+        bucket[0] += minutes
+        bucket[1] += 1
+        newest = max(self.days)
+        for old in [d for d in self.days if d <= newest - WINDOW_DAYS]:
+            del self.days[old]
+        self.recent.append((ts, minutes, topic or ''))
+        self.recent.sort(key=lambda s: s[0], reverse=True)
+        del self.recent[RECENT_SESSIONS:]
+
+    def subject_window(self, today: int, days: int = 7, skip: int = 0) -> Dict[str, List[int]]:
+        """subject -> [minutes, sessions] over `days` local days ending `skip` days before `today`."""
+        last = today - skip
+        totals: Dict[str, List[int]] = {}
+        for day, subjects in self.days.items():
+            if last - days < day <= last:
+                for subject, (minutes, sessions) in subjects.items():
+                    total = totals.setdefault(subject, [0, 0])
+                    total[0] += minutes
+                    total[1] += sessions
+        return totals
+
+    def week_minutes(self, today: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """({subject: minutes} for the last 7 days, the same for the 7 days before)."""
+        current = {s: m for s, (m, _) in self.subject_window(today).items()}
+        previous = {s: m for s, (m, _) in self.subject_window(today, skip=7).items()}
+        return current, previous
+
+    # ── summary table row ──
+    def to_row(self) -> Tuple:
+        return (self.user_id, self.total_minutes, self.sessions, json.dumps(self.subjects),
+                json.dumps(self.days), json.dumps(self.recent))
+
+    @classmethod
+    def from_row(cls, row) -> 'UserStats':
+        return cls(int(row['user_id']), int(row['total_minutes']), int(row['sessions']),
+                   json.loads(row['subjects']),
+                   {int(day): subjects for day, subjects in json.loads(row['days']).items()},
+                   [tuple(s) for s in json.loads(row['recent'])])
+
+
+class UserStatsCache:
+    """LRU of `UserStats` by user id."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[int, UserStats]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[UserStats]:
+        stats = self._data.get(user_id)
+        if stats is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(user_id)
+        return stats
+
+    def put(self, stats: UserStats) -> None:
+        self._data[stats.user_id] = stats
+        self._data.move_to_end(stats.user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def discard(self, user_id: int) -> None:
+        self._data.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
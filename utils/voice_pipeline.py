@@ -0,0 +1,128 @@
+"""In-memory PCM pipeline for voice command recognition.
+
+Discord delivers each speaker's audio as 48 kHz, 16-bit stereo PCM. Instead of
+encoding it to MP3, decoding it again and round-tripping a wav file through the
+filesystem, the pipeline works on the raw bytes:
+
+1. downmix to mono and resample to 16 kHz (all the recognizer needs),
+2. run a cheap energy-based voice-activity check and drop silent slices,
+3. trim leading/trailing silence, wrap the rest in `speech_recognition.AudioData`
+   and hand it to the recognizer in a worker thread, with at most
+   `max_concurrency` recognitions in flight.
+
+    pipeline = SpeechPipeline(lambda audio: recognizer.recognize_google(audio))
+    text = await pipeline.transcribe(pcm)     # None when the slice was silent
+"""
+import asyncio
+import warnings
+from typing import Callable, Optional
+
+from utils.lazy_import import lazy_import
+
+with warnings.catch_warnings():
+    # deprecated in 3.11; speech_recognition relies on it too (audioop-lts on 3.13+)
+    warnings.simplefilter('ignore', DeprecationWarning)
+    import audioop
+
+sr = lazy_import('speech_recognition')
+
+# What Discord's voice receive decoder produces
+DISCORD_RATE = 48000
+DISCORD_CHANNELS = 2
+SAMPLE_WIDTH = 2
+# What gets sent to the recognizer
+RECOGNIZE_RATE = 16000
+
+
+def to_mono(pcm, channels: int = DISCORD_CHANNELS) -> bytes:
+    """Average interleaved 16-bit stereo down to mono; mono input is returned as is."""
+    if channels == 1:
+        return bytes(pcm)
+    return audioop.tomono(pcm, SAMPLE_WIDTH, 0.5, 0.5)
+
+
+def resample(pcm, rate: int, target: int = RECOGNIZE_RATE) -> bytes:
+    """Resample mono 16-bit PCM from `rate` to `target` Hz."""
+    if rate == target:
+        return bytes(pcm)
+    return audioop.ratecv(pcm, SAMPLE_WIDTH, 1, rate, target, None)[0]
+
+
+def rms(frame) -> int:
+    """Root-mean-square energy of a 16-bit mono frame."""
+    return audioop.rms(frame, SAMPLE_WIDTH)
+
+
+class EnergyVAD:
+    """Energy-threshold voice-activity detector over fixed-size frames.
+
+    A slice counts as speech when at least `min_speech_ms` worth of frames are
+    louder than `threshold` (RMS of 16-bit samples).
+    """
+
+    def __init__(self, threshold: int = 300, frame_ms: int = 30, min_speech_ms: int = 240,
+                 padding_ms: int = 150):
+        self.threshold = threshold
+        self.frame_ms = frame_ms
+        self.min_speech_ms = min_speech_ms
+        self.padding_ms = padding_ms
+
+    def voiced_span(self, pcm, rate: int = RECOGNIZE_RATE) -> Optional[slice]:
+        """Byte range from the first to the last voiced frame (padded), or None if silent."""
+        frame_bytes = rate * self.frame_ms // 1000 * SAMPLE_WIDTH
+        if frame_bytes <= 0:
+            return None
+        view = memoryview(pcm)
+        first = last = None
+        voiced = 0
+        for start in range(0, len(view) - frame_bytes + 1, frame_bytes):
+            if rms(view[start:start + frame_bytes]) >= self.threshold:
+                voiced += 1
+                if first is None:
+                    first = start
+                last = start + frame_bytes
+        if first is None or voiced * self.frame_ms < self.min_speech_ms:
+            return None
+        pad = rate * self.padding_ms // 1000 * SAMPLE_WIDTH
+        return slice(max(0, first - pad), min(len(view), last + pad))
+
+    def trim(self, pcm, rate: int = RECOGNIZE_RATE) -> Optional[bytes]:
+        """`pcm` without its leading/trailing silence, or None if it holds no speech."""
+        span = self.voiced_span(pcm, rate)
+        return None if span is None else bytes(pcm[span])
+
+
+class SpeechPipeline:
+    """Runs VAD and recognition for raw Discord PCM off the event loop."""
+
+    def __init__(self, recognize: Callable, vad: Optional[EnergyVAD] = None, max_concurrency: int = 2):
+        # recognize(audio_data) -> str, called in a worker thread; may raise
+        self.recognize = recognize
+        self.vad = vad or EnergyVAD()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = {'slices': 0, 'silent': 0, 'recognized': 0}
+
+    def prepare(self, pcm, rate: int = DISCORD_RATE, channels: int = DISCORD_CHANNELS) -> Optional[bytes]:
+        """Mono 16 kHz PCM trimmed to the speech in it, or None for a silent slice."""
+        if not pcm:
+            return None
+        mono = resample(to_mono(pcm, channels), rate)
+        return self.vad.trim(mono)
+
+    async def transcribe(self, pcm, rate: int = DISCORD_RATE,
+                         channels: int = DISCORD_CHANNELS) -> Optional[str]:
+        """Recognized text for a PCM slice; None when it was silent.
+
+        Exceptions raised by `recognize` propagate to the caller.
+        """
+        self.stats['slices'] += 1
+        speech = await asyncio.to_thread(self.prepare, pcm, rate, channels)
+        if speech is None:
+            self.stats['silent'] += 1
+            return None
+        async with self._semaphore:
+            text = await asyncio.to_thread(
+                lambda: self.recognize(sr.AudioData(speech, RECOGNIZE_RATE, SAMPLE_WIDTH))
+            )
+        self.stats['recognized'] += 1
+        return text
@@ -0,0 +1,109 @@
+"""Voice-time accounting that survives restarts.
+
+A member's time counts while they sit in a voice channel that is not the
+server's AFK channel and they are not deafened; moving between counted
+channels continues the same session. `VoiceSessionTracker` keeps the start of
+each open session's unflushed interval in memory and accumulates closed
+intervals per (guild, user, week), splitting any interval that crosses a week
+boundary so each week gets exactly its share.
+
+`flush()` (run every minute or so, and on shutdown) credits every open
+session up to now, then writes the accumulated seconds and the open sessions'
+new start times to SQLite in one transaction. After a restart, `load()` reads
+those checkpoints back and `reconcile()` compares them with the live voice
+states from the gateway: members still in voice resume from their checkpoint
+if the bot was down for at most `max_gap` seconds (a deploy), otherwise from
+now, and members who left while the bot was down are simply closed, since
+their time up to the last checkpoint is already stored.
+
+    tracker = VoiceSessionTracker(week_start_for_ts)
+    await tracker.load()
+    tracker.reconcile(guild.id, {member.id for member in counted_members})
+    tracker.update(guild.id, member.id, counting=True)
+    await tracker.flush()
+"""
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from utils.db import DB
+
+WEEK_SECONDS = 7 * 24 * 60 * 60
+
+
+class VoiceSessionTracker:
+    def __init__(self, week_start: Callable[[int], int], max_gap: int = 15 * 60):
+        self.week_start = week_start
+        self.max_gap = max_gap
+        # (guild_id, user_id) -> start of the interval not yet credited
+        self.open: Dict[Tuple[int, int], int] = {}
+        # (guild_id, user_id, week_start) -> seconds credited but not yet written
+        self.pending: Dict[Tuple[int, int, int], int] = {}
+        # checkpoints read back at startup, consumed by reconcile()
+        self._recovered: Dict[Tuple[int, int], int] = {}
+        self.stats = {'flushes': 0, 'rows_written': 0, 'resumed': 0}
+
+    def _credit(self, guild_id: int, user_id: int, start: int, end: int) -> None:
+        while start < end:
+            week = self.week_start(start)
+            stop = min(end, week + WEEK_SECONDS)
+            key = (guild_id, user_id, week)
+            self.pending[key] = self.pending.get(key, 0) + stop - start
+            start = stop
+
+    def update(self, guild_id: int, user_id: int, counting: bool, now: Optional[int] = None) -> None:
+        """Record a member's voice state change: `counting` is whether their time counts now."""
+        now = int(time.time()) if now is None else now
+        key = (guild_id, user_id)
+        if counting:
+            self.open.setdefault(key, now)
+        else:
+            start = self.open.pop(key, None)
+            if start is not None:
+                self._credit(guild_id, user_id, start, now)
+
+    def reconcile(self, guild_id: int, counting: Iterable[int], now: Optional[int] = None) -> None:
+        """Align a guild's sessions with its live voice states (on ready or after a reconnect)."""
+        now = int(time.time()) if now is None else now
+        counting = set(counting)
+        for key in [k for k in self.open if k[0] == guild_id and k[1] not in counting]:
+            self.update(guild_id, key[1], False, now)  # left while we were not listening
+        for user_id in counting:
+            key = (guild_id, user_id)
+            if key in self.open:
+                continue
+            since = self._recovered.pop(key, None)
+            if since is not None and 0 <= now - since <= self.max_gap:
+                self.open[key] = since
+                self.stats['resumed'] += 1
+            else:
+                self.open[key] = now
+        for key in [k for k in self._recovered if k[0] == guild_id]:
+            del self._recovered[key]
+
+    async def load(self) -> None:
+        """Read the open sessions checkpointed by the last flush."""
+        rows = await DB.get_voice_sessions()
+        self._recovered = {(int(r['guild_id']), int(r['user_id'])): int(r['since_ts']) for r in rows}
+
+    async def flush(self, now: Optional[int] = None) -> int:
+        """Credit open sessions up to now and write everything in one transaction; returns rows written."""
+        now = int(time.time()) if now is None else now
+        for (guild_id, user_id), start in self.open.items():
+            self._credit(guild_id, user_id, start, now)
+        pending, self.pending = self.pending, {}
+        for key in self.open:
+            self.open[key] = now
+        # checkpoints not reconciled yet are kept while they could still be resumed
+        self._recovered = {k: since for k, since in self._recovered.items() if now - since <= self.max_gap}
+        sessions = [(g, u, now) for g, u in self.open] + [(g, u, since) for (g, u), since in self._recovered.items()
+                                                          if (g, u) not in self.open]
+        try:
+            await DB.save_voice_checkpoint([(g, u, w, s) for (g, u, w), s in pending.items()], sessions)
+        except Exception:
+            # open sessions were credited up to now; keep those seconds for the next flush
+            for key, seconds in pending.items():
+                self.pending[key] = self.pending.get(key, 0) + seconds
+            raise
+        self.stats['flushes'] += 1
+        self.stats['rows_written'] += len(pending)
+        return len(pending)
@@ -0,0 +1,166 @@
+"""Zip exports of the bot's files, built off the event loop in upload-sized volumes.
+
+`plan_export` walks the tree once (stat only) so the caller knows the file
+count and an estimated archive size before anything is compressed. With a
+previous export's manifest it keeps only files whose size or mtime changed and
+whose content hash differs, for a differential export.
+
+`build_volumes` then writes the files into zips streamed to spooled temporary
+files (in memory up to `SPOOL_MAX`, then on disk), starting a new volume before
+an entry could push the current one past `volume_limit`. Each volume is a
+complete zip on its own, so no joining tool is needed. Both functions block;
+run them with `asyncio.to_thread`.
+
+    plan = plan_export(root, excluded, previous=manifest)
+    volumes = build_volumes(plan.files, volume_limit=24 * 1024 * 1024, name='bot_files')
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Set
+
+SPOOL_MAX = 8 * 1024 * 1024
+# rough deflate ratios for the size estimate; media and archives barely shrink
+STORED_EXTENSIONS = {'.zip', '.gz', '.7z', '.rar', '.png', '.jpg', '.jpeg', '.gif', '.webp',
+                     '.mp3', '.mp4', '.ogg', '.webm', '.pdf'}
+TEXT_RATIO = 0.35
+# per-entry zip overhead bound: local header + central directory record, name twice
+ENTRY_OVERHEAD = 30 + 46 + 64
+HASH_BLOCK = 1024 * 1024
+
+
+class ExportFile(NamedTuple):
+    path: str
+    arcname: str
+    size: int
+    mtime: float
+
+
+class ExportPlan(NamedTuple):
+    files: List[ExportFile]
+    manifest: Dict[str, List]   # arcname -> [size, mtime, sha256 or None]
+    unchanged: int
+    estimated_size: int
+
+
+class Volume(NamedTuple):
+    filename: str
+    fp: BinaryIO
+    size: int
+    count: int
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(HASH_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def walk_files(root: str, excluded: Set[str]) -> Iterable[ExportFile]:
+    """Files under `root`, skipping excluded directory and file names and .zip files."""
+    for folder, dirs, files in os.walk(root, topdown=True):
+        dirs[:] = [d for d in dirs if d not in excluded]
+        for name in files:
+            if name in excluded or name.endswith('.zip'):
+                continue
+            path = os.path.join(folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            yield ExportFile(path, os.path.relpath(path, root).replace(os.sep, '/'), st.st_size, st.st_mtime)
+
+
+def estimate_size(files: Iterable[ExportFile]) -> int:
+    total = 0
+    for f in files:
+        ratio = 1.0 if os.path.splitext(f.arcname)[1].lower() in STORED_EXTENSIONS else TEXT_RATIO
+        total += int(f.size * ratio) + ENTRY_OVERHEAD + 2 * len(f.arcname)
+    return total + 22
+
+
+def plan_export(root: str, excluded: Set[str], previous: Optional[Dict[str, List]] = None) -> ExportPlan:
+    """Pre-walk the export; with `previous`, keep only files changed since that manifest."""
+    files: List[ExportFile] = []
+    manifest: Dict[str, List] = {}
+    unchanged = 0
+    for f in walk_files(root, excluded):
+        before = (previous or {}).get(f.arcname)
+        if before is None:
+            manifest[f.arcname] = [f.size, f.mtime, None]
+            files.append(f)
+            continue
+        if [f.size, f.mtime] == before[:2]:
+            manifest[f.arcname] = before
+            unchanged += 1
+            continue
+        # touched: only a content change counts (files first seen unhashed always count)
+        try:
+            digest = _sha256(f.path)
+        except OSError:
+            continue
+        manifest[f.arcname] = [f.size, f.mtime, digest]
+        if digest == before[2]:
+            unchanged += 1
+        else:
+            files.append(f)
+    return ExportPlan(files, manifest, unchanged, estimate_size(files))
+
+
+def _entry_bound(f: ExportFile) -> int:
+    # worst case deflate output is the input plus a few bytes per block
+    return f.size + f.size // 1000 + ENTRY_OVERHEAD + 2 * len(f.arcname.encode('utf-8'))
+
+
+def build_volumes(files: List[ExportFile], volume_limit: int, name: str) -> List[Volume]:
+    """Zip `files` into volumes of at most `volume_limit` bytes each.
+
+    A file that cannot fit in a volume on its own raises ValueError before any
+    work is done. On success the caller owns (and must close) each volume's fp.
+    """
+    too_big = [f.arcname for f in files if _entry_bound(f) + 22 > volume_limit]
+    if too_big:
+        raise ValueError(f"{len(too_big)} file(s) exceed the volume size on their own: {', '.join(too_big[:5])}")
+
+    volumes: List[Volume] = []
+    spool = zipf = None
+    count = 0
+    directory = 0  # bytes the central directory will take when the volume is closed
+
+    def close_volume():
+        zipf.close()
+        size = spool.tell()
+        spool.seek(0)
+        volumes.append(Volume('', spool, size, count))
+
+    try:
+        for f in files:
+            if zipf is not None and spool.tell() + directory + _entry_bound(f) + 22 > volume_limit:
+                close_volume()
+                zipf = None
+            if zipf is None:
+                spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+                zipf = zipfile.ZipFile(spool, 'w', zipfile.ZIP_DEFLATED)
+                count = directory = 0
+            try:
+                zipf.write(f.path, f.arcname)
+            except OSError:
+                continue  # removed since the plan was made
+            count += 1
+            directory += 46 + len(f.arcname.encode('utf-8'))
+        if zipf is not None:
+            close_volume()
+    except BaseException:
+        if zipf is not None:
+            spool.close()
+        for volume in volumes:
+            volume.fp.close()
+        raise
+
+    total = len(volumes)
+    if total == 1:
+        return [volumes[0]._replace(filename=f'{name}.zip')]
+    return [v._replace(filename=f'{name}.vol{i}of{total}.zip') for i, v in enumerate(volumes, 1)]